@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+class Actor:
+    """Single-writer worker for one key (e.g. a station).
+
+    Submitted items are handled by one task, one batch at a time, so state owned by the
+    key needs no locks. `handle` receives everything queued when it runs (after waiting
+    `window` seconds for more to arrive, if set) and returns one result or Exception per
+    item. The worker task exits after `idle` seconds without work and restarts on demand.
+    """
+
+    def __init__(self, handle: Callable[[list], Awaitable[list]], window: float = 0.0, idle: float = 60.0):
+        self._handle = handle
+        self._window = window
+        self._idle = idle
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    async def submit(self, item: Any) -> Any:
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, fut))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return await fut
+
+    async def _run(self):
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self._idle)
+            except asyncio.TimeoutError:
+                # No await between this check and returning, so submit() can't slip in.
+                if self._queue.empty():
+                    self._task = None
+                    return
+                continue
+            if self._window:
+                await asyncio.sleep(self._window)
+            batch = [first]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            live = [(item, fut) for item, fut in batch if not fut.done()]
+            if not live:
+                continue
+            try:
+                results = await self._handle([item for item, _ in live])
+            except Exception as e:
+                results = [e] * len(live)
+            for (_, fut), res in zip(live, results):
+                if fut.done():
+                    continue
+                if isinstance(res, BaseException):
+                    fut.set_exception(res)
+                else:
+                    fut.set_result(res)
@@ -0,0 +1,95 @@
+import hashlib
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Iterable
+
+@lru_cache(maxsize=4096)
+def normalize(area: str) -> str:
+    """Case-, accent-, punctuation- and spacing-insensitive key for an area name."""
+    s = unicodedata.normalize("NFKD", area)
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", s.casefold()))
+
+class AreaIndex:
+    """Inverted index from normalised area name to the stations listing it in
+    nearby_areas, and to the areas listed alongside it (its neighbours).
+
+    Built by the station service from the stations collection and shipped whole to
+    the matcher; `version` is a content hash, so equal indexes have equal versions.
+    """
+
+    def __init__(self):
+        self.names: dict[str, str] = {}              # key -> display name
+        self.stations: dict[str, set[str]] = {}      # key -> station ids
+        self.neighbours: dict[str, set[str]] = {}    # key -> neighbouring keys
+        self.version = 0
+        self._keys: list[str] = []                   # sorted, for prefix search
+        self._words: list[tuple[str, str]] = []      # sorted (word, key), for word-prefix search
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def build(cls, stations: Iterable[tuple[str, Iterable[str]]]) -> "AreaIndex":
+        """From (station_id, nearby_areas) pairs."""
+        idx = cls()
+        for station_id, areas in stations:
+            keys = []
+            for a in areas:
+                key = normalize(a)
+                if not key:
+                    continue
+                idx.names.setdefault(key, a.strip())
+                idx.stations.setdefault(key, set()).add(station_id)
+                keys.append(key)
+            for key in keys:
+                idx.neighbours.setdefault(key, set()).update(k for k in keys if k != key)
+        idx._finish()
+        return idx
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[tuple[str, str, Iterable[str], Iterable[str]]]) -> "AreaIndex":
+        """From (key, display_name, station_ids, neighbours) tuples, as served by the station service."""
+        idx = cls()
+        for key, name, station_ids, neighbours in entries:
+            idx.names[key] = name
+            idx.stations[key] = set(station_ids)
+            idx.neighbours[key] = set(neighbours)
+        idx._finish()
+        return idx
+
+    def _finish(self):
+        self._keys = sorted(self.names)
+        self._words = sorted((w, k) for k in self.names for w in k.split()[1:])
+        h = hashlib.sha1()
+        for k in self._keys:
+            h.update(f"{k}\0{self.names[k]}\0{','.join(sorted(self.stations[k]))}\0"
+                     f"{','.join(sorted(self.neighbours.get(k, ())))}\n".encode())
+        self.version = int.from_bytes(h.digest()[:8], "big") >> 1   # fits a signed int64
+
+    def compatible(self, area: str, neighbours: bool = True) -> set[str]:
+        """Keys a rider's destination may have for a driver heading to `area`."""
+        key = normalize(area)
+        if not neighbours:
+            return {key}
+        return {key} | self.neighbours.get(key, set())
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """Keys starting with `prefix`, then keys with a later word starting with it."""
+        p = normalize(prefix)
+        if not p:
+            return []
+        out: list[str] = []
+        i = bisect_left(self._keys, p)
+        while i < len(self._keys) and self._keys[i].startswith(p) and len(out) < limit:
+            out.append(self._keys[i])
+            i += 1
+        i = bisect_left(self._words, (p, ""))
+        while i < len(self._words) and self._words[i][0].startswith(p) and len(out) < limit:
+            key = self._words[i][1]
+            if key not in out:
+                out.append(key)
+            i += 1
+        return out
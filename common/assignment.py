@@ -0,0 +1,81 @@
+INF = float("inf")
+
+def hungarian(cost: list[list[float]]) -> list[int]:
+    """Min-cost assignment for an n x m matrix with n <= m.
+
+    Returns the column assigned to each row. O(n^2 * m).
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)    # p[j] = row (1-based) matched to column j
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = INF
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    out = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            out[p[j] - 1] = j - 1
+    return out
+
+def assign_slots(cost: list[list[float]], skip_cost: float) -> list[int]:
+    """Assign rows (seats) to columns (riders), each used at most once.
+
+    `cost[i][j]` may be INF for incompatible pairs. Leaving a row empty costs
+    `skip_cost`, so any pairing cheaper than that is taken. Returns the column per
+    row, or -1 for rows left empty.
+
+    Only each row's n cheapest columns can appear in an optimal solution (n = rows),
+    so the matrix is pruned to those before solving; this keeps large rider pools
+    cheap when there are few seats.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    keep: set[int] = set()
+    for row in cost:
+        ranked = sorted((c, j) for j, c in enumerate(row) if c < skip_cost)
+        keep.update(j for _, j in ranked[:n])
+    cols = sorted(keep)
+    # Pad with one "leave empty" column per row so the problem is always feasible.
+    big = skip_cost * 2 + 1
+    matrix = [[cost[i][j] if cost[i][j] < skip_cost else big for j in cols] + [skip_cost] * n
+              for i in range(n)]
+    picked = hungarian(matrix)
+    return [cols[c] if c < len(cols) and cost[i][cols[c]] < skip_cost else -1
+            for i, c in enumerate(picked)]
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+class WindowBatcher:
+    """Collects submitted items for `window` seconds after the first one arrives (or until
+    `max_items`), then hands the whole batch to `flush`, which returns one result (or
+    Exception) per item. Each submit() resolves with its own result, or raises its own
+    exception or the flush's.
+    """
+
+    def __init__(self, flush: Callable[[list], Awaitable[list]], window: float, max_items: int = 0):
+        self._flush = flush
+        self._window = window
+        self._max_items = max_items
+        self._items: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._items.append((item, fut))
+        if self._max_items and len(self._items) >= self._max_items:
+            self._fire()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._fire)
+        return await fut
+
+    def _fire(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._items = self._items, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]):
+        try:
+            results = await self._flush([item for item, _ in batch])
+            for (_, fut), res in zip(batch, results):
+                if fut.done():
+                    continue
+                if isinstance(res, BaseException):
+                    fut.set_exception(res)
+                else:
+                    fut.set_result(res)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
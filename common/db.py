@@ -1,13 +1,33 @@
 import os
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("DB_NAME", "lastmile")
+MONGO_POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", "100"))   # concurrent operations per process
 
 _client = None
+_async_client = None
 
 def get_db():
+    """Blocking client, for the Flask gateway and scripts."""
     global _client
     if _client is None:
         _client = MongoClient(MONGO_URI)
     return _client[DB_NAME]
+
+def get_async_db():
+    """asyncio client, for the gRPC services: handlers await Mongo instead of blocking the
+    event loop, so requests in flight overlap their round trips. Create it (and use it)
+    from inside the running loop."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(MONGO_URI, maxPoolSize=MONGO_POOL_SIZE)
+    return _async_client[DB_NAME]
+
+async def supports_transactions(db) -> bool:
+    """Multi-document transactions need a replica set or mongos, not a standalone server."""
+    try:
+        hello = await db.client.admin.command("hello")
+    except Exception:
+        return False
+    return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
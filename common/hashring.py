@@ -0,0 +1,47 @@
+import hashlib
+from bisect import bisect
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes.
+
+    Adding or removing a node only moves the keys that hashed to that node's points.
+    """
+
+    def __init__(self, nodes=(), vnodes: int = 100):
+        self.vnodes = vnodes
+        self._nodes: frozenset[str] = frozenset()
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        self.set_nodes(nodes)
+
+    @property
+    def nodes(self) -> frozenset[str]:
+        return self._nodes
+
+    def set_nodes(self, nodes) -> bool:
+        """Replace the node set; returns False if it was unchanged."""
+        nodes = frozenset(nodes)
+        if nodes == self._nodes:
+            return False
+        ring = sorted((_hash(f"{n}#{i}"), n) for n in nodes for i in range(self.vnodes))
+        self._points = [h for h, _ in ring]
+        self._owners = [n for _, n in ring]
+        self._nodes = nodes
+        return True
+
+    def lookup(self, key: str, n: int = 1) -> list[str]:
+        """The first `n` distinct nodes clockwise from `key`: the owner, then fallbacks."""
+        if not self._points:
+            return []
+        out: list[str] = []
+        i = bisect(self._points, _hash(key))
+        for k in range(len(self._points)):
+            node = self._owners[(i + k) % len(self._points)]
+            if node not in out:
+                out.append(node)
+                if len(out) == n:
+                    break
+        return out
@@ -0,0 +1,91 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Secondary indexes per collection. Each service applies the ones for the collections it
+# owns at startup (create_indexes is a no-op for indexes that already exist). Names are
+# fixed so a changed definition fails loudly instead of building a second index.
+INDEXES: dict[str, list[IndexModel]] = {
+    "rider_requests": [
+        # ListPendingAtStation: equality fields first, then the ETA range it sorts on
+        IndexModel([("station_id", ASCENDING), ("status", ASCENDING), ("dest_area", ASCENDING),
+                    ("eta_unix", ASCENDING)], name="station_status_dest_eta"),
+        # StreamPendingAtStation over every destination, in ETA order without a sort stage
+        IndexModel([("station_id", ASCENDING), ("status", ASCENDING), ("eta_unix", ASCENDING)],
+                   name="station_status_eta"),
+        # WatchPending snapshot and the expiry sweep
+        IndexModel([("status", ASCENDING), ("eta_unix", ASCENDING)], name="status_eta"),
+        # Rider history (gateway) and completing a trip's requests
+        IndexModel([("rider_id", ASCENDING), ("eta_unix", DESCENDING)], name="rider_eta"),
+    ],
+    "trips": [
+        IndexModel([("driver_id", ASCENDING), ("status", ASCENDING)], name="driver_status"),
+        # The outbox relay's scan for notifications embedded in trip documents
+        IndexModel([("outbox._id", ASCENDING)], name="embedded_outbox", sparse=True),
+    ],
+    "stations": [],   # looked up by _id only
+    "driver_routes": [
+        IndexModel([("driver_id", ASCENDING)], name="driver"),
+    ],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_timestamp"),
+        # Redelivered pushes upsert on (message_id, user_id); unique makes that race-free
+        IndexModel([("message_id", ASCENDING), ("user_id", ASCENDING)], name="message_user",
+                   unique=True, partialFilterExpression={"message_id": {"$exists": True}}),
+    ],
+    "users": [
+        IndexModel([("phone", ASCENDING)], name="phone"),
+    ],
+    "outbox": [
+        # The relay's claim query: due PENDING messages, and SENDING ones with a lapsed lease
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt"),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease"),
+    ],
+}
+
+# Queries on the request path or polled in the background; scripts/check_indexes.py
+# explains each against a live database and fails if one isn't served by a registered index.
+HOT_QUERIES: list[tuple[str, str, dict, list | None]] = [
+    # (description, collection, filter, sort)
+    ("ListPendingAtStation", "rider_requests",
+     {"station_id": "S1", "status": "PENDING", "dest_area": "A", "eta_unix": {"$gte": 0, "$lte": 1}},
+     [("eta_unix", 1)]),
+    ("ListPendingAtStation, any destination", "rider_requests",
+     {"station_id": "S1", "status": "PENDING", "eta_unix": {"$gte": 0, "$lte": 1}},
+     [("eta_unix", 1)]),
+    ("StreamPendingAtStation, closest to an anchor", "rider_requests",
+     {"station_id": "S1", "status": "PENDING", "eta_unix": {"$gte": 0, "$lt": 1}},
+     [("eta_unix", -1)]),
+    ("WatchPending snapshot", "rider_requests", {"status": "PENDING"}, None),
+    ("expired request sweep", "rider_requests",
+     {"status": "PENDING", "eta_unix": {"$lt": 0}}, None),
+    ("rider history", "rider_requests", {"rider_id": "r1"}, [("eta_unix", -1)]),
+    ("complete trip requests", "rider_requests",
+     {"rider_id": {"$in": ["r1", "r2"]}, "trip_id": "t1", "status": "ASSIGNED"}, None),
+    ("driver active trip", "trips",
+     {"driver_id": "d1", "status": {"$nin": ["COMPLETED", "CANCELLED"]}}, None),
+    ("embedded outbox scan", "trips", {"outbox._id": {"$exists": True}}, None),
+    ("driver route", "driver_routes", {"driver_id": "d1"}, None),
+    ("notification feed", "notifications", {"user_id": "u1"}, [("timestamp", -1)]),
+    ("unread notifications", "notifications", {"user_id": "u1", "read": False}, None),
+    ("notification dedup", "notifications", {"message_id": "m1", "user_id": "u1"}, None),
+    ("login by phone", "users", {"phone": "555"}, None),
+    ("outbox claim", "outbox",
+     {"$or": [{"status": "PENDING", "next_attempt_at": {"$lte": 0}},
+              {"status": "SENDING", "lease_until": {"$lt": 0}}]},
+     [("created_at", 1)]),
+]
+
+async def ensure_indexes(db, *collections: str):
+    """Create the registered indexes for `collections` (all of them if none are given).
+
+    A conflicting existing index (same name or keys, different options) is reported and
+    left alone rather than stopping the service from starting.
+    """
+    for name in collections or INDEXES:
+        models = INDEXES.get(name)
+        if not models:
+            continue
+        try:
+            await db[name].create_indexes(models)
+        except OperationFailure as e:
+            print(f"[indexes] {name}: {e}")
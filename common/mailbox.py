@@ -0,0 +1,36 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Hashable
+
+class LatestMailbox:
+    """Latest-value-wins mailbox.
+
+    put() never blocks: a value for a key that has not been taken yet is replaced and
+    counted in `dropped`. get() returns values in the order their keys first became
+    pending, always the newest value for that key, and None once closed and drained.
+    """
+
+    def __init__(self):
+        self._pending: OrderedDict[Hashable, Any] = OrderedDict()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, key: Hashable, value: Any):
+        if key in self._pending:
+            self.dropped += 1
+        self._pending[key] = value
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Any | None:
+        while not self._pending:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        _, value = self._pending.popitem(last=False)
+        return value
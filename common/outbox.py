@@ -0,0 +1,152 @@
+import asyncio
+import time
+import uuid
+from bson.objectid import ObjectId
+from lastmile.v1 import notification_pb2, rider_pb2
+
+# Relay tunables
+RELAY_BATCH        = 100   # messages claimed per drain
+RELAY_IDLE_S       = 1.0   # poll interval when nothing kicked the relay
+RELAY_LEASE_S      = 30    # a claimed batch is reclaimable after this (relay died mid-send)
+PUSH_TIMEOUT_S     = 2.0
+MAX_ATTEMPTS       = 8     # then a notification is parked as DEAD (rider sync keeps retrying)
+BACKOFF_BASE_S     = 1.0   # retry delay doubles per attempt, capped below
+BACKOFF_MAX_S      = 60.0
+
+def outbox_doc(user_ids: list[str], title: str, body: str, data_json: str, channel: str = "log") -> dict:
+    """A notification waiting to be pushed. Insert it in the same unit of work as the change it announces,
+    or embed it in the changed document's `outbox` array when that write is the only atomic one."""
+    now = time.time()
+    return {
+        "_id": ObjectId(),
+        "targets": [{"user_id": u, "channel": channel} for u in user_ids],
+        "title": title,
+        "body": body,
+        "data_json": data_json,
+        "status": "PENDING",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+def rider_sync_doc(method: str, **fields) -> dict:
+    """A RiderService call owed for a change to rider requests made (or decided) elsewhere,
+    so the rider service's feed, counters and caches hear of it. `method` takes a request
+    built from `fields` and must be idempotent."""
+    now = time.time()
+    return {
+        "_id": ObjectId(),
+        "kind": "rider",
+        "method": method,
+        "fields": fields,
+        "status": "PENDING",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+class OutboxRelay:
+    """Drains the outbox collection into NotificationService.Push, and rider sync messages
+    into the RiderService call they name.
+
+    Batches are claimed with a lease, so several relays can run side by side and a batch
+    held by a crashed relay is picked up again. Delivery is at-least-once; Push is called
+    with the outbox id as message_id so retries don't create duplicate notifications.
+
+    `sources` are collections whose documents carry messages in an embedded `outbox` array,
+    written atomically with the document itself. Each drain first moves those into the
+    outbox collection (upsert by id, then pull), so a crash between the two steps only
+    repeats the move.
+    """
+
+    def __init__(self, collection, notify_stub, sources=(), rider_stub=None):
+        self.outbox = collection
+        self.notify = notify_stub
+        self.rider = rider_stub
+        self.sources = list(sources)
+        self._owner = uuid.uuid4().hex
+        self._wake = asyncio.Event()
+
+    def kick(self):
+        """Drain now instead of at the next poll; call after writing to the outbox."""
+        self._wake.set()
+
+    async def _collect(self) -> int:
+        moved = 0
+        for src in self.sources:
+            async for doc in src.find({"outbox._id": {"$exists": True}}, {"outbox": 1}).limit(RELAY_BATCH):
+                msgs = doc["outbox"]
+                for m in msgs:
+                    await self.outbox.update_one({"_id": m["_id"]}, {"$setOnInsert": m}, upsert=True)
+                await src.update_one({"_id": doc["_id"]},
+                                     {"$pull": {"outbox": {"_id": {"$in": [m["_id"] for m in msgs]}}}})
+                moved += len(msgs)
+        return moved
+
+    async def _claim(self) -> list[dict]:
+        now = time.time()
+        due = {"$or": [
+            {"status": "PENDING", "next_attempt_at": {"$lte": now}},
+            {"status": "SENDING", "lease_until": {"$lt": now}},
+        ]}
+        ids = [d["_id"] async for d in self.outbox.find(due, {"_id": 1}).sort("created_at", 1).limit(RELAY_BATCH)]
+        if not ids:
+            return []
+        await self.outbox.update_many(
+            {"$and": [{"_id": {"$in": ids}}, due]},
+            {"$set": {"status": "SENDING", "owner": self._owner, "lease_until": now + RELAY_LEASE_S}},
+        )
+        return await self.outbox.find({"_id": {"$in": ids}, "owner": self._owner, "status": "SENDING"}).to_list()
+
+    async def _push(self, msg: dict):
+        if msg.get("kind") == "rider":
+            req = getattr(rider_pb2, f"{msg['method']}Request")(**msg["fields"])
+            await getattr(self.rider, msg["method"])(req, timeout=PUSH_TIMEOUT_S)
+            return
+        await self.notify.Push(notification_pb2.PushRequest(
+            targets=[notification_pb2.PushTarget(**t) for t in msg["targets"]],
+            title=msg["title"], body=msg["body"], data_json=msg["data_json"],
+            message_id=str(msg["_id"]),
+        ), timeout=PUSH_TIMEOUT_S)
+
+    async def drain_once(self) -> int:
+        await self._collect()
+        batch = await self._claim()
+        if not batch:
+            return 0
+        results = await asyncio.gather(*(self._push(m) for m in batch), return_exceptions=True)
+        sent = [m["_id"] for m, r in zip(batch, results) if not isinstance(r, Exception)]
+        if sent:
+            await self.outbox.delete_many({"_id": {"$in": sent}, "owner": self._owner})
+        now = time.time()
+        for m, r in zip(batch, results):
+            if not isinstance(r, Exception):
+                continue
+            attempts = m["attempts"] + 1
+            # A lost rider sync would leave the rider service wrong until its next reconcile
+            dead = attempts >= MAX_ATTEMPTS and m.get("kind") != "rider"
+            status = "DEAD" if dead else "PENDING"
+            delay = min(BACKOFF_BASE_S * 2 ** (attempts - 1), BACKOFF_MAX_S)
+            await self.outbox.update_one(
+                {"_id": m["_id"], "owner": self._owner},
+                {"$set": {"status": status, "attempts": attempts, "next_attempt_at": now + delay,
+                          "last_error": repr(r)}, "$unset": {"owner": "", "lease_until": ""}},
+            )
+            print(f"[outbox] push {m['_id']} failed (attempt {attempts}, {status}): {r!r}")
+        return len(batch)
+
+    async def run(self):
+        print("[outbox] Starting relay...")
+        while True:
+            self._wake.clear()   # before draining, so a kick() during the drain isn't lost
+            try:
+                n = await self.drain_once()
+            except Exception as e:
+                print(f"[outbox] Error in relay: {e}")
+                n = 0
+            if n >= RELAY_BATCH:
+                continue  # more may be due
+            try:
+                await asyncio.wait_for(self._wake.wait(), RELAY_IDLE_S)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,53 @@
+from bisect import bisect_left, bisect_right, insort
+from lastmile.v1 import common_pb2
+from common.areas import normalize
+
+class PendingIndex:
+    """PENDING rider requests keyed by (station_id, normalised dest_area), each bucket
+    sorted by eta_unix.
+
+    Fed by RiderService.WatchPending; lookups are in-process range queries.
+    """
+
+    def __init__(self):
+        self._buckets: dict[tuple[str, str], list[tuple[int, str]]] = {}  # key -> sorted (eta_unix, id)
+        self._by_id: dict[str, common_pb2.RiderRequest] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._by_id
+
+    def get(self, request_id: str) -> common_pb2.RiderRequest | None:
+        return self._by_id.get(request_id)
+
+    def upsert(self, r: common_pb2.RiderRequest):
+        self.remove(r.id)
+        self._by_id[r.id] = r
+        insort(self._buckets.setdefault((r.station_id, normalize(r.dest_area)), []), (r.eta_unix, r.id))
+
+    def remove(self, request_id: str):
+        r = self._by_id.pop(request_id, None)
+        if r is None:
+            return
+        key = (r.station_id, normalize(r.dest_area))
+        bucket = self._buckets[key]
+        i = bisect_left(bucket, (r.eta_unix, r.id))
+        if i < len(bucket) and bucket[i][1] == r.id:
+            bucket.pop(i)
+        if not bucket:
+            del self._buckets[key]
+
+    def count(self, station_id: str) -> int:
+        """PENDING requests at a station, any destination."""
+        return sum(len(b) for (sid, _), b in self._buckets.items() if sid == station_id)
+
+    def range(self, station_id: str, dest_area: str, lo: int, hi: int) -> list[common_pb2.RiderRequest]:
+        """Requests with lo <= eta_unix <= hi, in eta order."""
+        bucket = self._buckets.get((station_id, normalize(dest_area)))
+        if not bucket:
+            return []
+        i = bisect_left(bucket, (lo, ""))
+        j = bisect_right(bucket, (hi, "\uffff"))
+        return [self._by_id[rid] for _, rid in bucket[i:j]]
@@ -1,6 +1,7 @@
 import asyncio
+import inspect
 import grpc
-from typing import Callable
+from typing import Awaitable, Callable
 
 async def run_grpc(server, host_port: str):
     server.add_insecure_port(host_port)
@@ -8,8 +9,10 @@ async def run_grpc(server, host_port: str):
     print(f"[grpc] listening on {host_port}")
     await server.wait_for_termination()
 
-def serve(factory: Callable[[], grpc.aio.Server], host_port: str):
+def serve(factory: Callable[[], grpc.aio.Server | Awaitable[grpc.aio.Server]], host_port: str):
     async def _main():
         server = factory()
+        if inspect.isawaitable(server):  # factories with async setup (e.g. creating indexes)
+            server = await server
         await run_grpc(server, host_port)
     asyncio.run(_main())
@@ -0,0 +1,48 @@
+import json
+import random
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+
+class DecisionTrace:
+    """Sampled structured records in a ring buffer, optionally appended to a JSONL file.
+
+    Keys starting with "_" are working state and are dropped when a record is stored.
+    """
+
+    def __init__(self, capacity: int = 2000, sample: float = 1.0, path: str = ""):
+        self.sample = sample
+        self._ring: deque[dict] = deque(maxlen=capacity)
+        self._file = open(path, "a", buffering=1) if path else None
+
+    def sampled(self) -> bool:
+        return self.sample >= 1.0 or random.random() < self.sample
+
+    def record(self, rec: dict):
+        rec = {k: v for k, v in rec.items() if not k.startswith("_")}
+        self._ring.append(rec)
+        if self._file is not None:
+            try:
+                self._file.write(json.dumps(rec) + "\n")
+            except (OSError, TypeError, ValueError) as e:
+                print(f"[trace] file sink write failed: {e!r}")
+
+    def recent(self, limit: int = 100, **match) -> list[dict]:
+        """Newest first; empty match values are ignored."""
+        out = []
+        for rec in reversed(self._ring):
+            if all(not v or rec.get(k) == v for k, v in match.items()):
+                out.append(rec)
+                if len(out) >= limit:
+                    break
+        return out
+
+@contextmanager
+def span(rec: dict, name: str):
+    """Add the time spent in the block to rec["stage_ms"][name]."""
+    t0 = perf_counter()
+    try:
+        yield
+    finally:
+        stages = rec.setdefault("stage_ms", {})
+        stages[name] = stages.get(name, 0.0) + (perf_counter() - t0) * 1000
@@ -24,5 +24,7 @@ export const api = {
   markAllNotificationsRead: (userId: string) => client.put('/notifications/read-all', { user_id: userId }),
   clearNotifications: (userId: string) => client.delete(`/notifications/clear?user_id=${userId}`),
   getRiderRequests: (riderId: string) => client.get(`/rider/my-requests?rider_id=${riderId}`),
+  getActiveRiderRequest: (riderId: string) => client.get(`/rider/active-request?rider_id=${riderId}`),
+  getDemand: (stationId: string = '') => client.get(`/demand?station_id=${stationId}`),
   deleteRoute: (routeId: string) => client.delete(`/driver/route/${routeId}`),
 };
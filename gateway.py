@@ -1,7 +1,8 @@
 # gateway.py
 import os
+import json
 import time
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import grpc
 from google.protobuf.json_format import MessageToDict
@@ -28,6 +29,8 @@ DRIVER_ADDR = os.getenv("DRIVER_ADDR", "localhost:50053")
 RIDER_ADDR = os.getenv("RIDER_ADDR", "localhost:50054")
 LOCATION_ADDR = os.getenv("LOCATION_ADDR", "localhost:50058")
 
+BOARD_MAX_LIMIT = 5000   # largest ?limit= the live board accepts; without one it is uncapped
+
 # --- Helper functions to get gRPC stubs ---
 def get_user_stub():
     channel = grpc.insecure_channel(USER_ADDR)
@@ -117,6 +120,22 @@ def list_stations():
     except grpc.RpcError as e:
         return jsonify({"error": e.details()}), 500
 
+@app.route('/api/areas/suggest', methods=['GET'])
+def suggest_areas():
+    """Autocomplete for destination areas, with the stations that serve them"""
+    prefix = request.args.get('q', '')
+    limit = int(request.args.get('limit', 10))
+    stub = get_station_stub()
+    try:
+        resp = stub.SuggestAreas(station_pb2.SuggestAreasRequest(prefix=prefix, limit=limit))
+        return jsonify([{
+            "area": a.display_name,
+            "key": a.area,
+            "stationIds": list(a.station_ids),
+        } for a in resp.areas]), 200
+    except grpc.RpcError as e:
+        return jsonify({"error": e.details()}), 500
+
 
 # 3. Rider Operations
 @app.route('/api/rider/request', methods=['POST'])
@@ -156,46 +175,95 @@ def get_rider_requests():
     station_id = request.args.get('station_id')
     if not station_id:
         return jsonify({"error": "station_id required"}), 400
+    limit = request.args.get('limit', type=int)
+    limit = max(1, min(limit, BOARD_MAX_LIMIT)) if limit is not None else 0   # 0 = whole window
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
         
     stub = get_rider_stub()
     try:
         now = int(time.time())
-        # List requests +/- 30 mins window
-        resp = stub.ListPendingAtStation(rider_pb2.ListPendingAtStationRequest(
+        # Stream requests +/- 30 mins window, every destination
+        call = stub.StreamPendingAtStation(rider_pb2.StreamPendingAtStationRequest(
             station_id=station_id,
             now_unix=now,
             minutes_window=30,
-            dest_area="" # Empty matches all
+            max_count=limit,
+            fields=fields,
         ))
-        requests = [MessageToDict(r) for r in resp.requests]
-        return jsonify(requests), 200
+        first = next(call, None)  # errors surface here, before the 200 is sent
     except grpc.RpcError as e:
-        return jsonify({"error": e.details()}), 500
+        status = 400 if e.code() == grpc.StatusCode.INVALID_ARGUMENT else 500   # e.g. unknown fields
+        return jsonify({"error": e.details()}), status
+
+    def rows():
+        # A JSON array written row by row instead of built in memory
+        yield "["
+        r = first
+        sep = ""
+        try:
+            while r is not None:
+                yield sep + json.dumps(MessageToDict(r))
+                sep = ","
+                r = next(call, None)
+        except grpc.RpcError as e:
+            print(f"[gateway] live board stream for {station_id} cut short: {e.code()}")
+        finally:
+            call.cancel()
+        yield "]"
+    return Response(rows(), mimetype="application/json"), 200
 
 @app.route('/api/rider/my-requests', methods=['GET'])
 def get_my_rider_requests():
-    """Fetch all requests for a specific rider directly from DB"""
+    """Fetch a rider's recent requests, newest first (cached by the Rider Service)"""
     rider_id = request.args.get('rider_id')
     if not rider_id:
         return jsonify({"error": "rider_id required"}), 400
-        
-    db = get_db()
-    # Get last 20 requests, newest first
-    requests = list(db.rider_requests.find({"rider_id": rider_id}).sort("eta_unix", -1).limit(20))
-    
-    # Convert ObjectId to string and format for frontend
+
+    stub = get_rider_stub()
+    try:
+        resp = stub.ListRiderHistory(rider_pb2.ListRiderHistoryRequest(rider_id=rider_id, limit=20))
+    except grpc.RpcError as e:
+        return jsonify({"error": e.details()}), 500
+
     out = []
-    for r in requests:
+    for r in resp.requests:
         out.append({
-            "id": str(r["_id"]),
-            "stationId": r["station_id"],
-            "destination": r["dest_area"],
-            "etaUnix": r["eta_unix"],
-            "status": r["status"]
+            "id": r.id,
+            "stationId": r.station_id,
+            "destination": r.dest_area,
+            "etaUnix": r.eta_unix,
+            "status": r.status
         })
-        
+
     return jsonify(out), 200
 
+@app.route('/api/rider/active-request', methods=['GET'])
+def get_active_rider_request():
+    """The rider's current PENDING or ASSIGNED request, or null"""
+    rider_id = request.args.get('rider_id')
+    if not rider_id:
+        return jsonify({"error": "rider_id required"}), 400
+
+    stub = get_rider_stub()
+    try:
+        resp = stub.GetActiveRequest(rider_pb2.GetActiveRequestRequest(rider_id=rider_id))
+    except grpc.RpcError as e:
+        return jsonify({"error": e.details()}), 500
+    return jsonify(MessageToDict(resp.request) if resp.found else None), 200
+
+@app.route('/api/demand', methods=['GET'])
+def get_demand():
+    """PENDING riders per station and destination (optionally one station), for drivers
+    choosing a route and for dashboards, without querying Mongo"""
+    station_id = request.args.get('station_id', '')
+
+    stub = get_rider_stub()
+    try:
+        resp = stub.GetDemand(rider_pb2.GetDemandRequest(station_id=station_id))
+    except grpc.RpcError as e:
+        return jsonify({"error": e.details()}), 500
+    return jsonify(MessageToDict(resp)), 200
+
 
 # 4. Driver Operations
 @app.route('/api/driver/route', methods=['POST'])
@@ -323,7 +391,7 @@ def get_active_driver_trip():
     trip = db.trips.find_one({
         "driver_id": driver_id,
         "status": {"$nin": ["COMPLETED", "CANCELLED"]}
-    })
+    }, {"outbox": 0})
     
     if trip:
         trip['id'] = str(trip.pop('_id'))
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18lastmile/v1/driver.proto\x12\x0blastmile.v1\"D\n\x0cRouteStation\x12\x12\n\nstation_id\x18\x01 \x01(\t\x12 \n\x18minutes_before_eta_match\x18\x02 \x01(\x05\"\x95\x01\n\x0b\x44riverRoute\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tdriver_id\x18\x02 \x01(\t\x12\x11\n\tdest_area\x18\x03 \x01(\t\x12\x13\n\x0bseats_total\x18\x04 \x01(\x05\x12\x12\n\nseats_free\x18\x05 \x01(\x05\x12+\n\x08stations\x18\x06 \x03(\x0b\x32\x19.lastmile.v1.RouteStation\"?\n\x14RegisterRouteRequest\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\"@\n\x15RegisterRouteResponse\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\":\n\x12UpdateSeatsRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\x12\x12\n\nseats_free\x18\x02 \x01(\x05\">\n\x13UpdateSeatsResponse\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\"#\n\x0fGetRouteRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\";\n\x10GetRouteResponse\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\"&\n\x12\x44\x65leteRouteRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\"\'\n\x13\x44\x65leteRouteResponse\x12\x10\n\x08route_id\x18\x01 \x01(\t2\xd4\x02\n\rDriverService\x12V\n\rRegisterRoute\x12!.lastmile.v1.RegisterRouteRequest\x1a\".lastmile.v1.RegisterRouteResponse\x12P\n\x0bUpdateSeats\x12\x1f.lastmile.v1.UpdateSeatsRequest\x1a .lastmile.v1.UpdateSeatsResponse\x12G\n\x08GetRoute\x12\x1c.lastmile.v1.GetRouteRequest\x1a\x1d.lastmile.v1.GetRouteResponse\x12P\n\x0b\x44\x65leteRoute\x12\x1f.lastmile.v1.DeleteRouteRequest\x1a .lastmile.v1.DeleteRouteResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18lastmile/v1/driver.proto\x12\x0blastmile.v1\"D\n\x0cRouteStation\x12\x12\n\nstation_id\x18\x01 \x01(\t\x12 \n\x18minutes_before_eta_match\x18\x02 \x01(\x05\"\xa6\x01\n\x0b\x44riverRoute\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tdriver_id\x18\x02 \x01(\t\x12\x11\n\tdest_area\x18\x03 \x01(\t\x12\x13\n\x0bseats_total\x18\x04 \x01(\x05\x12\x12\n\nseats_free\x18\x05 \x01(\x05\x12+\n\x08stations\x18\x06 \x03(\x0b\x32\x19.lastmile.v1.RouteStation\x12\x0f\n\x07version\x18\x07 \x01(\x03\"?\n\x14RegisterRouteRequest\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\"@\n\x15RegisterRouteResponse\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\":\n\x12UpdateSeatsRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\x12\x12\n\nseats_free\x18\x02 \x01(\x05\">\n\x13UpdateSeatsResponse\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\"7\n\x0fGetRouteRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\x12\x12\n\nif_version\x18\x02 \x01(\x03\"Q\n\x10GetRouteResponse\x12\'\n\x05route\x18\x01 \x01(\x0b\x32\x18.lastmile.v1.DriverRoute\x12\x14\n\x0cnot_modified\x18\x02 \x01(\x08\"%\n\x10GetRoutesRequest\x12\x11\n\troute_ids\x18\x01 \x03(\t\"=\n\x11GetRoutesResponse\x12(\n\x06routes\x18\x01 \x03(\x0b\x32\x18.lastmile.v1.DriverRoute\"&\n\x12\x44\x65leteRouteRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\"\'\n\x13\x44\x65leteRouteResponse\x12\x10\n\x08route_id\x18\x01 \x01(\t\"\'\n\x13RouteChangedRequest\x12\x10\n\x08route_id\x18\x01 \x01(\t\"\x16\n\x14RouteChangedResponse2\xf5\x03\n\rDriverService\x12V\n\rRegisterRoute\x12!.lastmile.v1.RegisterRouteRequest\x1a\".lastmile.v1.RegisterRouteResponse\x12P\n\x0bUpdateSeats\x12\x1f.lastmile.v1.UpdateSeatsRequest\x1a .lastmile.v1.UpdateSeatsResponse\x12G\n\x08GetRoute\x12\x1c.lastmile.v1.GetRouteRequest\x1a\x1d.lastmile.v1.GetRouteResponse\x12J\n\tGetRoutes\x12\x1d.lastmile.v1.GetRoutesRequest\x1a\x1e.lastmile.v1.GetRoutesResponse\x12P\n\x0b\x44\x65leteRoute\x12\x1f.lastmile.v1.DeleteRouteRequest\x1a .lastmile.v1.DeleteRouteResponse\x12S\n\x0cRouteChanged\x12 .lastmile.v1.RouteChangedRequest\x1a!.lastmile.v1.RouteChangedResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,23 +35,31 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_ROUTESTATION']._serialized_start=41
   _globals['_ROUTESTATION']._serialized_end=109
   _globals['_DRIVERROUTE']._serialized_start=112
-  _globals['_DRIVERROUTE']._serialized_end=261
-  _globals['_REGISTERROUTEREQUEST']._serialized_start=263
-  _globals['_REGISTERROUTEREQUEST']._serialized_end=326
-  _globals['_REGISTERROUTERESPONSE']._serialized_start=328
-  _globals['_REGISTERROUTERESPONSE']._serialized_end=392
-  _globals['_UPDATESEATSREQUEST']._serialized_start=394
-  _globals['_UPDATESEATSREQUEST']._serialized_end=452
-  _globals['_UPDATESEATSRESPONSE']._serialized_start=454
-  _globals['_UPDATESEATSRESPONSE']._serialized_end=516
-  _globals['_GETROUTEREQUEST']._serialized_start=518
-  _globals['_GETROUTEREQUEST']._serialized_end=553
-  _globals['_GETROUTERESPONSE']._serialized_start=555
-  _globals['_GETROUTERESPONSE']._serialized_end=614
-  _globals['_DELETEROUTEREQUEST']._serialized_start=616
-  _globals['_DELETEROUTEREQUEST']._serialized_end=654
-  _globals['_DELETEROUTERESPONSE']._serialized_start=656
-  _globals['_DELETEROUTERESPONSE']._serialized_end=695
-  _globals['_DRIVERSERVICE']._serialized_start=698
-  _globals['_DRIVERSERVICE']._serialized_end=1038
+  _globals['_DRIVERROUTE']._serialized_end=278
+  _globals['_REGISTERROUTEREQUEST']._serialized_start=280
+  _globals['_REGISTERROUTEREQUEST']._serialized_end=343
+  _globals['_REGISTERROUTERESPONSE']._serialized_start=345
+  _globals['_REGISTERROUTERESPONSE']._serialized_end=409
+  _globals['_UPDATESEATSREQUEST']._serialized_start=411
+  _globals['_UPDATESEATSREQUEST']._serialized_end=469
+  _globals['_UPDATESEATSRESPONSE']._serialized_start=471
+  _globals['_UPDATESEATSRESPONSE']._serialized_end=533
+  _globals['_GETROUTEREQUEST']._serialized_start=535
+  _globals['_GETROUTEREQUEST']._serialized_end=590
+  _globals['_GETROUTERESPONSE']._serialized_start=592
+  _globals['_GETROUTERESPONSE']._serialized_end=673
+  _globals['_GETROUTESREQUEST']._serialized_start=675
+  _globals['_GETROUTESREQUEST']._serialized_end=712
+  _globals['_GETROUTESRESPONSE']._serialized_start=714
+  _globals['_GETROUTESRESPONSE']._serialized_end=775
+  _globals['_DELETEROUTEREQUEST']._serialized_start=777
+  _globals['_DELETEROUTEREQUEST']._serialized_end=815
+  _globals['_DELETEROUTERESPONSE']._serialized_start=817
+  _globals['_DELETEROUTERESPONSE']._serialized_end=856
+  _globals['_ROUTECHANGEDREQUEST']._serialized_start=858
+  _globals['_ROUTECHANGEDREQUEST']._serialized_end=897
+  _globals['_ROUTECHANGEDRESPONSE']._serialized_start=899
+  _globals['_ROUTECHANGEDRESPONSE']._serialized_end=921
+  _globals['_DRIVERSERVICE']._serialized_start=924
+  _globals['_DRIVERSERVICE']._serialized_end=1425
 # @@protoc_insertion_point(module_scope)
@@ -49,11 +49,21 @@ class DriverServiceStub(object):
                 request_serializer=lastmile_dot_v1_dot_driver__pb2.GetRouteRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_driver__pb2.GetRouteResponse.FromString,
                 _registered_method=True)
+        self.GetRoutes = channel.unary_unary(
+                '/lastmile.v1.DriverService/GetRoutes',
+                request_serializer=lastmile_dot_v1_dot_driver__pb2.GetRoutesRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_driver__pb2.GetRoutesResponse.FromString,
+                _registered_method=True)
         self.DeleteRoute = channel.unary_unary(
                 '/lastmile.v1.DriverService/DeleteRoute',
                 request_serializer=lastmile_dot_v1_dot_driver__pb2.DeleteRouteRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_driver__pb2.DeleteRouteResponse.FromString,
                 _registered_method=True)
+        self.RouteChanged = channel.unary_unary(
+                '/lastmile.v1.DriverService/RouteChanged',
+                request_serializer=lastmile_dot_v1_dot_driver__pb2.RouteChangedRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_driver__pb2.RouteChangedResponse.FromString,
+                _registered_method=True)
 
 
 class DriverServiceServicer(object):
@@ -77,12 +87,26 @@ class DriverServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetRoutes(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def DeleteRoute(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RouteChanged(self, request, context):
+        """A route was written by another service (seats reserved, route deleted); the driver
+        service re-reads it so cached reads see the change at once.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_DriverServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -101,11 +125,21 @@ def add_DriverServiceServicer_to_server(servicer, server):
                     request_deserializer=lastmile_dot_v1_dot_driver__pb2.GetRouteRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_driver__pb2.GetRouteResponse.SerializeToString,
             ),
+            'GetRoutes': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetRoutes,
+                    request_deserializer=lastmile_dot_v1_dot_driver__pb2.GetRoutesRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_driver__pb2.GetRoutesResponse.SerializeToString,
+            ),
             'DeleteRoute': grpc.unary_unary_rpc_method_handler(
                     servicer.DeleteRoute,
                     request_deserializer=lastmile_dot_v1_dot_driver__pb2.DeleteRouteRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_driver__pb2.DeleteRouteResponse.SerializeToString,
             ),
+            'RouteChanged': grpc.unary_unary_rpc_method_handler(
+                    servicer.RouteChanged,
+                    request_deserializer=lastmile_dot_v1_dot_driver__pb2.RouteChangedRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_driver__pb2.RouteChangedResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lastmile.v1.DriverService', rpc_method_handlers)
@@ -198,6 +232,33 @@ class DriverService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetRoutes(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.DriverService/GetRoutes',
+            lastmile_dot_v1_dot_driver__pb2.GetRoutesRequest.SerializeToString,
+            lastmile_dot_v1_dot_driver__pb2.GetRoutesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def DeleteRoute(request,
             target,
@@ -224,3 +285,30 @@ class DriverService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def RouteChanged(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.DriverService/RouteChanged',
+            lastmile_dot_v1_dot_driver__pb2.RouteChangedRequest.SerializeToString,
+            lastmile_dot_v1_dot_driver__pb2.RouteChangedResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
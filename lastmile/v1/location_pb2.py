@@ -23,9 +23,10 @@ _sym_db = _symbol_database.Default()
 
 
 from lastmile.v1 import common_pb2 as lastmile_dot_v1_dot_common__pb2
+from lastmile.v1 import matching_pb2 as lastmile_dot_v1_dot_matching__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1alastmile/v1/location.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"j\n\x0e\x44riverLocation\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\"\n\x05point\x18\x02 \x01(\x0b\x32\x13.lastmile.v1.LatLng\x12\x0f\n\x07ts_unix\x18\x03 \x01(\x03\x12\x10\n\x08route_id\x18\x04 \x01(\t\"\x1f\n\x11LocationStreamAck\x12\n\n\x02ok\x18\x01 \x01(\x08\x32h\n\x0fLocationService\x12U\n\x14StreamDriverLocation\x12\x1b.lastmile.v1.DriverLocation\x1a\x1e.lastmile.v1.LocationStreamAck(\x01\x42?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1alastmile/v1/location.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\x1a\x1alastmile/v1/matching.proto\"j\n\x0e\x44riverLocation\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\"\n\x05point\x18\x02 \x01(\x0b\x32\x13.lastmile.v1.LatLng\x12\x0f\n\x07ts_unix\x18\x03 \x01(\x03\x12\x10\n\x08route_id\x18\x04 \x01(\t\"w\n\x0bStreamMatch\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12\x12\n\nstation_id\x18\x02 \x01(\t\x12\x14\n\x0cping_ts_unix\x18\x03 \x01(\x03\x12\x14\n\x0ctry_match_ms\x18\x04 \x01(\x01\x12\x17\n\x0fping_to_trip_ms\x18\x05 \x01(\x01\"\xb8\x01\n\x11LocationStreamAck\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\r\n\x05pings\x18\x02 \x01(\x05\x12\x19\n\x11geofence_triggers\x18\x03 \x01(\x05\x12\x14\n\x0ctry_match_ms\x18\x04 \x03(\x01\x12)\n\x07matches\x18\x05 \x03(\x0b\x32\x18.lastmile.v1.StreamMatch\x12\x15\n\rpings_dropped\x18\x06 \x01(\x05\x12\x15\n\rprepare_hints\x18\x07 \x01(\x05\"\xd2\x01\n\x0b\x44riverEvent\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x11\n\tdriver_id\x18\x02 \x01(\t\x12\x10\n\x08route_id\x18\x03 \x01(\t\x12\x12\n\nstation_id\x18\x04 \x01(\t\x12\x0f\n\x07trip_id\x18\x05 \x01(\t\x12,\n\x0b\x61ssignments\x18\x06 \x03(\x0b\x32\x17.lastmile.v1.Assignment\x12\x17\n\x0fseats_remaining\x18\x07 \x01(\x05\x12\x0f\n\x07ts_unix\x18\x08 \x01(\x03\x12\x13\n\x0btrip_status\x18\t \x01(\t2\xb4\x01\n\x0fLocationService\x12U\n\x14StreamDriverLocation\x12\x1b.lastmile.v1.DriverLocation\x1a\x1e.lastmile.v1.LocationStreamAck(\x01\x12J\n\rDriverSession\x12\x1b.lastmile.v1.DriverLocation\x1a\x18.lastmile.v1.DriverEvent(\x01\x30\x01\x42?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -33,10 +34,14 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'lastmile.v1.location_pb2',
 if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._loaded_options = None
   _globals['DESCRIPTOR']._serialized_options = b'Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1'
-  _globals['_DRIVERLOCATION']._serialized_start=69
-  _globals['_DRIVERLOCATION']._serialized_end=175
-  _globals['_LOCATIONSTREAMACK']._serialized_start=177
-  _globals['_LOCATIONSTREAMACK']._serialized_end=208
-  _globals['_LOCATIONSERVICE']._serialized_start=210
-  _globals['_LOCATIONSERVICE']._serialized_end=314
+  _globals['_DRIVERLOCATION']._serialized_start=97
+  _globals['_DRIVERLOCATION']._serialized_end=203
+  _globals['_STREAMMATCH']._serialized_start=205
+  _globals['_STREAMMATCH']._serialized_end=324
+  _globals['_LOCATIONSTREAMACK']._serialized_start=327
+  _globals['_LOCATIONSTREAMACK']._serialized_end=511
+  _globals['_DRIVEREVENT']._serialized_start=514
+  _globals['_DRIVEREVENT']._serialized_end=724
+  _globals['_LOCATIONSERVICE']._serialized_start=727
+  _globals['_LOCATIONSERVICE']._serialized_end=907
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,11 @@ class LocationServiceStub(object):
                 request_serializer=lastmile_dot_v1_dot_location__pb2.DriverLocation.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_location__pb2.LocationStreamAck.FromString,
                 _registered_method=True)
+        self.DriverSession = channel.stream_stream(
+                '/lastmile.v1.LocationService/DriverSession',
+                request_serializer=lastmile_dot_v1_dot_location__pb2.DriverLocation.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_location__pb2.DriverEvent.FromString,
+                _registered_method=True)
 
 
 class LocationServiceServicer(object):
@@ -50,6 +55,15 @@ class LocationServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def DriverSession(self, request_iterator, context):
+        """Same pings as StreamDriverLocation; match events and trip status changes for the
+        driver are pushed back down the stream as they happen instead of waiting for the
+        notification poll.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LocationServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +72,11 @@ def add_LocationServiceServicer_to_server(servicer, server):
                     request_deserializer=lastmile_dot_v1_dot_location__pb2.DriverLocation.FromString,
                     response_serializer=lastmile_dot_v1_dot_location__pb2.LocationStreamAck.SerializeToString,
             ),
+            'DriverSession': grpc.stream_stream_rpc_method_handler(
+                    servicer.DriverSession,
+                    request_deserializer=lastmile_dot_v1_dot_location__pb2.DriverLocation.FromString,
+                    response_serializer=lastmile_dot_v1_dot_location__pb2.DriverEvent.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lastmile.v1.LocationService', rpc_method_handlers)
@@ -95,3 +114,30 @@ class LocationService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def DriverSession(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/lastmile.v1.LocationService/DriverSession',
+            lastmile_dot_v1_dot_location__pb2.DriverLocation.SerializeToString,
+            lastmile_dot_v1_dot_location__pb2.DriverEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1alastmile/v1/matching.proto\x12\x0blastmile.v1\"d\n\x0fTryMatchRequest\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\x10\n\x08route_id\x18\x02 \x01(\t\x12\x12\n\nstation_id\x18\x03 \x01(\t\x12\x18\n\x10\x61rrival_eta_unix\x18\x04 \x01(\x03\"8\n\nAssignment\x12\x18\n\x10rider_request_id\x18\x01 \x01(\t\x12\x10\n\x08rider_id\x18\x02 \x01(\t\"j\n\x10TryMatchResponse\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12,\n\x0b\x61ssignments\x18\x02 \x03(\x0b\x32\x17.lastmile.v1.Assignment\x12\x17\n\x0fseats_remaining\x18\x03 \x01(\x05\x32Z\n\x0fMatchingService\x12G\n\x08TryMatch\x12\x1c.lastmile.v1.TryMatchRequest\x1a\x1d.lastmile.v1.TryMatchResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1alastmile/v1/matching.proto\x12\x0blastmile.v1\"}\n\x0fTryMatchRequest\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\x10\n\x08route_id\x18\x02 \x01(\t\x12\x12\n\nstation_id\x18\x03 \x01(\t\x12\x18\n\x10\x61rrival_eta_unix\x18\x04 \x01(\x03\x12\x17\n\x0fidempotency_key\x18\x05 \x01(\t\"8\n\nAssignment\x12\x18\n\x10rider_request_id\x18\x01 \x01(\t\x12\x10\n\x08rider_id\x18\x02 \x01(\t\"j\n\x10TryMatchResponse\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12,\n\x0b\x61ssignments\x18\x02 \x03(\x0b\x32\x17.lastmile.v1.Assignment\x12\x17\n\x0fseats_remaining\x18\x03 \x01(\x05\"F\n\x14TryMatchBatchRequest\x12.\n\x08triggers\x18\x01 \x03(\x0b\x32\x1c.lastmile.v1.TryMatchRequest\"P\n\x0eTryMatchResult\x12/\n\x08response\x18\x01 \x01(\x0b\x32\x1d.lastmile.v1.TryMatchResponse\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"E\n\x15TryMatchBatchResponse\x12,\n\x07results\x18\x01 \x03(\x0b\x32\x1b.lastmile.v1.TryMatchResult\"h\n\x13PrepareMatchRequest\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\x10\n\x08route_id\x18\x02 \x01(\t\x12\x12\n\nstation_id\x18\x03 \x01(\t\x12\x18\n\x10\x61rrival_eta_unix\x18\x04 \x01(\x03\"_\n\x14PrepareMatchResponse\x12\x18\n\x10held_request_ids\x18\x01 \x03(\t\x12\x12\n\nseats_free\x18\x02 \x01(\x05\x12\x19\n\x11hold_expires_unix\x18\x03 \x01(\x03\"[\n\x13GetDecisionsRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\x12\n\nstation_id\x18\x02 \x01(\t\x12\x11\n\tdriver_id\x18\x03 \x01(\t\x12\x0e\n\x06reason\x18\x04 \x01(\t\"\x97\x04\n\rMatchDecision\x12\x0f\n\x07ts_unix\x18\x01 \x01(\x03\x12\x11\n\tdriver_id\x18\x02 \x01(\t\x12\x10\n\x08route_id\x18\x03 \x01(\t\x12\x12\n\nstation_id\x18\x04 \x01(\t\x12\x18\n\x10\x61rrival_eta_unix\x18\x05 \x01(\x03\x12\x0c\n\x04mode\x18\x06 \x01(\t\x12\x11\n\tdest_area\x18\x07 \x01(\t\x12\x12\n\nseats_free\x18\x08 \x01(\x05\x12\x12\n\ncandidates\x18\t \x01(\x05\x12\x0c\n\x04held\x18\n \x01(\x05\x12\x1a\n\x12\x63hosen_request_ids\x18\x0b \x03(\t\x12\x14\n\x0c\x63hosen_gap_s\x18\x0c \x03(\x03\x12\x0e\n\x06reason\x18\r \x01(\t\x12\x0f\n\x07trip_id\x18\x0e \x01(\t\x12\x17\n\x0fseats_remaining\x18\x0f \x01(\x05\x12\x39\n\x08stage_ms\x18\x10 \x03(\x0b\x32\'.lastmile.v1.MatchDecision.StageMsEntry\x12\r\n\x05\x65rror\x18\x11 \x01(\t\x12\x1a\n\x12pending_at_station\x18\x12 \x01(\x05\x12\x1a\n\x12\x63ompatible_pending\x18\x13 \x01(\x05\x12\x15\n\rnearest_gap_s\x18\x14 \x01(\x03\x12\x16\n\x0ewindow_minutes\x18\x15 \x01(\x05\x1a.\n\x0cStageMsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"E\n\x14GetDecisionsResponse\x12-\n\tdecisions\x18\x01 \x03(\x0b\x32\x1a.lastmile.v1.MatchDecision2\xdc\x02\n\x0fMatchingService\x12G\n\x08TryMatch\x12\x1c.lastmile.v1.TryMatchRequest\x1a\x1d.lastmile.v1.TryMatchResponse\x12V\n\rTryMatchBatch\x12!.lastmile.v1.TryMatchBatchRequest\x1a\".lastmile.v1.TryMatchBatchResponse\x12S\n\x0cPrepareMatch\x12 .lastmile.v1.PrepareMatchRequest\x1a!.lastmile.v1.PrepareMatchResponse\x12S\n\x0cGetDecisions\x12 .lastmile.v1.GetDecisionsRequest\x1a!.lastmile.v1.GetDecisionsResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,12 +32,32 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'lastmile.v1.matching_pb2',
 if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._loaded_options = None
   _globals['DESCRIPTOR']._serialized_options = b'Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1'
+  _globals['_MATCHDECISION_STAGEMSENTRY']._loaded_options = None
+  _globals['_MATCHDECISION_STAGEMSENTRY']._serialized_options = b'8\001'
   _globals['_TRYMATCHREQUEST']._serialized_start=43
-  _globals['_TRYMATCHREQUEST']._serialized_end=143
-  _globals['_ASSIGNMENT']._serialized_start=145
-  _globals['_ASSIGNMENT']._serialized_end=201
-  _globals['_TRYMATCHRESPONSE']._serialized_start=203
-  _globals['_TRYMATCHRESPONSE']._serialized_end=309
-  _globals['_MATCHINGSERVICE']._serialized_start=311
-  _globals['_MATCHINGSERVICE']._serialized_end=401
+  _globals['_TRYMATCHREQUEST']._serialized_end=168
+  _globals['_ASSIGNMENT']._serialized_start=170
+  _globals['_ASSIGNMENT']._serialized_end=226
+  _globals['_TRYMATCHRESPONSE']._serialized_start=228
+  _globals['_TRYMATCHRESPONSE']._serialized_end=334
+  _globals['_TRYMATCHBATCHREQUEST']._serialized_start=336
+  _globals['_TRYMATCHBATCHREQUEST']._serialized_end=406
+  _globals['_TRYMATCHRESULT']._serialized_start=408
+  _globals['_TRYMATCHRESULT']._serialized_end=488
+  _globals['_TRYMATCHBATCHRESPONSE']._serialized_start=490
+  _globals['_TRYMATCHBATCHRESPONSE']._serialized_end=559
+  _globals['_PREPAREMATCHREQUEST']._serialized_start=561
+  _globals['_PREPAREMATCHREQUEST']._serialized_end=665
+  _globals['_PREPAREMATCHRESPONSE']._serialized_start=667
+  _globals['_PREPAREMATCHRESPONSE']._serialized_end=762
+  _globals['_GETDECISIONSREQUEST']._serialized_start=764
+  _globals['_GETDECISIONSREQUEST']._serialized_end=855
+  _globals['_MATCHDECISION']._serialized_start=858
+  _globals['_MATCHDECISION']._serialized_end=1393
+  _globals['_MATCHDECISION_STAGEMSENTRY']._serialized_start=1347
+  _globals['_MATCHDECISION_STAGEMSENTRY']._serialized_end=1393
+  _globals['_GETDECISIONSRESPONSE']._serialized_start=1395
+  _globals['_GETDECISIONSRESPONSE']._serialized_end=1464
+  _globals['_MATCHINGSERVICE']._serialized_start=1467
+  _globals['_MATCHINGSERVICE']._serialized_end=1815
 # @@protoc_insertion_point(module_scope)
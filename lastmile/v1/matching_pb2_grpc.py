@@ -39,6 +39,21 @@ class MatchingServiceStub(object):
                 request_serializer=lastmile_dot_v1_dot_matching__pb2.TryMatchRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_matching__pb2.TryMatchResponse.FromString,
                 _registered_method=True)
+        self.TryMatchBatch = channel.unary_unary(
+                '/lastmile.v1.MatchingService/TryMatchBatch',
+                request_serializer=lastmile_dot_v1_dot_matching__pb2.TryMatchBatchRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_matching__pb2.TryMatchBatchResponse.FromString,
+                _registered_method=True)
+        self.PrepareMatch = channel.unary_unary(
+                '/lastmile.v1.MatchingService/PrepareMatch',
+                request_serializer=lastmile_dot_v1_dot_matching__pb2.PrepareMatchRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_matching__pb2.PrepareMatchResponse.FromString,
+                _registered_method=True)
+        self.GetDecisions = channel.unary_unary(
+                '/lastmile.v1.MatchingService/GetDecisions',
+                request_serializer=lastmile_dot_v1_dot_matching__pb2.GetDecisionsRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_matching__pb2.GetDecisionsResponse.FromString,
+                _registered_method=True)
 
 
 class MatchingServiceServicer(object):
@@ -50,6 +65,29 @@ class MatchingServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def TryMatchBatch(self, request, context):
+        """Many triggers in one call (e.g. a train's worth of drivers reaching their geofences
+        together), grouped by station and matched in one pass. Results are in request order.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PrepareMatch(self, request, context):
+        """Hint that a driver is approaching a station: build (or refresh) a tentative rider
+        set for the route so the TryMatch at the geofence only validates and commits it.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDecisions(self, request, context):
+        """Recent sampled TryMatch decisions held by this replica, newest first.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MatchingServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +96,21 @@ def add_MatchingServiceServicer_to_server(servicer, server):
                     request_deserializer=lastmile_dot_v1_dot_matching__pb2.TryMatchRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_matching__pb2.TryMatchResponse.SerializeToString,
             ),
+            'TryMatchBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.TryMatchBatch,
+                    request_deserializer=lastmile_dot_v1_dot_matching__pb2.TryMatchBatchRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_matching__pb2.TryMatchBatchResponse.SerializeToString,
+            ),
+            'PrepareMatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.PrepareMatch,
+                    request_deserializer=lastmile_dot_v1_dot_matching__pb2.PrepareMatchRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_matching__pb2.PrepareMatchResponse.SerializeToString,
+            ),
+            'GetDecisions': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDecisions,
+                    request_deserializer=lastmile_dot_v1_dot_matching__pb2.GetDecisionsRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_matching__pb2.GetDecisionsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lastmile.v1.MatchingService', rpc_method_handlers)
@@ -95,3 +148,84 @@ class MatchingService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def TryMatchBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.MatchingService/TryMatchBatch',
+            lastmile_dot_v1_dot_matching__pb2.TryMatchBatchRequest.SerializeToString,
+            lastmile_dot_v1_dot_matching__pb2.TryMatchBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PrepareMatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.MatchingService/PrepareMatch',
+            lastmile_dot_v1_dot_matching__pb2.PrepareMatchRequest.SerializeToString,
+            lastmile_dot_v1_dot_matching__pb2.PrepareMatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetDecisions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.MatchingService/GetDecisions',
+            lastmile_dot_v1_dot_matching__pb2.GetDecisionsRequest.SerializeToString,
+            lastmile_dot_v1_dot_matching__pb2.GetDecisionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
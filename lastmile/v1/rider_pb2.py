@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from lastmile.v1 import common_pb2 as lastmile_dot_v1_dot_common__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x17lastmile/v1/rider.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"?\n\x11\x41\x64\x64RequestRequest\x12*\n\x07request\x18\x01 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\"@\n\x12\x41\x64\x64RequestResponse\x12*\n\x07request\x18\x01 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\"n\n\x1bListPendingAtStationRequest\x12\x12\n\nstation_id\x18\x01 \x01(\t\x12\x10\n\x08now_unix\x18\x02 \x01(\x03\x12\x16\n\x0eminutes_window\x18\x03 \x01(\x05\x12\x11\n\tdest_area\x18\x04 \x01(\t\"K\n\x1cListPendingAtStationResponse\x12+\n\x08requests\x18\x01 \x03(\x0b\x32\x19.lastmile.v1.RiderRequest\";\n\x13MarkAssignedRequest\x12\x13\n\x0brequest_ids\x18\x01 \x03(\t\x12\x0f\n\x07trip_id\x18\x02 \x01(\t\"\'\n\x14MarkAssignedResponse\x12\x0f\n\x07updated\x18\x01 \x01(\x05\x32\x9f\x02\n\x0cRiderService\x12M\n\nAddRequest\x12\x1e.lastmile.v1.AddRequestRequest\x1a\x1f.lastmile.v1.AddRequestResponse\x12k\n\x14ListPendingAtStation\x12(.lastmile.v1.ListPendingAtStationRequest\x1a).lastmile.v1.ListPendingAtStationResponse\x12S\n\x0cMarkAssigned\x12 .lastmile.v1.MarkAssignedRequest\x1a!.lastmile.v1.MarkAssignedResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x17lastmile/v1/rider.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"?\n\x11\x41\x64\x64RequestRequest\x12*\n\x07request\x18\x01 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\"@\n\x12\x41\x64\x64RequestResponse\x12*\n\x07request\x18\x01 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\"A\n\x12\x41\x64\x64RequestsRequest\x12+\n\x08requests\x18\x01 \x03(\x0b\x32\x19.lastmile.v1.RiderRequest\"M\n\x10\x41\x64\x64RequestResult\x12*\n\x07request\x18\x01 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"E\n\x13\x41\x64\x64RequestsResponse\x12.\n\x07results\x18\x01 \x03(\x0b\x32\x1d.lastmile.v1.AddRequestResult\"n\n\x1bListPendingAtStationRequest\x12\x12\n\nstation_id\x18\x01 \x01(\t\x12\x10\n\x08now_unix\x18\x02 \x01(\x03\x12\x16\n\x0eminutes_window\x18\x03 \x01(\x05\x12\x11\n\tdest_area\x18\x04 \x01(\t\"K\n\x1cListPendingAtStationResponse\x12+\n\x08requests\x18\x01 \x03(\x0b\x32\x19.lastmile.v1.RiderRequest\"\xad\x01\n\x1dStreamPendingAtStationRequest\x12\x12\n\nstation_id\x18\x01 \x01(\t\x12\x10\n\x08now_unix\x18\x02 \x01(\x03\x12\x16\n\x0eminutes_window\x18\x03 \x01(\x05\x12\x12\n\ndest_areas\x18\x04 \x03(\t\x12\x11\n\tmax_count\x18\x05 \x01(\x05\x12\x0e\n\x06\x66ields\x18\x06 \x03(\t\x12\x17\n\x0f\x61nchor_eta_unix\x18\x07 \x01(\x03\";\n\x13MarkAssignedRequest\x12\x13\n\x0brequest_ids\x18\x01 \x03(\t\x12\x0f\n\x07trip_id\x18\x02 \x01(\t\"E\n\x14MarkAssignedResponse\x12\x0f\n\x07updated\x18\x01 \x01(\x05\x12\x1c\n\x14\x61ssigned_request_ids\x18\x02 \x03(\t\":\n\x14MarkCompletedRequest\x12\x11\n\trider_ids\x18\x01 \x03(\t\x12\x0f\n\x07trip_id\x18\x02 \x01(\t\"(\n\x15MarkCompletedResponse\x12\x0f\n\x07updated\x18\x01 \x01(\x05\"\x15\n\x13WatchPendingRequest\"M\n\x11RiderRequestEvent\x12\x0c\n\x04type\x18\x01 \x01(\t\x12*\n\x07request\x18\x02 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\"+\n\x17GetActiveRequestRequest\x12\x10\n\x08rider_id\x18\x01 \x01(\t\"U\n\x18GetActiveRequestResponse\x12*\n\x07request\x18\x01 \x01(\x0b\x32\x19.lastmile.v1.RiderRequest\x12\r\n\x05\x66ound\x18\x02 \x01(\x08\":\n\x17ListRiderHistoryRequest\x12\x10\n\x08rider_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"G\n\x18ListRiderHistoryResponse\x12+\n\x08requests\x18\x01 \x03(\x0b\x32\x19.lastmile.v1.RiderRequest\"&\n\x10GetDemandRequest\x12\x12\n\nstation_id\x18\x01 \x01(\t\"G\n\rStationDemand\x12\x12\n\nstation_id\x18\x01 \x01(\t\x12\x11\n\tdest_area\x18\x02 \x01(\t\x12\x0f\n\x07pending\x18\x03 \x01(\x05\"S\n\x11GetDemandResponse\x12*\n\x06\x64\x65mand\x18\x01 \x03(\x0b\x32\x1a.lastmile.v1.StationDemand\x12\x12\n\nas_of_unix\x18\x02 \x01(\x03\x32\x8e\x07\n\x0cRiderService\x12M\n\nAddRequest\x12\x1e.lastmile.v1.AddRequestRequest\x1a\x1f.lastmile.v1.AddRequestResponse\x12P\n\x0b\x41\x64\x64Requests\x12\x1f.lastmile.v1.AddRequestsRequest\x1a .lastmile.v1.AddRequestsResponse\x12k\n\x14ListPendingAtStation\x12(.lastmile.v1.ListPendingAtStationRequest\x1a).lastmile.v1.ListPendingAtStationResponse\x12\x61\n\x16StreamPendingAtStation\x12*.lastmile.v1.StreamPendingAtStationRequest\x1a\x19.lastmile.v1.RiderRequest0\x01\x12S\n\x0cMarkAssigned\x12 .lastmile.v1.MarkAssignedRequest\x1a!.lastmile.v1.MarkAssignedResponse\x12V\n\rMarkCompleted\x12!.lastmile.v1.MarkCompletedRequest\x1a\".lastmile.v1.MarkCompletedResponse\x12R\n\x0cWatchPending\x12 .lastmile.v1.WatchPendingRequest\x1a\x1e.lastmile.v1.RiderRequestEvent0\x01\x12_\n\x10GetActiveRequest\x12$.lastmile.v1.GetActiveRequestRequest\x1a%.lastmile.v1.GetActiveRequestResponse\x12_\n\x10ListRiderHistory\x12$.lastmile.v1.ListRiderHistoryRequest\x1a%.lastmile.v1.ListRiderHistoryResponse\x12J\n\tGetDemand\x12\x1d.lastmile.v1.GetDemandRequest\x1a\x1e.lastmile.v1.GetDemandResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -37,14 +37,44 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_ADDREQUESTREQUEST']._serialized_end=129
   _globals['_ADDREQUESTRESPONSE']._serialized_start=131
   _globals['_ADDREQUESTRESPONSE']._serialized_end=195
-  _globals['_LISTPENDINGATSTATIONREQUEST']._serialized_start=197
-  _globals['_LISTPENDINGATSTATIONREQUEST']._serialized_end=307
-  _globals['_LISTPENDINGATSTATIONRESPONSE']._serialized_start=309
-  _globals['_LISTPENDINGATSTATIONRESPONSE']._serialized_end=384
-  _globals['_MARKASSIGNEDREQUEST']._serialized_start=386
-  _globals['_MARKASSIGNEDREQUEST']._serialized_end=445
-  _globals['_MARKASSIGNEDRESPONSE']._serialized_start=447
-  _globals['_MARKASSIGNEDRESPONSE']._serialized_end=486
-  _globals['_RIDERSERVICE']._serialized_start=489
-  _globals['_RIDERSERVICE']._serialized_end=776
+  _globals['_ADDREQUESTSREQUEST']._serialized_start=197
+  _globals['_ADDREQUESTSREQUEST']._serialized_end=262
+  _globals['_ADDREQUESTRESULT']._serialized_start=264
+  _globals['_ADDREQUESTRESULT']._serialized_end=341
+  _globals['_ADDREQUESTSRESPONSE']._serialized_start=343
+  _globals['_ADDREQUESTSRESPONSE']._serialized_end=412
+  _globals['_LISTPENDINGATSTATIONREQUEST']._serialized_start=414
+  _globals['_LISTPENDINGATSTATIONREQUEST']._serialized_end=524
+  _globals['_LISTPENDINGATSTATIONRESPONSE']._serialized_start=526
+  _globals['_LISTPENDINGATSTATIONRESPONSE']._serialized_end=601
+  _globals['_STREAMPENDINGATSTATIONREQUEST']._serialized_start=604
+  _globals['_STREAMPENDINGATSTATIONREQUEST']._serialized_end=777
+  _globals['_MARKASSIGNEDREQUEST']._serialized_start=779
+  _globals['_MARKASSIGNEDREQUEST']._serialized_end=838
+  _globals['_MARKASSIGNEDRESPONSE']._serialized_start=840
+  _globals['_MARKASSIGNEDRESPONSE']._serialized_end=909
+  _globals['_MARKCOMPLETEDREQUEST']._serialized_start=911
+  _globals['_MARKCOMPLETEDREQUEST']._serialized_end=969
+  _globals['_MARKCOMPLETEDRESPONSE']._serialized_start=971
+  _globals['_MARKCOMPLETEDRESPONSE']._serialized_end=1011
+  _globals['_WATCHPENDINGREQUEST']._serialized_start=1013
+  _globals['_WATCHPENDINGREQUEST']._serialized_end=1034
+  _globals['_RIDERREQUESTEVENT']._serialized_start=1036
+  _globals['_RIDERREQUESTEVENT']._serialized_end=1113
+  _globals['_GETACTIVEREQUESTREQUEST']._serialized_start=1115
+  _globals['_GETACTIVEREQUESTREQUEST']._serialized_end=1158
+  _globals['_GETACTIVEREQUESTRESPONSE']._serialized_start=1160
+  _globals['_GETACTIVEREQUESTRESPONSE']._serialized_end=1245
+  _globals['_LISTRIDERHISTORYREQUEST']._serialized_start=1247
+  _globals['_LISTRIDERHISTORYREQUEST']._serialized_end=1305
+  _globals['_LISTRIDERHISTORYRESPONSE']._serialized_start=1307
+  _globals['_LISTRIDERHISTORYRESPONSE']._serialized_end=1378
+  _globals['_GETDEMANDREQUEST']._serialized_start=1380
+  _globals['_GETDEMANDREQUEST']._serialized_end=1418
+  _globals['_STATIONDEMAND']._serialized_start=1420
+  _globals['_STATIONDEMAND']._serialized_end=1491
+  _globals['_GETDEMANDRESPONSE']._serialized_start=1493
+  _globals['_GETDEMANDRESPONSE']._serialized_end=1576
+  _globals['_RIDERSERVICE']._serialized_start=1579
+  _globals['_RIDERSERVICE']._serialized_end=2489
 # @@protoc_insertion_point(module_scope)
@@ -3,6 +3,7 @@
 import grpc
 import warnings
 
+from lastmile.v1 import common_pb2 as lastmile_dot_v1_dot_common__pb2
 from lastmile.v1 import rider_pb2 as lastmile_dot_v1_dot_rider__pb2
 
 GRPC_GENERATED_VERSION = '1.76.0'
@@ -39,16 +40,51 @@ class RiderServiceStub(object):
                 request_serializer=lastmile_dot_v1_dot_rider__pb2.AddRequestRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_rider__pb2.AddRequestResponse.FromString,
                 _registered_method=True)
+        self.AddRequests = channel.unary_unary(
+                '/lastmile.v1.RiderService/AddRequests',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.AddRequestsRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_rider__pb2.AddRequestsResponse.FromString,
+                _registered_method=True)
         self.ListPendingAtStation = channel.unary_unary(
                 '/lastmile.v1.RiderService/ListPendingAtStation',
                 request_serializer=lastmile_dot_v1_dot_rider__pb2.ListPendingAtStationRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_rider__pb2.ListPendingAtStationResponse.FromString,
                 _registered_method=True)
+        self.StreamPendingAtStation = channel.unary_stream(
+                '/lastmile.v1.RiderService/StreamPendingAtStation',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.StreamPendingAtStationRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_common__pb2.RiderRequest.FromString,
+                _registered_method=True)
         self.MarkAssigned = channel.unary_unary(
                 '/lastmile.v1.RiderService/MarkAssigned',
                 request_serializer=lastmile_dot_v1_dot_rider__pb2.MarkAssignedRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_rider__pb2.MarkAssignedResponse.FromString,
                 _registered_method=True)
+        self.MarkCompleted = channel.unary_unary(
+                '/lastmile.v1.RiderService/MarkCompleted',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.MarkCompletedRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_rider__pb2.MarkCompletedResponse.FromString,
+                _registered_method=True)
+        self.WatchPending = channel.unary_stream(
+                '/lastmile.v1.RiderService/WatchPending',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.WatchPendingRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_rider__pb2.RiderRequestEvent.FromString,
+                _registered_method=True)
+        self.GetActiveRequest = channel.unary_unary(
+                '/lastmile.v1.RiderService/GetActiveRequest',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.GetActiveRequestRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_rider__pb2.GetActiveRequestResponse.FromString,
+                _registered_method=True)
+        self.ListRiderHistory = channel.unary_unary(
+                '/lastmile.v1.RiderService/ListRiderHistory',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.ListRiderHistoryRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_rider__pb2.ListRiderHistoryResponse.FromString,
+                _registered_method=True)
+        self.GetDemand = channel.unary_unary(
+                '/lastmile.v1.RiderService/GetDemand',
+                request_serializer=lastmile_dot_v1_dot_rider__pb2.GetDemandRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_rider__pb2.GetDemandResponse.FromString,
+                _registered_method=True)
 
 
 class RiderServiceServicer(object):
@@ -60,18 +96,67 @@ class RiderServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AddRequests(self, request, context):
+        """Many requests in one call and one write, e.g. everyone off the same train.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListPendingAtStation(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamPendingAtStation(self, request, context):
+        """The same listing streamed one request at a time, optionally capped, projected and
+        ordered by closeness to an anchor ETA; readers may stop early by cancelling.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def MarkAssigned(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def MarkCompleted(self, request, context):
+        """A trip carrying these riders finished; their open requests become COMPLETED.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchPending(self, request, context):
+        """Snapshot of every PENDING request followed by live changes, for in-memory indexes.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetActiveRequest(self, request, context):
+        """A rider's own requests, served from a per-rider cache the service keeps current.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListRiderHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDemand(self, request, context):
+        """PENDING riders per station and destination, from counters kept in memory.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RiderServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -80,16 +165,51 @@ def add_RiderServiceServicer_to_server(servicer, server):
                     request_deserializer=lastmile_dot_v1_dot_rider__pb2.AddRequestRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_rider__pb2.AddRequestResponse.SerializeToString,
             ),
+            'AddRequests': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddRequests,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.AddRequestsRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_rider__pb2.AddRequestsResponse.SerializeToString,
+            ),
             'ListPendingAtStation': grpc.unary_unary_rpc_method_handler(
                     servicer.ListPendingAtStation,
                     request_deserializer=lastmile_dot_v1_dot_rider__pb2.ListPendingAtStationRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_rider__pb2.ListPendingAtStationResponse.SerializeToString,
             ),
+            'StreamPendingAtStation': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamPendingAtStation,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.StreamPendingAtStationRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_common__pb2.RiderRequest.SerializeToString,
+            ),
             'MarkAssigned': grpc.unary_unary_rpc_method_handler(
                     servicer.MarkAssigned,
                     request_deserializer=lastmile_dot_v1_dot_rider__pb2.MarkAssignedRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_rider__pb2.MarkAssignedResponse.SerializeToString,
             ),
+            'MarkCompleted': grpc.unary_unary_rpc_method_handler(
+                    servicer.MarkCompleted,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.MarkCompletedRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_rider__pb2.MarkCompletedResponse.SerializeToString,
+            ),
+            'WatchPending': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchPending,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.WatchPendingRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_rider__pb2.RiderRequestEvent.SerializeToString,
+            ),
+            'GetActiveRequest': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetActiveRequest,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.GetActiveRequestRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_rider__pb2.GetActiveRequestResponse.SerializeToString,
+            ),
+            'ListRiderHistory': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListRiderHistory,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.ListRiderHistoryRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_rider__pb2.ListRiderHistoryResponse.SerializeToString,
+            ),
+            'GetDemand': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDemand,
+                    request_deserializer=lastmile_dot_v1_dot_rider__pb2.GetDemandRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_rider__pb2.GetDemandResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lastmile.v1.RiderService', rpc_method_handlers)
@@ -128,6 +248,33 @@ class RiderService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def AddRequests(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.RiderService/AddRequests',
+            lastmile_dot_v1_dot_rider__pb2.AddRequestsRequest.SerializeToString,
+            lastmile_dot_v1_dot_rider__pb2.AddRequestsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ListPendingAtStation(request,
             target,
@@ -155,6 +302,33 @@ class RiderService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamPendingAtStation(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/lastmile.v1.RiderService/StreamPendingAtStation',
+            lastmile_dot_v1_dot_rider__pb2.StreamPendingAtStationRequest.SerializeToString,
+            lastmile_dot_v1_dot_common__pb2.RiderRequest.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def MarkAssigned(request,
             target,
@@ -181,3 +355,138 @@ class RiderService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def MarkCompleted(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.RiderService/MarkCompleted',
+            lastmile_dot_v1_dot_rider__pb2.MarkCompletedRequest.SerializeToString,
+            lastmile_dot_v1_dot_rider__pb2.MarkCompletedResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchPending(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/lastmile.v1.RiderService/WatchPending',
+            lastmile_dot_v1_dot_rider__pb2.WatchPendingRequest.SerializeToString,
+            lastmile_dot_v1_dot_rider__pb2.RiderRequestEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetActiveRequest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.RiderService/GetActiveRequest',
+            lastmile_dot_v1_dot_rider__pb2.GetActiveRequestRequest.SerializeToString,
+            lastmile_dot_v1_dot_rider__pb2.GetActiveRequestResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListRiderHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.RiderService/ListRiderHistory',
+            lastmile_dot_v1_dot_rider__pb2.ListRiderHistoryRequest.SerializeToString,
+            lastmile_dot_v1_dot_rider__pb2.ListRiderHistoryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetDemand(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.RiderService/GetDemand',
+            lastmile_dot_v1_dot_rider__pb2.GetDemandRequest.SerializeToString,
+            lastmile_dot_v1_dot_rider__pb2.GetDemandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from lastmile.v1 import common_pb2 as lastmile_dot_v1_dot_common__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x19lastmile/v1/station.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"=\n\x14UpsertStationRequest\x12%\n\x07station\x18\x01 \x01(\x0b\x32\x14.lastmile.v1.Station\">\n\x15UpsertStationResponse\x12%\n\x07station\x18\x01 \x01(\x0b\x32\x14.lastmile.v1.Station\"\x1f\n\x11GetStationRequest\x12\n\n\x02id\x18\x01 \x01(\t\";\n\x12GetStationResponse\x12%\n\x07station\x18\x01 \x01(\x0b\x32\x14.lastmile.v1.Station\">\n\x14ListStationsResponse\x12&\n\x08stations\x18\x01 \x03(\x0b\x32\x14.lastmile.v1.Station\"+\n\x13NearbyAreasResponse\x12\x14\n\x0cnearby_areas\x18\x01 \x03(\t2\xcf\x02\n\x0eStationService\x12V\n\rUpsertStation\x12!.lastmile.v1.UpsertStationRequest\x1a\".lastmile.v1.UpsertStationResponse\x12M\n\nGetStation\x12\x1e.lastmile.v1.GetStationRequest\x1a\x1f.lastmile.v1.GetStationResponse\x12\x45\n\x0cListStations\x12\x12.lastmile.v1.Empty\x1a!.lastmile.v1.ListStationsResponse\x12O\n\x0bNearbyAreas\x12\x1e.lastmile.v1.GetStationRequest\x1a .lastmile.v1.NearbyAreasResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x19lastmile/v1/station.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"=\n\x14UpsertStationRequest\x12%\n\x07station\x18\x01 \x01(\x0b\x32\x14.lastmile.v1.Station\">\n\x15UpsertStationResponse\x12%\n\x07station\x18\x01 \x01(\x0b\x32\x14.lastmile.v1.Station\"\x1f\n\x11GetStationRequest\x12\n\n\x02id\x18\x01 \x01(\t\";\n\x12GetStationResponse\x12%\n\x07station\x18\x01 \x01(\x0b\x32\x14.lastmile.v1.Station\">\n\x14ListStationsResponse\x12&\n\x08stations\x18\x01 \x03(\x0b\x32\x14.lastmile.v1.Station\"+\n\x13NearbyAreasResponse\x12\x14\n\x0cnearby_areas\x18\x01 \x03(\t\"X\n\tAreaEntry\x12\x0c\n\x04\x61rea\x18\x01 \x01(\t\x12\x14\n\x0c\x64isplay_name\x18\x02 \x01(\t\x12\x13\n\x0bstation_ids\x18\x03 \x03(\t\x12\x12\n\nneighbours\x18\x04 \x03(\t\")\n\x13GetAreaIndexRequest\x12\x12\n\nif_version\x18\x01 \x01(\x03\"f\n\x14GetAreaIndexResponse\x12\x0f\n\x07version\x18\x01 \x01(\x03\x12\x14\n\x0cnot_modified\x18\x02 \x01(\x08\x12\'\n\x07\x65ntries\x18\x03 \x03(\x0b\x32\x16.lastmile.v1.AreaEntry\"4\n\x13SuggestAreasRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"=\n\x14SuggestAreasResponse\x12%\n\x05\x61reas\x18\x01 \x03(\x0b\x32\x16.lastmile.v1.AreaEntry2\xf9\x03\n\x0eStationService\x12V\n\rUpsertStation\x12!.lastmile.v1.UpsertStationRequest\x1a\".lastmile.v1.UpsertStationResponse\x12M\n\nGetStation\x12\x1e.lastmile.v1.GetStationRequest\x1a\x1f.lastmile.v1.GetStationResponse\x12\x45\n\x0cListStations\x12\x12.lastmile.v1.Empty\x1a!.lastmile.v1.ListStationsResponse\x12O\n\x0bNearbyAreas\x12\x1e.lastmile.v1.GetStationRequest\x1a .lastmile.v1.NearbyAreasResponse\x12S\n\x0cGetAreaIndex\x12 .lastmile.v1.GetAreaIndexRequest\x1a!.lastmile.v1.GetAreaIndexResponse\x12S\n\x0cSuggestAreas\x12 .lastmile.v1.SuggestAreasRequest\x1a!.lastmile.v1.SuggestAreasResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -45,6 +45,16 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_LISTSTATIONSRESPONSE']._serialized_end=351
   _globals['_NEARBYAREASRESPONSE']._serialized_start=353
   _globals['_NEARBYAREASRESPONSE']._serialized_end=396
-  _globals['_STATIONSERVICE']._serialized_start=399
-  _globals['_STATIONSERVICE']._serialized_end=734
+  _globals['_AREAENTRY']._serialized_start=398
+  _globals['_AREAENTRY']._serialized_end=486
+  _globals['_GETAREAINDEXREQUEST']._serialized_start=488
+  _globals['_GETAREAINDEXREQUEST']._serialized_end=529
+  _globals['_GETAREAINDEXRESPONSE']._serialized_start=531
+  _globals['_GETAREAINDEXRESPONSE']._serialized_end=633
+  _globals['_SUGGESTAREASREQUEST']._serialized_start=635
+  _globals['_SUGGESTAREASREQUEST']._serialized_end=687
+  _globals['_SUGGESTAREASRESPONSE']._serialized_start=689
+  _globals['_SUGGESTAREASRESPONSE']._serialized_end=750
+  _globals['_STATIONSERVICE']._serialized_start=753
+  _globals['_STATIONSERVICE']._serialized_end=1258
 # @@protoc_insertion_point(module_scope)
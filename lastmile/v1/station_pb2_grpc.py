@@ -55,6 +55,16 @@ class StationServiceStub(object):
                 request_serializer=lastmile_dot_v1_dot_station__pb2.GetStationRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_station__pb2.NearbyAreasResponse.FromString,
                 _registered_method=True)
+        self.GetAreaIndex = channel.unary_unary(
+                '/lastmile.v1.StationService/GetAreaIndex',
+                request_serializer=lastmile_dot_v1_dot_station__pb2.GetAreaIndexRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_station__pb2.GetAreaIndexResponse.FromString,
+                _registered_method=True)
+        self.SuggestAreas = channel.unary_unary(
+                '/lastmile.v1.StationService/SuggestAreas',
+                request_serializer=lastmile_dot_v1_dot_station__pb2.SuggestAreasRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_station__pb2.SuggestAreasResponse.FromString,
+                _registered_method=True)
 
 
 class StationServiceServicer(object):
@@ -84,6 +94,19 @@ class StationServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetAreaIndex(self, request, context):
+        """Normalised area -> stations and neighbouring areas, precomputed from nearby_areas.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SuggestAreas(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_StationServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -107,6 +130,16 @@ def add_StationServiceServicer_to_server(servicer, server):
                     request_deserializer=lastmile_dot_v1_dot_station__pb2.GetStationRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_station__pb2.NearbyAreasResponse.SerializeToString,
             ),
+            'GetAreaIndex': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetAreaIndex,
+                    request_deserializer=lastmile_dot_v1_dot_station__pb2.GetAreaIndexRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_station__pb2.GetAreaIndexResponse.SerializeToString,
+            ),
+            'SuggestAreas': grpc.unary_unary_rpc_method_handler(
+                    servicer.SuggestAreas,
+                    request_deserializer=lastmile_dot_v1_dot_station__pb2.SuggestAreasRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_station__pb2.SuggestAreasResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lastmile.v1.StationService', rpc_method_handlers)
@@ -225,3 +258,57 @@ class StationService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetAreaIndex(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.StationService/GetAreaIndex',
+            lastmile_dot_v1_dot_station__pb2.GetAreaIndexRequest.SerializeToString,
+            lastmile_dot_v1_dot_station__pb2.GetAreaIndexResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SuggestAreas(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.StationService/SuggestAreas',
+            lastmile_dot_v1_dot_station__pb2.SuggestAreasRequest.SerializeToString,
+            lastmile_dot_v1_dot_station__pb2.SuggestAreasResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from lastmile.v1 import common_pb2 as lastmile_dot_v1_dot_common__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16lastmile/v1/trip.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"_\n\x11\x43reateTripRequest\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\x11\n\trider_ids\x18\x02 \x03(\t\x12\x10\n\x08route_id\x18\x03 \x01(\t\x12\x12\n\nstation_id\x18\x04 \x01(\t\"5\n\x12\x43reateTripResponse\x12\x1f\n\x04trip\x18\x01 \x01(\x0b\x32\x11.lastmile.v1.Trip\":\n\x17UpdateTripStatusRequest\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\";\n\x18UpdateTripStatusResponse\x12\x1f\n\x04trip\x18\x01 \x01(\x0b\x32\x11.lastmile.v1.Trip2\xbd\x01\n\x0bTripService\x12M\n\nCreateTrip\x12\x1e.lastmile.v1.CreateTripRequest\x1a\x1f.lastmile.v1.CreateTripResponse\x12_\n\x10UpdateTripStatus\x12$.lastmile.v1.UpdateTripStatusRequest\x1a%.lastmile.v1.UpdateTripStatusResponseB?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16lastmile/v1/trip.proto\x12\x0blastmile.v1\x1a\x18lastmile/v1/common.proto\"_\n\x11\x43reateTripRequest\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\x11\n\trider_ids\x18\x02 \x03(\t\x12\x10\n\x08route_id\x18\x03 \x01(\t\x12\x12\n\nstation_id\x18\x04 \x01(\t\"5\n\x12\x43reateTripResponse\x12\x1f\n\x04trip\x18\x01 \x01(\x0b\x32\x11.lastmile.v1.Trip\":\n\x17UpdateTripStatusRequest\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\";\n\x18UpdateTripStatusResponse\x12\x1f\n\x04trip\x18\x01 \x01(\x0b\x32\x11.lastmile.v1.Trip\"b\n\x12\x43ommitMatchRequest\x12\x11\n\tdriver_id\x18\x01 \x01(\t\x12\x10\n\x08route_id\x18\x02 \x01(\t\x12\x12\n\nstation_id\x18\x03 \x01(\t\x12\x13\n\x0brequest_ids\x18\x04 \x03(\t\"\xbf\x01\n\x13\x43ommitMatchResponse\x12\x1f\n\x04trip\x18\x01 \x01(\x0b\x32\x11.lastmile.v1.Trip\x12\x17\n\x0fseats_remaining\x18\x02 \x01(\x05\x12\x1c\n\x14\x61ssigned_request_ids\x18\x03 \x03(\t\x12\x1b\n\x13skipped_request_ids\x18\x04 \x03(\t\x12\x1c\n\x14unseated_request_ids\x18\x05 \x03(\t\x12\x15\n\rroute_version\x18\x06 \x01(\x03\"\x13\n\x11WatchTripsRequest\"=\n\tTripEvent\x12\x1f\n\x04trip\x18\x01 \x01(\x0b\x32\x11.lastmile.v1.Trip\x12\x0f\n\x07ts_unix\x18\x02 \x01(\x03\x32\xd7\x02\n\x0bTripService\x12M\n\nCreateTrip\x12\x1e.lastmile.v1.CreateTripRequest\x1a\x1f.lastmile.v1.CreateTripResponse\x12_\n\x10UpdateTripStatus\x12$.lastmile.v1.UpdateTripStatusRequest\x1a%.lastmile.v1.UpdateTripStatusResponse\x12P\n\x0b\x43ommitMatch\x12\x1f.lastmile.v1.CommitMatchRequest\x1a .lastmile.v1.CommitMatchResponse\x12\x46\n\nWatchTrips\x12\x1e.lastmile.v1.WatchTripsRequest\x1a\x16.lastmile.v1.TripEvent0\x01\x42?Z=github.com/yourorg/lastmile/api/gen/go/lastmile/v1;lastmilev1b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -41,6 +41,14 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_UPDATETRIPSTATUSREQUEST']._serialized_end=275
   _globals['_UPDATETRIPSTATUSRESPONSE']._serialized_start=277
   _globals['_UPDATETRIPSTATUSRESPONSE']._serialized_end=336
-  _globals['_TRIPSERVICE']._serialized_start=339
-  _globals['_TRIPSERVICE']._serialized_end=528
+  _globals['_COMMITMATCHREQUEST']._serialized_start=338
+  _globals['_COMMITMATCHREQUEST']._serialized_end=436
+  _globals['_COMMITMATCHRESPONSE']._serialized_start=439
+  _globals['_COMMITMATCHRESPONSE']._serialized_end=630
+  _globals['_WATCHTRIPSREQUEST']._serialized_start=632
+  _globals['_WATCHTRIPSREQUEST']._serialized_end=651
+  _globals['_TRIPEVENT']._serialized_start=653
+  _globals['_TRIPEVENT']._serialized_end=714
+  _globals['_TRIPSERVICE']._serialized_start=717
+  _globals['_TRIPSERVICE']._serialized_end=1060
 # @@protoc_insertion_point(module_scope)
@@ -44,6 +44,16 @@ class TripServiceStub(object):
                 request_serializer=lastmile_dot_v1_dot_trip__pb2.UpdateTripStatusRequest.SerializeToString,
                 response_deserializer=lastmile_dot_v1_dot_trip__pb2.UpdateTripStatusResponse.FromString,
                 _registered_method=True)
+        self.CommitMatch = channel.unary_unary(
+                '/lastmile.v1.TripService/CommitMatch',
+                request_serializer=lastmile_dot_v1_dot_trip__pb2.CommitMatchRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_trip__pb2.CommitMatchResponse.FromString,
+                _registered_method=True)
+        self.WatchTrips = channel.unary_stream(
+                '/lastmile.v1.TripService/WatchTrips',
+                request_serializer=lastmile_dot_v1_dot_trip__pb2.WatchTripsRequest.SerializeToString,
+                response_deserializer=lastmile_dot_v1_dot_trip__pb2.TripEvent.FromString,
+                _registered_method=True)
 
 
 class TripServiceServicer(object):
@@ -61,6 +71,20 @@ class TripServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CommitMatch(self, request, context):
+        """Reserve seats, create the trip and assign the riders as one unit of work.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchTrips(self, request, context):
+        """Trips as they are created or change status, from now on (no snapshot).
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TripServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -74,6 +98,16 @@ def add_TripServiceServicer_to_server(servicer, server):
                     request_deserializer=lastmile_dot_v1_dot_trip__pb2.UpdateTripStatusRequest.FromString,
                     response_serializer=lastmile_dot_v1_dot_trip__pb2.UpdateTripStatusResponse.SerializeToString,
             ),
+            'CommitMatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.CommitMatch,
+                    request_deserializer=lastmile_dot_v1_dot_trip__pb2.CommitMatchRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_trip__pb2.CommitMatchResponse.SerializeToString,
+            ),
+            'WatchTrips': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchTrips,
+                    request_deserializer=lastmile_dot_v1_dot_trip__pb2.WatchTripsRequest.FromString,
+                    response_serializer=lastmile_dot_v1_dot_trip__pb2.TripEvent.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lastmile.v1.TripService', rpc_method_handlers)
@@ -138,3 +172,57 @@ class TripService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def CommitMatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/lastmile.v1.TripService/CommitMatch',
+            lastmile_dot_v1_dot_trip__pb2.CommitMatchRequest.SerializeToString,
+            lastmile_dot_v1_dot_trip__pb2.CommitMatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchTrips(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/lastmile.v1.TripService/WatchTrips',
+            lastmile_dot_v1_dot_trip__pb2.WatchTripsRequest.SerializeToString,
+            lastmile_dot_v1_dot_trip__pb2.TripEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
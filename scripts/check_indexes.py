@@ -0,0 +1,67 @@
+"""
+Check that the hot queries in common/indexes.py are served by the registered indexes.
+
+Explains each query (queryPlanner verbosity, nothing is executed) against the
+database in MONGO_URI / DB_NAME and prints the plan's index or COLLSCAN. Exits
+non-zero if any query would scan the collection or use an index that isn't in the
+registry. With --apply the registry is created first, as the services do at startup.
+
+Examples:
+    python scripts/check_indexes.py
+    MONGO_URI=mongodb://localhost:27017/ python scripts/check_indexes.py --apply
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path to import common
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from common.db import get_db, get_async_db
+from common.indexes import INDEXES, HOT_QUERIES, ensure_indexes
+
+
+def plan_stages(plan, out: list[dict]):
+    """Every stage in an explain plan tree, whichever engine produced it."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            out.append(plan)
+        for v in plan.values():
+            plan_stages(v, out)
+    elif isinstance(plan, list):
+        for v in plan:
+            plan_stages(v, out)
+    return out
+
+
+def explain(db, collection: str, filter_: dict, sort) -> dict:
+    cmd = {"find": collection, "filter": filter_}
+    if sort:
+        cmd["sort"] = dict(sort)
+    return db.command("explain", cmd, verbosity="queryPlanner")["queryPlanner"]["winningPlan"]
+
+
+def main(args) -> int:
+    db = get_db()
+    if args.apply:
+        asyncio.run(ensure_indexes(get_async_db()))
+    failed = 0
+    for desc, collection, filter_, sort in HOT_QUERIES:
+        stages = plan_stages(explain(db, collection, filter_, sort), [])
+        names = {s["stage"] for s in stages}
+        used = sorted({s["indexName"] for s in stages if s.get("indexName")})
+        registered = {m.document["name"] for m in INDEXES.get(collection, [])}
+        ok = "COLLSCAN" not in names and bool(used) and set(used) <= registered
+        failed += not ok
+        note = " (in-memory sort)" if "SORT" in names else ""
+        print(f"{'ok  ' if ok else 'FAIL'} {collection:<15} {desc:<40} "
+              f"{', '.join(used) or 'COLLSCAN'}{note}")
+    print(f"\n{len(HOT_QUERIES) - failed}/{len(HOT_QUERIES)} hot queries use registered indexes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--apply", action="store_true", help="create the registered indexes before checking")
+    sys.exit(main(ap.parse_args()))
@@ -9,6 +9,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from lastmile.v1 import matching_pb2, matching_pb2_grpc
 
+# >1 sends triggers as TryMatchBatch calls of this many
+BATCH_SIZE = int(os.environ.get('BATCH_SIZE', '1'))
+
 def run_load():
     target = os.environ.get('TARGET_ADDR', 'localhost:50057')
     # print(f"Starting load generation on {target}...") # Moved to main to avoid spam
@@ -23,12 +26,16 @@ def run_load():
                 for _ in range(50):
                     try:
                         # Send a dummy request
-                        stub.TryMatch(matching_pb2.TryMatchRequest(
+                        req = matching_pb2.TryMatchRequest(
                             driver_id="d1", 
                             route_id="r1", 
                             station_id="s1", 
                             arrival_eta_unix=int(time.time())
-                        ))
+                        )
+                        if BATCH_SIZE > 1:
+                            stub.TryMatchBatch(matching_pb2.TryMatchBatchRequest(triggers=[req] * BATCH_SIZE))
+                        else:
+                            stub.TryMatch(req)
                     except grpc.RpcError:
                         pass
                     except Exception as e:
@@ -0,0 +1,113 @@
+"""
+Summarise MatchingService decision records.
+
+Reads the JSONL file written with MATCH_TRACE_FILE, or the recent decisions a
+matching replica holds (GetDecisions), and reports outcome reasons, per-stage
+latency, the ETA gap of the riders chosen, and how far outside the window the
+nearest compatible rider was when a trigger missed (WINDOW_MISS) — the numbers
+for tuning MATCH_WINDOW_MINUTES and the sort policy.
+
+Examples:
+    python scripts/match_decisions.py --file decisions.jsonl
+    python scripts/match_decisions.py --matching-addr localhost:50057 --limit 1000 --station-id S1
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+
+# Add parent directory to path to import generated protos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import grpc
+from google.protobuf.json_format import MessageToDict
+from lastmile.v1 import matching_pb2, matching_pb2_grpc
+
+GAP_BUCKETS_MIN = [2, 5, 8, 12, 15, 20, 30, 60]   # histogram edges for ETA gaps, minutes
+
+
+def pct(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q / 100 * (len(s) - 1))))]
+
+
+def load_file(path: str, station_id: str, reason: str) -> list[dict]:
+    recs = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if (not station_id or rec.get("station_id") == station_id) and (not reason or rec.get("reason") == reason):
+                recs.append(rec)
+    return recs
+
+
+async def load_rpc(addr: str, limit: int, station_id: str, reason: str) -> list[dict]:
+    async with grpc.aio.insecure_channel(addr) as ch:
+        resp = await matching_pb2_grpc.MatchingServiceStub(ch).GetDecisions(
+            matching_pb2.GetDecisionsRequest(limit=limit, station_id=station_id, reason=reason))
+    return [MessageToDict(d, preserving_proto_field_name=True) for d in resp.decisions]
+
+
+def histogram(name: str, gaps_s: list[float]):
+    print(f"\n{name} (n={len(gaps_s)})")
+    if not gaps_s:
+        return
+    lo = 0
+    for hi in GAP_BUCKETS_MIN + [None]:
+        n = sum(1 for g in gaps_s if lo * 60 <= abs(g) and (hi is None or abs(g) < hi * 60))
+        label = f"{lo}-{hi} min" if hi is not None else f">= {lo} min"
+        print(f"  {label:<12} {n:>7} ({n / len(gaps_s):.1%})")
+        lo = hi
+
+
+def report(recs: list[dict]):
+    reasons = collections.Counter(r.get("reason", "") for r in recs)
+    print(f"{len(recs)} decisions")
+    for reason, n in reasons.most_common():
+        print(f"  {reason:<16} {n:>7} ({n / len(recs):.1%})")
+
+    stages: dict[str, list[float]] = {}
+    for r in recs:
+        for name, ms in r.get("stage_ms", {}).items():
+            stages.setdefault(name, []).append(float(ms))
+    print("\nstage latency (ms)")
+    for name in sorted(stages, key=lambda n: -pct(stages[n], 99)):
+        v = stages[name]
+        print(f"  {name:<12} n={len(v):<7} p50={pct(v, 50):8.3f} p90={pct(v, 90):8.3f} "
+              f"p99={pct(v, 99):8.3f} max={max(v):8.3f}")
+
+    chosen = [float(g) for r in recs for g in r.get("chosen_gap_s", [])]
+    histogram("chosen riders: eta - driver arrival", chosen)
+    missed = [float(r.get("nearest_gap_s", 0)) for r in recs if r.get("reason") == "WINDOW_MISS"]
+    histogram("WINDOW_MISS: nearest compatible rider, |eta - now|", missed)
+    windows = {int(r["window_minutes"]) for r in recs if r.get("window_minutes")}
+    if windows:
+        print(f"\nwindow in force: {', '.join(f'{w} min' for w in sorted(windows))}")
+
+
+async def main(args):
+    if args.file:
+        recs = load_file(args.file, args.station_id, args.reason)
+    else:
+        recs = await load_rpc(args.matching_addr, args.limit, args.station_id, args.reason)
+    if not recs:
+        print("no decisions")
+        return
+    report(recs)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--file", help="JSONL written via MATCH_TRACE_FILE; omit to ask a matching replica")
+    ap.add_argument("--matching-addr", default=os.environ.get("MATCHING_ADDR", "localhost:50057"))
+    ap.add_argument("--limit", type=int, default=1000, help="decisions to fetch over RPC")
+    ap.add_argument("--station-id", default="")
+    ap.add_argument("--reason", default="")
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,213 @@
+"""
+Replay driver location traces into LocationService.StreamDriverLocation.
+
+Traces are JSONL, one ping per line:
+    {"driver_id": "...", "route_id": "...", "lat": 12.97, "lon": 77.60, "ts_unix": 1700000000}
+
+Pings are grouped into one stream per (driver_id, route_id) and replayed on one shared
+clock, so both the spacing within a stream and the offsets between streams (a burst of
+drivers reaching a station together) are kept, scaled by --speed (1 = real time,
+N = N times faster, 0 = as fast as possible). Without --traces, synthetic drivers are registered against the stations
+in the station service and driven towards one of them.
+
+Examples:
+    python scripts/replay_traces.py --traces traces.jsonl --speed 10 --concurrency 200
+    python scripts/replay_traces.py --synthetic 100 --riders-per-station 4 --speed 0
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to import generated protos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import grpc
+from lastmile.v1 import (
+    location_pb2, location_pb2_grpc,
+    station_pb2_grpc,
+    driver_pb2, driver_pb2_grpc,
+    rider_pb2, rider_pb2_grpc,
+    common_pb2,
+)
+
+AVG_SPEED_MPS = 10      # synthetic driving speed, same as the location service assumes
+PING_INTERVAL_S = 2     # synthetic spacing between pings
+APPROACH_METERS = 2000  # synthetic drivers start this far from their station
+
+
+def load_traces(path: str) -> dict[tuple[str, str], list[dict]]:
+    streams: dict[tuple[str, str], list[dict]] = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            p = json.loads(line)
+            streams.setdefault((p["driver_id"], p["route_id"]), []).append(p)
+    for pings in streams.values():
+        pings.sort(key=lambda p: p["ts_unix"])
+    return streams
+
+
+def approach_pings(lat: float, lon: float, start_ts: float) -> list[dict]:
+    """Pings on a straight line from APPROACH_METERS out to the station itself."""
+    bearing = random.uniform(0, 2 * math.pi)
+    step_m = AVG_SPEED_MPS * PING_INTERVAL_S
+    n = int(APPROACH_METERS / step_m) + 1
+    out = []
+    for i in range(n + 1):
+        d = max(APPROACH_METERS - i * step_m, 0)
+        out.append({
+            "lat": lat + (d * math.cos(bearing)) / 111_320,
+            "lon": lon + (d * math.sin(bearing)) / (111_320 * math.cos(math.radians(lat))),
+            "ts_unix": start_ts + i * PING_INTERVAL_S,
+        })
+    return out
+
+
+async def synthetic_traces(args) -> dict[tuple[str, str], list[dict]]:
+    station_ch = grpc.aio.insecure_channel(args.station_addr)
+    driver_ch = grpc.aio.insecure_channel(args.driver_addr)
+    rider_ch = grpc.aio.insecure_channel(args.rider_addr)
+    station = station_pb2_grpc.StationServiceStub(station_ch)
+    driver = driver_pb2_grpc.DriverServiceStub(driver_ch)
+    rider = rider_pb2_grpc.RiderServiceStub(rider_ch)
+
+    stations = list((await station.ListStations(common_pb2.Empty())).stations)
+    if not stations:
+        raise SystemExit("no stations registered; run scripts/init_db.py first")
+
+    now = time.time()
+    streams: dict[tuple[str, str], list[dict]] = {}
+    run_id = f"{int(now)}"
+
+    for st in stations:
+        dest = st.nearby_areas[0] if st.nearby_areas else st.name
+        await rider.AddRequests(rider_pb2.AddRequestsRequest(requests=[common_pb2.RiderRequest(
+            rider_id=f"replay-{run_id}-{st.id}-r{i}", station_id=st.id,
+            eta_unix=int(now) + random.randint(0, 5) * 60, dest_area=dest, status="PENDING",
+        ) for i in range(args.riders_per_station)]))
+
+    for i in range(args.synthetic):
+        st = random.choice(stations)
+        dest = st.nearby_areas[0] if st.nearby_areas else st.name
+        driver_id = f"replay-{run_id}-d{i}"
+        rr = await driver.RegisterRoute(driver_pb2.RegisterRouteRequest(route=driver_pb2.DriverRoute(
+            driver_id=driver_id, dest_area=dest, seats_total=args.seats, seats_free=args.seats,
+            stations=[driver_pb2.RouteStation(station_id=st.id, minutes_before_eta_match=5)],
+        )))
+        pings = approach_pings(st.location.lat, st.location.lon, now + random.uniform(0, args.spread))
+        streams[(driver_id, rr.route.id)] = pings
+
+    for ch in (station_ch, driver_ch, rider_ch):
+        await ch.close()
+    return streams
+
+
+async def wait_until(ts_unix: float, origin: tuple[float, float], speed: float):
+    """Sleep until trace time `ts_unix` on the replay clock `origin` = (trace t0, wall t0)."""
+    if speed > 0:
+        delay = origin[1] + (ts_unix - origin[0]) / speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def replay_stream(stub, driver_id: str, route_id: str, pings: list[dict], args, stats: dict,
+                        origin: tuple[float, float]):
+    async def gen():
+        for p in pings:
+            await wait_until(p["ts_unix"], origin, args.speed)
+            ts = p["ts_unix"] if args.keep_ts else time.time()
+            stats["sent"] += 1
+            yield location_pb2.DriverLocation(
+                driver_id=driver_id, route_id=route_id,
+                point=common_pb2.LatLng(lat=p["lat"], lon=p["lon"]), ts_unix=int(ts),
+            )
+
+    try:
+        ack = await stub.StreamDriverLocation(gen())
+    except grpc.RpcError as e:
+        stats["errors"] += 1
+        print(f"[replay] stream {driver_id} failed: {e.code()} {e.details()}")
+        return
+    stats["pings"] += ack.pings
+    stats["dropped"] += ack.pings_dropped
+    stats["triggers"] += ack.geofence_triggers
+    stats["prepares"] += ack.prepare_hints
+    stats["try_match_ms"].extend(ack.try_match_ms)
+    stats["ping_to_trip_ms"].extend(m.ping_to_trip_ms for m in ack.matches)
+    stats["matches"] += len(ack.matches)
+
+
+def pct(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q / 100 * (len(s) - 1))))]
+
+
+def report(stats: dict, streams: int, elapsed: float):
+    print(f"\nstreams={streams} errors={stats['errors']} elapsed={elapsed:.1f}s")
+    print(f"pings sent={stats['sent']} acked={stats['pings']} ({stats['pings'] / elapsed:.1f}/s) "
+          f"dropped as stale={stats['dropped']}")
+    rate = stats["triggers"] / stats["pings"] if stats["pings"] else 0.0
+    print(f"geofence triggers={stats['triggers']} ({rate:.2%} of pings, {stats['triggers'] / elapsed:.1f}/s) "
+          f"pre-match hints={stats['prepares']}")
+    print(f"trips={stats['matches']}")
+    for name in ("try_match_ms", "ping_to_trip_ms"):
+        v = stats[name]
+        print(f"{name:<16} n={len(v):<6} p50={pct(v, 50):8.1f} p90={pct(v, 90):8.1f} "
+              f"p99={pct(v, 99):8.1f} max={max(v) if v else float('nan'):8.1f}")
+
+
+async def main(args):
+    if args.traces:
+        streams = load_traces(args.traces)
+    else:
+        streams = await synthetic_traces(args)
+    print(f"[replay] {len(streams)} streams, {sum(len(p) for p in streams.values())} pings, "
+          f"speed={'max' if args.speed <= 0 else f'{args.speed}x'}")
+    if not streams:
+        return
+
+    stats = {"sent": 0, "pings": 0, "dropped": 0, "triggers": 0, "prepares": 0, "matches": 0, "errors": 0,
+             "try_match_ms": [], "ping_to_trip_ms": []}
+    sem = asyncio.Semaphore(args.concurrency)
+    channel = grpc.aio.insecure_channel(args.location_addr)
+    stub = location_pb2_grpc.LocationServiceStub(channel)
+
+    # One clock for every stream: the earliest ping in the traces is replayed at `start`
+    start = time.monotonic()
+    origin = (min(p[0]["ts_unix"] for p in streams.values()), start)
+
+    async def run_one(key, pings):
+        await wait_until(pings[0]["ts_unix"], origin, args.speed)   # don't hold a slot before starting
+        async with sem:
+            await replay_stream(stub, key[0], key[1], pings, args, stats, origin)
+
+    await asyncio.gather(*(run_one(k, p) for k, p in streams.items()))
+    elapsed = max(time.monotonic() - start, 1e-9)
+    await channel.close()
+    report(stats, len(streams), elapsed)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--traces", help="JSONL trace file; omit to generate synthetic traces")
+    ap.add_argument("--synthetic", type=int, default=50, help="number of synthetic drivers")
+    ap.add_argument("--riders-per-station", type=int, default=0, help="synthetic rider requests to seed per station")
+    ap.add_argument("--seats", type=int, default=3, help="seats per synthetic route")
+    ap.add_argument("--spread", type=float, default=60.0, help="synthetic start-time spread in seconds")
+    ap.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N times faster, 0 = as fast as possible")
+    ap.add_argument("--concurrency", type=int, default=100, help="max concurrent streams")
+    ap.add_argument("--keep-ts", action="store_true", help="send recorded ts_unix instead of wall-clock time")
+    ap.add_argument("--location-addr", default=os.environ.get("LOCATION_ADDR", "localhost:50058"))
+    ap.add_argument("--station-addr", default=os.environ.get("STATION_ADDR", "localhost:50052"))
+    ap.add_argument("--driver-addr", default=os.environ.get("DRIVER_ADDR", "localhost:50053"))
+    ap.add_argument("--rider-addr", default=os.environ.get("RIDER_ADDR", "localhost:50054"))
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,516 @@
+"""
+Offline city-scale matching simulator.
+
+Runs the real MatchingServer (services/matching_svc.py) in-process against an
+in-memory backend that stands in for the driver, rider, trip and notification
+services, on a simulated clock. Riders and drivers arrive at configurable rates
+(optionally ramping up, to find where matching breaks before rush hour does),
+drivers trigger TryMatch as they approach their station, and the run reports
+matches per second, rider wait times, seat utilisation, per-stage latency and the
+matcher's decision reasons (see MatchDecision in matching.proto).
+
+The city is the station set from scripts/init_db.py, or an N-station grid with
+--grid. Nothing talks to Mongo or the network; --rpc-ms adds a fixed delay to
+every backend call to model network round trips.
+
+Examples:
+    python scripts/simulate_city.py --minutes 60 --riders-per-min 120 --drivers-per-min 40
+    python scripts/simulate_city.py --grid 200 --riders-per-min 600 --drivers-per-min 200 --ramp 4
+    python scripts/simulate_city.py --mode batch --batch-window-ms 20 --rpc-ms 2
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to import generated protos, common and the services
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "services"))
+
+from lastmile.v1 import (
+    common_pb2, driver_pb2, rider_pb2, trip_pb2, notification_pb2, matching_pb2,
+)
+
+EXPIRE_AFTER_S = 600     # unmatched requests are dropped at eta + this, like the rider service expiry
+DEBOUNCE_S = 30          # a driver re-triggers at most this often, like the location service
+GEOFENCE_S = 40          # --prepare: TryMatch fires this long before arrival (400 m at 10 m/s)
+START_UNIX = 1_700_000_000
+
+
+class Clock:
+    """Simulated wall clock; stands in for time.time() inside matching_svc."""
+
+    def __init__(self, t: int):
+        self.t = t
+
+    def __call__(self) -> float:
+        return float(self.t)
+
+
+def pct(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q / 100 * (len(s) - 1))))]
+
+
+def poisson(lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 50:
+        return max(0, round(random.gauss(lam, math.sqrt(lam))))
+    k, p, limit = 0, 1.0, math.exp(-lam)
+    while True:
+        p *= random.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def build_city(args) -> list[tuple[str, list[str]]]:
+    """(station_id, nearby_areas) pairs."""
+    if args.grid:
+        return [(f"G{i:04d}", [f"G{i:04d}-A{k}" for k in range(args.areas)]) for i in range(args.grid)]
+    from init_db import STATIONS
+    return [(s["id"], list(s["nearbyAreas"])) for s in STATIONS]
+
+
+class Stream:
+    """Stands in for a server-streaming call: async-iterable and cancellable."""
+
+    def __init__(self, agen):
+        self._agen = agen
+
+    def __aiter__(self):
+        return self._agen
+
+    def cancel(self) -> bool:
+        return True
+
+
+class Backend:
+    """In-memory driver/rider/trip/notification services.
+
+    Method names and request/response types match the gRPC stubs MatchingServer
+    calls, so one instance is plugged in for all four. Writes are mirrored into
+    the matcher's pending index directly, as a lag-free WatchPending feed.
+    """
+
+    def __init__(self, clock: Clock, rpc_ms: float, stats: "Stats"):
+        self.clock = clock
+        self.rpc_s = rpc_ms / 1000
+        self.stats = stats
+        self.requests: dict[str, common_pb2.RiderRequest] = {}
+        self.routes: dict[str, driver_pb2.DriverRoute] = {}
+        self.pending: dict[tuple[str, str], dict[str, common_pb2.RiderRequest]] = {}  # (station, dest) -> PENDING
+        self.created_at: dict[str, int] = {}       # request id -> sim time it was placed
+        self.matched_at: dict[str, int] = {}       # request id -> sim time it was assigned
+        self.trip_of: dict[str, str] = {}          # request id -> trip id
+        self.trip_route: dict[str, str] = {}       # trip id -> route id
+        self.trips = 0
+        self.rows_listed = 0                       # requests returned by the listing RPCs
+        self.index = None                          # MatchingServer.pending, once attached
+        self._ids = itertools.count(1)
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._ids)}"
+
+    async def _call(self, name: str):
+        if self.rpc_s:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.rpc_s)
+            self.stats.stage(name, time.perf_counter() - t0)
+
+    # -- setup, not RPCs --
+
+    def add_request(self, station_id: str, dest_area: str, eta: int) -> common_pb2.RiderRequest:
+        rid = self._new_id("req")
+        r = common_pb2.RiderRequest(id=rid, rider_id=f"rider-{rid}", station_id=station_id,
+                                    eta_unix=eta, dest_area=dest_area, status="PENDING")
+        self.requests[rid] = r
+        self.created_at[rid] = self.clock.t
+        self.pending.setdefault((station_id, dest_area), {})[rid] = r
+        if self.index is not None:
+            self.index.upsert(r)
+        return r
+
+    def add_route(self, station_id: str, dest_area: str, seats: int, lead_min: int) -> driver_pb2.DriverRoute:
+        route_id = self._new_id("route")
+        route = driver_pb2.DriverRoute(
+            id=route_id, driver_id=f"driver-{route_id}", dest_area=dest_area,
+            seats_total=seats, seats_free=seats,
+            stations=[driver_pb2.RouteStation(station_id=station_id, minutes_before_eta_match=lead_min)],
+        )
+        self.routes[route_id] = route
+        return route
+
+    def expire(self, cutoff: int) -> list[common_pb2.RiderRequest]:
+        gone = [r for bucket in self.pending.values() for r in bucket.values() if r.eta_unix < cutoff]
+        for r in gone:
+            del self.requests[r.id]
+            del self.pending[(r.station_id, r.dest_area)][r.id]
+            if self.index is not None:
+                self.index.remove(r.id)
+        return gone
+
+    def _assign(self, request_ids: list[str], trip_id: str) -> int:
+        n = 0
+        for rid in request_ids:
+            r = self.requests.get(rid)
+            if r is None or r.status != "PENDING":
+                continue
+            r.status = "ASSIGNED"
+            del self.pending[(r.station_id, r.dest_area)][rid]
+            self.matched_at[rid] = self.clock.t
+            self.trip_of[rid] = trip_id
+            if self.index is not None:
+                self.index.remove(rid)
+            n += 1
+        return n
+
+    # -- DriverService --
+
+    async def GetRoute(self, request, timeout=None):
+        await self._call("GetRoute")
+        route = self.routes.get(request.route_id)
+        return driver_pb2.GetRouteResponse(route=route) if route else driver_pb2.GetRouteResponse()
+
+    async def UpdateSeats(self, request, timeout=None):
+        await self._call("UpdateSeats")
+        route = self.routes[request.route_id]
+        route.seats_free = request.seats_free
+        return driver_pb2.UpdateSeatsResponse(route=route)
+
+    # -- RiderService --
+
+    async def ListPendingAtStation(self, request, timeout=None):
+        await self._call("ListPendingAtStation")
+        lo = request.now_unix - request.minutes_window * 60
+        hi = request.now_unix + request.minutes_window * 60
+        if request.dest_area:
+            buckets = [self.pending.get((request.station_id, request.dest_area), {})]
+        else:
+            buckets = [b for (sid, _), b in self.pending.items() if sid == request.station_id]
+        rs = sorted((r for b in buckets for r in b.values() if lo <= r.eta_unix <= hi),
+                    key=lambda r: r.eta_unix)
+        self.rows_listed += len(rs)
+        return rider_pb2.ListPendingAtStationResponse(requests=rs)
+
+    def StreamPendingAtStation(self, request, timeout=None):
+        return Stream(self._stream_pending(request))
+
+    async def _stream_pending(self, request):
+        await self._call("StreamPendingAtStation")
+        lo = request.now_unix - request.minutes_window * 60
+        hi = request.now_unix + request.minutes_window * 60
+        buckets = [b for (sid, dest), b in self.pending.items()
+                   if sid == request.station_id and (not request.dest_areas or dest in request.dest_areas)]
+        rs = [r for b in buckets for r in b.values() if lo <= r.eta_unix <= hi]
+        anchor = request.anchor_eta_unix
+        rs.sort(key=(lambda r: abs(r.eta_unix - anchor)) if anchor else (lambda r: r.eta_unix))
+        for r in rs[:request.max_count or None]:
+            self.rows_listed += 1
+            yield r
+
+    async def MarkAssigned(self, request, timeout=None):
+        await self._call("MarkAssigned")
+        return rider_pb2.MarkAssignedResponse(updated=self._assign(list(request.request_ids), request.trip_id))
+
+    # -- TripService --
+
+    async def CreateTrip(self, request, timeout=None):
+        await self._call("CreateTrip")
+        self.trips += 1
+        trip_id = self._new_id("trip")
+        self.trip_route[trip_id] = request.route_id
+        return trip_pb2.CreateTripResponse(trip=common_pb2.Trip(
+            id=trip_id, driver_id=request.driver_id, rider_ids=request.rider_ids,
+            route_id=request.route_id, station_id=request.station_id, status="SCHEDULED",
+        ))
+
+    async def CommitMatch(self, request, timeout=None):
+        await self._call("CommitMatch")
+        route = self.routes[request.route_id]
+        live = [rid for rid in request.request_ids
+                if rid in self.requests and self.requests[rid].status == "PENDING"]
+        skipped = [rid for rid in request.request_ids if rid not in live]
+        take, unseated = live[:route.seats_free], live[route.seats_free:]
+        if not take:
+            return trip_pb2.CommitMatchResponse(seats_remaining=route.seats_free, skipped_request_ids=skipped,
+                                                unseated_request_ids=unseated)
+        trip_id = self._new_id("trip")
+        self.trip_route[trip_id] = request.route_id
+        self._assign(take, trip_id)
+        route.seats_free -= len(take)
+        self.trips += 1
+        trip = common_pb2.Trip(
+            id=trip_id, driver_id=request.driver_id, route_id=request.route_id,
+            station_id=request.station_id, status="SCHEDULED",
+            rider_ids=[self.requests[rid].rider_id for rid in take],
+        )
+        return trip_pb2.CommitMatchResponse(trip=trip, seats_remaining=route.seats_free,
+                                            assigned_request_ids=take, skipped_request_ids=skipped,
+                                            unseated_request_ids=unseated)
+
+    # -- NotificationService --
+
+    async def Push(self, request, timeout=None):
+        await self._call("Push")
+        return notification_pb2.PushResponse()
+
+
+class Stats:
+    def __init__(self):
+        self.stages: dict[str, list[float]] = {}
+        self.windows: list[dict] = []
+        self.cur = self._window(0)
+        self.wait_s: list[float] = []          # rider: driver arrival at the station minus rider eta
+        self.to_match_s: list[float] = []      # rider: request placed -> assigned
+        self.utilisation: list[float] = []     # per route, at departure
+        self.expired = 0
+        self.errors = 0
+        self.reasons: collections.Counter[str] = collections.Counter()
+
+    @staticmethod
+    def _window(start_min: int) -> dict:
+        return {"start_min": start_min, "riders": 0, "drivers": 0, "triggers": 0, "trips": 0,
+                "matched": 0, "expired": 0, "wall_s": 0.0, "try_match": []}
+
+    def stage(self, name: str, seconds: float):
+        self.stages.setdefault(name, []).append(seconds * 1000)
+
+    def roll(self, start_min: int):
+        self.windows.append(self.cur)
+        self.cur = self._window(start_min)
+
+
+def timed(stats: Stats, name: str, fn):
+    async def wrapper(*a, **kw):
+        t0 = time.perf_counter()
+        try:
+            return await fn(*a, **kw)
+        finally:
+            stats.stage(name, time.perf_counter() - t0)
+    return wrapper
+
+
+def report(args, stats: Stats, backend: Backend, wall: float, match_wall: float):
+    print(f"\n{'min':>5} {'riders':>7} {'drivers':>7} {'trigs':>6} {'trips':>6} {'matched':>7} "
+          f"{'expired':>7} {'trig/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for w in stats.windows:
+        rate = w["triggers"] / w["wall_s"] if w["wall_s"] else float("nan")
+        print(f"{w['start_min']:>5} {w['riders']:>7} {w['drivers']:>7} {w['triggers']:>6} {w['trips']:>6} "
+              f"{w['matched']:>7} {w['expired']:>7} {rate:>8.1f} {pct(w['try_match'], 50):>8.2f} "
+              f"{pct(w['try_match'], 99):>8.2f}")
+
+    matched = len(backend.matched_at)
+    total = sum(w["riders"] for w in stats.windows)
+    triggers = sum(w["triggers"] for w in stats.windows)
+    print(f"\nmode={args.mode} commit={args.commit} index={'off' if args.no_index else 'on'} "
+          f"prepare={'on' if args.prepare else 'off'} "
+          f"stations={args.stations} rpc_ms={args.rpc_ms}")
+    print(f"wall={wall:.1f}s in TryMatch={match_wall:.1f}s errors={stats.errors}")
+    print(f"triggers={triggers} ({triggers / match_wall if match_wall else 0:.1f}/s) "
+          f"trips={backend.trips} ({backend.trips / match_wall if match_wall else 0:.1f} matches/s)")
+    print(f"riders={total} matched={matched} ({matched / total if total else 0:.1%}) "
+          f"expired={stats.expired} still pending={total - matched - stats.expired}")
+    util = stats.utilisation
+    full = sum(1 for u in util if u >= 1.0)
+    empty = sum(1 for u in util if u == 0.0)
+    if backend.rows_listed:
+        print(f"pending requests read from the rider service: {backend.rows_listed}")
+    print(f"seat utilisation: mean={sum(util) / len(util) if util else 0:.1%} over {len(util)} routes "
+          f"(full={full} empty={empty})")
+    for name, v in (("rider wait (s)", stats.wait_s), ("time to match (s)", stats.to_match_s)):
+        print(f"{name:<18} n={len(v):<6} p50={pct(v, 50):7.0f} p90={pct(v, 90):7.0f} p99={pct(v, 99):7.0f}")
+    print("\nstage latency (ms)")
+    for name in sorted(stats.stages):
+        v = stats.stages[name]
+        print(f"  {name:<22} n={len(v):<7} p50={pct(v, 50):8.3f} p90={pct(v, 90):8.3f} "
+              f"p99={pct(v, 99):8.3f} max={max(v):8.3f}")
+    total = sum(stats.reasons.values())
+    print("\nTryMatch decisions")
+    for reason, n in stats.reasons.most_common():
+        print(f"  {reason:<22} {n:>7} ({n / total:.1%})")
+
+
+async def main(args):
+    random.seed(args.seed)
+    # Read by matching_svc at import
+    os.environ["MATCH_MODE"] = args.mode
+    os.environ["MATCH_COMMIT"] = args.commit
+    os.environ["MATCH_BATCH_WINDOW_MS"] = str(args.batch_window_ms)
+    os.environ["MATCH_DEST_NEIGHBOURS"] = "1" if args.neighbours else "0"
+    import matching_svc
+    from common.areas import AreaIndex
+
+    city = build_city(args)
+    args.stations = len(city)
+    clock = Clock(START_UNIX)
+    matching_svc.time = clock
+
+    stats = Stats()
+    backend = Backend(clock, args.rpc_ms, stats)
+    server = matching_svc.MatchingServer()
+    server.driver = server.rider = server.trip = server.notify = backend
+    server.areas = AreaIndex.build(city)
+    if not args.no_index:
+        backend.index = server.pending
+        server.pending_synced = True
+    server._candidates = timed(stats, "candidates", server._candidates)
+    server._commit = timed(stats, "commit", server._commit)
+    server._match_greedy = timed(stats, "station handler", server._match_greedy)
+    server._match_batch = timed(stats, "station handler", server._match_batch)
+    record = server.trace.record
+    server.trace.sample = 1.0
+    def count_decision(rec):
+        stats.reasons[rec.get("reason", "")] += 1
+        record(rec)
+    server.trace.record = count_decision
+
+    triggers: list[tuple[int, int, str]] = []   # (sim time, seq, route_id)
+    departures: list[tuple[int, int, str]] = []
+    arrival_at: dict[str, int] = {}              # route_id -> sim time at its station
+    seq = itertools.count()
+    sink = open(os.devnull, "w") if not args.verbose else None
+
+    async def prepare(route_id: str, now: int):
+        route = backend.routes[route_id]
+        rs = route.stations[0]
+        t0 = time.perf_counter()
+        try:
+            await server.PrepareMatch(matching_pb2.PrepareMatchRequest(
+                driver_id=route.driver_id, route_id=route_id, station_id=rs.station_id,
+                arrival_eta_unix=arrival_at[route_id],
+            ), None)
+        except Exception as e:
+            stats.errors += 1
+            print(f"[sim] PrepareMatch {route_id} failed: {e!r}", file=sys.stderr)
+        stats.stage("PrepareMatch", time.perf_counter() - t0)
+        fence = arrival_at[route_id] - GEOFENCE_S
+        heapq.heappush(triggers, (min(now + DEBOUNCE_S, fence), next(seq), route_id))
+
+    async def trigger(route_id: str, now: int):
+        if args.prepare and now < arrival_at[route_id] - GEOFENCE_S:
+            return await prepare(route_id, now)
+        stats.cur["triggers"] += 1
+        route = backend.routes[route_id]
+        rs = route.stations[0]
+        req = matching_pb2.TryMatchRequest(
+            driver_id=route.driver_id, route_id=route_id, station_id=rs.station_id,
+            arrival_eta_unix=arrival_at[route_id],
+            idempotency_key=f"{route.driver_id}|{route_id}|{rs.station_id}|{now // DEBOUNCE_S}",
+        )
+        t0 = time.perf_counter()
+        try:
+            res = await server.TryMatch(req, None)
+        except Exception as e:
+            stats.errors += 1
+            print(f"[sim] TryMatch {route_id} failed: {e!r}", file=sys.stderr)
+            return
+        ms = (time.perf_counter() - t0) * 1000
+        stats.stage("TryMatch", ms / 1000)
+        stats.cur["try_match"].append(ms)
+        if res.trip_id:
+            stats.cur["trips"] += 1
+            stats.cur["matched"] += len(res.assignments)
+        if res.seats_remaining > 0 and now + DEBOUNCE_S < arrival_at[route_id]:
+            heapq.heappush(triggers, (now + DEBOUNCE_S, next(seq), route_id))
+
+    end = START_UNIX + args.minutes * 60
+    wall0 = time.perf_counter()
+    match_wall = 0.0
+    t = START_UNIX
+    while t < end or triggers or departures:
+        clock.t = t
+        elapsed_min = (t - START_UNIX) // 60
+        if t > START_UNIX and (t - START_UNIX) % (args.report_min * 60) == 0:
+            stats.roll(elapsed_min)
+
+        if t < end:
+            ramp = 1 + (args.ramp - 1) * (t - START_UNIX) / (end - START_UNIX)
+            for _ in range(poisson(args.riders_per_min * ramp * args.tick / 60)):
+                station_id, areas = random.choice(city)
+                eta = t + random.randint(args.rider_lead_min[0] * 60, args.rider_lead_min[1] * 60)
+                backend.add_request(station_id, random.choice(areas), eta)
+                stats.cur["riders"] += 1
+            for _ in range(poisson(args.drivers_per_min * ramp * args.tick / 60)):
+                station_id, areas = random.choice(city)
+                route = backend.add_route(station_id, random.choice(areas), args.seats, args.match_lead_min)
+                arrive = t + random.randint(args.driver_lead_min[0] * 60, args.driver_lead_min[1] * 60)
+                arrival_at[route.id] = arrive
+                heapq.heappush(triggers, (max(t, arrive - args.match_lead_min * 60), next(seq), route.id))
+                heapq.heappush(departures, (arrive, next(seq), route.id))
+                stats.cur["drivers"] += 1
+
+        due = []
+        while triggers and triggers[0][0] <= t:
+            due.append(heapq.heappop(triggers)[2])
+        if due:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+                await asyncio.gather(*(trigger(rid, t) for rid in due))
+            spent = time.perf_counter() - t0
+            match_wall += spent
+            stats.cur["wall_s"] += spent
+
+        while departures and departures[0][0] <= t:
+            route_id = heapq.heappop(departures)[2]
+            route = backend.routes.pop(route_id)
+            stats.utilisation.append((route.seats_total - route.seats_free) / route.seats_total)
+
+        n = len(backend.expire(t - EXPIRE_AFTER_S))
+        stats.expired += n
+        stats.cur["expired"] += n
+
+        t += args.tick
+
+    with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+        while server._background:
+            await asyncio.gather(*server._background, return_exceptions=True)
+    stats.windows.append(stats.cur)
+
+    for rid, at in backend.matched_at.items():
+        r = backend.requests[rid]
+        stats.to_match_s.append(at - backend.created_at[rid])
+        arrive = arrival_at[backend.trip_route[backend.trip_of[rid]]]
+        stats.wait_s.append(max(arrive - r.eta_unix, 0))
+    report(args, stats, backend, time.perf_counter() - wall0, match_wall)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--grid", type=int, default=0, help="generate an N-station city instead of the init_db.py stations")
+    ap.add_argument("--areas", type=int, default=3, help="destination areas per generated station")
+    ap.add_argument("--minutes", type=int, default=60, help="simulated minutes of arrivals")
+    ap.add_argument("--tick", type=int, default=1, help="simulated seconds per step")
+    ap.add_argument("--riders-per-min", type=float, default=60, help="city-wide rider request rate")
+    ap.add_argument("--drivers-per-min", type=float, default=20, help="city-wide driver route rate")
+    ap.add_argument("--ramp", type=float, default=1.0, help="rates grow linearly to this multiple by the end")
+    ap.add_argument("--seats", type=int, default=3, help="seats per route")
+    ap.add_argument("--rider-lead-min", type=int, nargs=2, default=[2, 15], metavar=("LO", "HI"),
+                    help="minutes between placing a request and reaching the station")
+    ap.add_argument("--driver-lead-min", type=int, nargs=2, default=[5, 20], metavar=("LO", "HI"),
+                    help="minutes between registering a route and reaching the station")
+    ap.add_argument("--match-lead-min", type=int, default=5, help="minutes_before_eta_match on each route")
+    ap.add_argument("--mode", choices=["greedy", "batch"], default="greedy", help="MATCH_MODE")
+    ap.add_argument("--commit", choices=["txn", "legacy"], default="txn", help="MATCH_COMMIT")
+    ap.add_argument("--batch-window-ms", type=int, default=50,
+                    help="MATCH_BATCH_WINDOW_MS; real time, so keep it small for long runs")
+    ap.add_argument("--prepare", action="store_true",
+                    help="send PrepareMatch while approaching and TryMatch only at the geofence")
+    ap.add_argument("--neighbours", action="store_true", help="also match riders bound for neighbouring areas")
+    ap.add_argument("--no-index", action="store_true", help="query ListPendingAtStation instead of the pending index")
+    ap.add_argument("--rpc-ms", type=float, default=0.0, help="delay added to every backend call")
+    ap.add_argument("--report-min", type=int, default=10, help="simulated minutes per report row")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--verbose", action="store_true", help="keep the matching service's own logging")
+    asyncio.run(main(ap.parse_args()))
@@ -2,7 +2,32 @@ import asyncio
 import grpc
 from lastmile.v1 import driver_pb2, driver_pb2_grpc
 from common.run import serve
-from common.db import get_db
+from common.cache import TTLCache
+from common.db import get_async_db
+from common.indexes import ensure_indexes
+
+def _to_proto(doc) -> driver_pb2.DriverRoute:
+    stations_pb = [driver_pb2.RouteStation(station_id=s["station_id"], minutes_before_eta_match=s["minutes_before_eta_match"]) for s in doc["stations"]]
+    return driver_pb2.DriverRoute(
+        id=str(doc["_id"]),
+        driver_id=doc["driver_id"],
+        dest_area=doc["dest_area"],
+        seats_total=doc["seats_total"],
+        seats_free=doc["seats_free"],
+        stations=stations_pb,
+        version=doc.get("version", 0)
+    )
+
+# GetRoute/GetRoutes are served from memory: route id -> (version, prebuilt GetRouteResponse).
+# This service's own writes replace or drop entries; the trip service reports its seat
+# changes and deletes with RouteChanged, which re-reads the route. The TTL only bounds how
+# long a lost RouteChanged can leave an entry behind.
+ROUTE_CACHE_TTL_S = 5
+ROUTE_CACHE_SIZE  = 100000
+DELETED = float("inf")   # version of a deleted route's entry, so no read can put it back
+
+NOT_FOUND    = driver_pb2.GetRouteResponse()
+NOT_MODIFIED = driver_pb2.GetRouteResponse(not_modified=True)
 
 class DriverStore:
     def __init__(self):
@@ -11,8 +36,24 @@ class DriverStore:
 
 class DriverServer(driver_pb2_grpc.DriverServiceServicer):
     def __init__(self):
-        self.db = get_db()
+        self.db = get_async_db()
         self.routes = self.db.driver_routes
+        self._cache = TTLCache(ROUTE_CACHE_TTL_S, ROUTE_CACHE_SIZE)
+
+    async def start(self):
+        await ensure_indexes(self.db, "driver_routes")
+
+    def _cached(self, doc) -> driver_pb2.GetRouteResponse:
+        """The response for `doc`, kept unless a newer version is already cached (a read
+        that raced a write can't replace what the write stored)."""
+        version = doc.get("version", 0)
+        rid = str(doc["_id"])
+        cur = self._cache.get(rid)
+        if cur is not None and cur[0] >= version:
+            return cur[1]
+        resp = driver_pb2.GetRouteResponse(route=_to_proto(doc))
+        self._cache.set(rid, (version, resp))
+        return resp
 
     async def RegisterRoute(self, request, context):
         print(f"[driver] RegisterRoute request={request}")
@@ -31,16 +72,12 @@ class DriverServer(driver_pb2_grpc.DriverServiceServicer):
             "dest_area": r.dest_area,
             "seats_total": r.seats_total,
             "seats_free": r.seats_free,
-            "stations": stations_data
+            "stations": stations_data,
+            "version": 1
         }
         
-        res = self.routes.insert_one(route_doc)
-        rid = str(res.inserted_id)
-        
-        nr = driver_pb2.DriverRoute(
-            id=rid, driver_id=r.driver_id, dest_area=r.dest_area,
-            seats_total=r.seats_total, seats_free=route_doc["seats_free"], stations=list(r.stations)
-        )
+        await self.routes.insert_one(route_doc)
+        nr = self._cached(route_doc).route
         return driver_pb2.RegisterRouteResponse(route=nr)
 
     async def UpdateSeats(self, request, context):
@@ -48,9 +85,9 @@ class DriverServer(driver_pb2_grpc.DriverServiceServicer):
         from bson.objectid import ObjectId
         try:
             oid = ObjectId(request.route_id)
-            res = self.routes.find_one_and_update(
+            res = await self.routes.find_one_and_update(
                 {"_id": oid},
-                {"$set": {"seats_free": request.seats_free}},
+                {"$set": {"seats_free": request.seats_free}, "$inc": {"version": 1}},
                 return_document=True
             )
         except:
@@ -59,57 +96,69 @@ class DriverServer(driver_pb2_grpc.DriverServiceServicer):
         if not res:
             return driver_pb2.UpdateSeatsResponse()
             
-        # Reconstruct proto
-        stations_pb = [driver_pb2.RouteStation(station_id=s["station_id"], minutes_before_eta_match=s["minutes_before_eta_match"]) for s in res["stations"]]
-        
-        r = driver_pb2.DriverRoute(
-            id=str(res["_id"]),
-            driver_id=res["driver_id"],
-            dest_area=res["dest_area"],
-            seats_total=res["seats_total"],
-            seats_free=res["seats_free"],
-            stations=stations_pb
-        )
-        return driver_pb2.UpdateSeatsResponse(route=r)
+        return driver_pb2.UpdateSeatsResponse(route=self._cached(res).route)
 
     async def GetRoute(self, request, context):
-        print(f"[driver] GetRoute request={request}")
+        cur = self._cache.get(request.route_id)
+        if cur is not None:
+            resp = cur[1]
+        else:
+            print(f"[driver] GetRoute {request.route_id} (not cached)")
+            from bson.objectid import ObjectId
+            try:
+                res = await self.routes.find_one({"_id": ObjectId(request.route_id)})
+            except:
+                res = None
+            resp = self._cached(res) if res else NOT_FOUND
+        if request.if_version and resp.route.version == request.if_version:
+            return NOT_MODIFIED
+        return resp
+
+    async def GetRoutes(self, request, context):
+        print(f"[driver] GetRoutes {len(request.route_ids)} routes")
         from bson.objectid import ObjectId
-        try:
-            oid = ObjectId(request.route_id)
-            res = self.routes.find_one({"_id": oid})
-        except:
-            res = None
-            
-        if not res:
-            return driver_pb2.GetRouteResponse()
-            
-        stations_pb = [driver_pb2.RouteStation(station_id=s["station_id"], minutes_before_eta_match=s["minutes_before_eta_match"]) for s in res["stations"]]
-        
-        r = driver_pb2.DriverRoute(
-            id=str(res["_id"]),
-            driver_id=res["driver_id"],
-            dest_area=res["dest_area"],
-            seats_total=res["seats_total"],
-            seats_free=res["seats_free"],
-            stations=stations_pb
-        )
-        return driver_pb2.GetRouteResponse(route=r)
+        out, missing = [], []
+        for rid in request.route_ids:
+            cur = self._cache.get(rid)
+            if cur is None:
+                missing.append(rid)
+            elif cur[1].route.id:   # not deleted
+                out.append(cur[1].route)
+        oids = [ObjectId(rid) for rid in missing if ObjectId.is_valid(rid)]
+        docs = await self.routes.find({"_id": {"$in": oids}}).to_list() if oids else []
+        out += [self._cached(d).route for d in docs]
+        return driver_pb2.GetRoutesResponse(routes=out)
 
     async def DeleteRoute(self, request, context):
         print(f"[driver] DeleteRoute request={request}")
         from bson.objectid import ObjectId
         try:
             oid = ObjectId(request.route_id)
-            res = self.routes.delete_one({"_id": oid})
+            res = await self.routes.delete_one({"_id": oid})
+            self._cache.set(request.route_id, (DELETED, NOT_FOUND))
         except Exception as e:
             print(f"[driver] DeleteRoute error: {e}")
             
         return driver_pb2.DeleteRouteResponse(route_id=request.route_id)
 
-def factory():
+    async def RouteChanged(self, request, context):
+        from bson.objectid import ObjectId
+        try:
+            doc = await self.routes.find_one({"_id": ObjectId(request.route_id)})
+        except Exception as e:
+            print(f"[driver] RouteChanged error: {e}")
+            return driver_pb2.RouteChangedResponse()
+        if doc:
+            self._cached(doc)   # newer version replaces the cached one
+        else:
+            self._cache.set(request.route_id, (DELETED, NOT_FOUND))
+        return driver_pb2.RouteChangedResponse()
+
+async def factory():
     server = grpc.aio.server()
-    driver_pb2_grpc.add_DriverServiceServicer_to_server(DriverServer(), server)
+    driver_svc = DriverServer()
+    await driver_svc.start()
+    driver_pb2_grpc.add_DriverServiceServicer_to_server(driver_svc, server)
     return server
 
 if __name__ == "__main__":
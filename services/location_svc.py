@@ -1,4 +1,7 @@
 # services/location_svc.py
+import asyncio
+import os
+import socket
 import time
 import grpc
 from lastmile.v1 import (
@@ -6,34 +9,158 @@ from lastmile.v1 import (
     matching_pb2, matching_pb2_grpc,
     station_pb2, station_pb2_grpc,
     driver_pb2, driver_pb2_grpc,
+    trip_pb2, trip_pb2_grpc,
     common_pb2,
 )
 from common.geo import haversine_m
+from common.mailbox import LatestMailbox
 from common.env import addr
-from common.run import serve
+from common.hashring import HashRing
+from common.batching import WindowBatcher
+from common.run import run_grpc
 
-# Tunables (no speed/ETA used)
-GEOFENCE_METERS  = 400.0   # trigger radius around a station
-DEBOUNCE_SECONDS = 30      # suppress repeated triggers per (driver, station)
+# Tunables
+GEOFENCE_METERS    = 400.0   # trigger radius around a station
+DEBOUNCE_SECONDS   = 30      # suppress repeated triggers per (driver, station)
+AVG_SPEED_MPS      = 10      # approx driving speed, for ETA from straight-line distance
+ROUTE_REVALIDATE_S = 30      # re-check a cached route this often (If-Version, usually not_modified)
+
+# Pre-matching: inside minutes_before_eta_match but outside the geofence, the matcher is
+# sent a PrepareMatch hint so the rider set is ready when the driver arrives.
+PREPARE_DEBOUNCE_SECONDS = 30    # refresh a hint at most this often per (driver, station)
+PREPARE_TIMEOUT_S        = 1.0
+
+# Flow control
+MAX_STREAMS        = int(os.getenv("LOCATION_MAX_STREAMS", "2000"))  # open location streams per replica
+MAX_INFLIGHT_PINGS = int(os.getenv("LOCATION_MAX_INFLIGHT", "256"))  # pings processed concurrently per replica
+
+# Station-affinity routing: MATCH_DISCOVERY names a headless service ("host:port") whose
+# DNS records are the matching pods. Without it every TryMatch goes to MATCH_ADDR.
+MATCH_DISCOVERY      = os.getenv("MATCH_DISCOVERY", "")
+DISCOVERY_INTERVAL_S = 5
+
+# Trigger batching: with LOCATION_MATCH_BATCH_MS > 0, triggers bound for the same matching
+# replica within that window go out as one TryMatchBatch (bursts, e.g. a train arriving).
+MATCH_BATCH_MS  = int(os.getenv("LOCATION_MATCH_BATCH_MS", "0"))
+MATCH_BATCH_MAX = 64
+
+class MatchRouter:
+    """Sends each TryMatch to the matching replica that owns its station on a hash ring,
+    so a station's state stays hot on one pod. The ring follows replicas as they come
+    and go; if the owner is unreachable the next replica on the ring is tried."""
+
+    def __init__(self, default_addr: str, discovery: str):
+        self._discovery = discovery
+        self.ring = HashRing([default_addr])
+        self._channels: dict[str, grpc.aio.Channel] = {}
+        self._stubs: dict[str, matching_pb2_grpc.MatchingServiceStub] = {}
+        self._batching = MATCH_BATCH_MS > 0
+        self._batchers: dict[str, WindowBatcher] = {}
+
+    def _stub(self, node: str) -> matching_pb2_grpc.MatchingServiceStub:
+        stub = self._stubs.get(node)
+        if stub is None:
+            self._channels[node] = grpc.aio.insecure_channel(node)
+            stub = self._stubs[node] = matching_pb2_grpc.MatchingServiceStub(self._channels[node])
+        return stub
+
+    async def refresh(self):
+        host, port = self._discovery.rsplit(":", 1)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, int(port), type=socket.SOCK_STREAM)
+        nodes = set()
+        for family, _, _, _, sockaddr in infos:
+            ip = sockaddr[0]
+            nodes.add(f"[{ip}]:{port}" if family == socket.AF_INET6 else f"{ip}:{port}")
+        if not nodes or not self.ring.set_nodes(nodes):
+            return
+        print(f"[location] matching replicas: {sorted(nodes)}")
+        for node in set(self._channels) - nodes:
+            self._stubs.pop(node, None)
+            self._batchers.pop(node, None)
+            ch = self._channels.pop(node)
+            asyncio.create_task(ch.close(grace=5))
+
+    async def watch(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[location] matching discovery failed: {e!r}")
+            await asyncio.sleep(DISCOVERY_INTERVAL_S)
+
+    async def try_match(self, request: matching_pb2.TryMatchRequest) -> matching_pb2.TryMatchResponse:
+        if self._batching:
+            node = self.ring.lookup(request.station_id)[0]
+            return await self._batcher(node).submit(request)
+        return await self._call("TryMatch", request)
+
+    def _batcher(self, node: str) -> WindowBatcher:
+        b = self._batchers.get(node)
+        if b is None:
+            b = self._batchers[node] = WindowBatcher(
+                lambda reqs: self._flush(node, reqs), MATCH_BATCH_MS / 1000, MATCH_BATCH_MAX)
+        return b
+
+    async def _flush(self, node: str, reqs: list) -> list:
+        try:
+            resp = await self._stub(node).TryMatchBatch(matching_pb2.TryMatchBatchRequest(triggers=reqs))
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                print("[location] matching service has no TryMatchBatch; batching disabled")
+                self._batching = False
+            elif e.code() != grpc.StatusCode.UNAVAILABLE:
+                raise
+            # Owner gone or too old for batches: one by one, with failover
+            return await asyncio.gather(*(self._call("TryMatch", r) for r in reqs), return_exceptions=True)
+        return [RuntimeError(f"TryMatch failed: {r.error}") if r.error else r.response for r in resp.results]
+
+    async def prepare_match(self, request: matching_pb2.PrepareMatchRequest) -> matching_pb2.PrepareMatchResponse:
+        # Same owner as the TryMatch that follows, which is where the hold is kept.
+        return await self._call("PrepareMatch", request, timeout=PREPARE_TIMEOUT_S)
+
+    async def _call(self, method: str, request, timeout: float | None = None):
+        nodes = self.ring.lookup(request.station_id, n=2)
+        for i, node in enumerate(nodes):
+            try:
+                return await getattr(self._stub(node), method)(request, timeout=timeout)
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNAVAILABLE or i == len(nodes) - 1:
+                    raise
+                print(f"[location] matching replica {node} unavailable; trying {nodes[i + 1]}")
 
 class LocationServer(location_pb2_grpc.LocationServiceServicer):
     def __init__(self):
         self._match_addr   = addr("MATCH_ADDR",   "localhost:50057")
         self._station_addr = addr("STATION_ADDR", "localhost:50052")
         self._driver_addr  = addr("DRIVER_ADDR",  "localhost:50053")
+        self._trip_addr    = addr("TRIP_ADDR",    "localhost:50055")
 
-        self._match_ch   = grpc.aio.insecure_channel(self._match_addr)
         self._station_ch = grpc.aio.insecure_channel(self._station_addr)
         self._driver_ch  = grpc.aio.insecure_channel(self._driver_addr)
+        self._trip_ch    = grpc.aio.insecure_channel(self._trip_addr)
 
-        self.match   = matching_pb2_grpc.MatchingServiceStub(self._match_ch)
+        self.match   = MatchRouter(self._match_addr, MATCH_DISCOVERY)
         self.station = station_pb2_grpc.StationServiceStub(self._station_ch)
         self.driver  = driver_pb2_grpc.DriverServiceStub(self._driver_ch)
+        self.trip    = trip_pb2_grpc.TripServiceStub(self._trip_ch)
 
         # small caches
         self._station_coord_cache: dict[str, common_pb2.LatLng] = {}   # station_id -> LatLng
-        self._route_cache: dict[str, driver_pb2.DriverRoute] = {}      # route_id -> DriverRoute
+        self._route_cache: dict[str, tuple[float, driver_pb2.DriverRoute]] = {}  # route_id -> (checked, route)
         self._last_trigger: dict[tuple[str, str], float] = {}          # (driver_id, station_id) -> ts
+        self._last_prepare: dict[tuple[str, str], float] = {}          # (driver_id, station_id) -> ts
+
+        # PrepareMatch hints are fire-and-forget
+        self._prepare_enabled = True
+        self._background: set[asyncio.Task] = set()
+
+        # open DriverSession streams
+        self._sessions: dict[str, set[asyncio.Queue]] = {}             # driver_id -> event queues
+
+        # flow control
+        self._streams = 0
+        self._inflight = asyncio.Semaphore(MAX_INFLIGHT_PINGS)
+        self._pings_dropped = 0                                        # replica-wide coalesced pings
 
     async def _get_station_coord(self, station_id: str) -> common_pb2.LatLng | None:
         if station_id in self._station_coord_cache:
@@ -45,12 +172,19 @@ class LocationServer(location_pb2_grpc.LocationServiceServicer):
         return None
 
     async def _get_route(self, route_id: str) -> driver_pb2.DriverRoute | None:
-        if route_id in self._route_cache:
-            return self._route_cache[route_id]
-        ro = await self.driver.GetRoute(driver_pb2.GetRouteRequest(route_id=route_id))
-        if ro and ro.route and ro.route.id:
-            self._route_cache[route_id] = ro.route
+        now = time.monotonic()
+        checked, route = self._route_cache.get(route_id, (0.0, None))
+        if route is not None and now - checked < ROUTE_REVALIDATE_S:
+            return route
+        ro = await self.driver.GetRoute(driver_pb2.GetRouteRequest(
+            route_id=route_id, if_version=route.version if route is not None else 0))
+        if ro.not_modified:
+            self._route_cache[route_id] = (now, route)
+            return route
+        if ro.route.id:
+            self._route_cache[route_id] = (now, ro.route)
             return ro.route
+        self._route_cache.pop(route_id, None)   # deleted
         return None
 
     def _debounced(self, driver_id: str, station_id: str, now: float) -> bool:
@@ -61,54 +195,228 @@ class LocationServer(location_pb2_grpc.LocationServiceServicer):
         self._last_trigger[key] = now
         return False
 
-    async def StreamDriverLocation(self, request_iterator, context):
-        async for loc in request_iterator:
-            print(f"[location] StreamDriverLocation received loc={loc}")
-            route = await self._get_route(loc.route_id)
-            if not route or not route.stations:
-                # No registered stations — nothing to check
-                continue
+    def _prepare_due(self, driver_id: str, station_id: str, now: float) -> bool:
+        if not self._prepare_enabled:
+            return False
+        key = (driver_id, station_id)
+        if now - self._last_prepare.get(key, 0.0) < PREPARE_DEBOUNCE_SECONDS:
+            return False
+        self._last_prepare[key] = now
+        return True
+
+    async def _prepare(self, request: matching_pb2.PrepareMatchRequest):
+        try:
+            await self.match.prepare_match(request)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                print("[location] matching service has no PrepareMatch; pre-match hints disabled")
+                self._prepare_enabled = False
+            else:
+                print(f"[location] PrepareMatch {request.route_id}@{request.station_id} failed: {e.code()}")
 
-            # Check proximity for every station on the route
-            for rs in route.stations:
-                station_id = rs.station_id
-                st = await self._get_station_coord(station_id)
-                if not st:
-                    continue
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
 
-                # Distance between driver and station
-                dist_m = haversine_m(loc.point.lat, loc.point.lon, st.lat, st.lon)
-                if dist_m > GEOFENCE_METERS:
-                    continue
+    async def _handle_ping(self, loc, ack: location_pb2.LocationStreamAck, received: float):
+        # `received` is when the ping came off the stream (perf_counter), so ping_to_trip_ms
+        # includes time spent in the mailbox and waiting for an in-flight slot.
+        route = await self._get_route(loc.route_id)
+        if not route or not route.stations:
+            # No registered stations — nothing to check
+            return
 
-                # --- NEW: ETA based on distance ---
-                AVG_SPEED_MPS = 10  # approx driving speed in m/s   
-                eta_minutes = (dist_m / AVG_SPEED_MPS) / 60.0
+        # Check proximity for every station on the route
+        for rs in route.stations:
+            station_id = rs.station_id
+            st = await self._get_station_coord(station_id)
+            if not st:
+                continue
+
+            # Distance between driver and station, and ETA based on distance
+            dist_m = haversine_m(loc.point.lat, loc.point.lon, st.lat, st.lon)
+            eta_minutes = (dist_m / AVG_SPEED_MPS) / 60.0
+
+            # If ETA is greater than allowed minutes_before_eta_match → skip
+            if eta_minutes > rs.minutes_before_eta_match:
+                continue
 
-                # If ETA is greater than allowed minutes_before_eta_match → skip
-                if eta_minutes > rs.minutes_before_eta_match:
-                    continue    
+            now = time.time()
+            if dist_m > GEOFENCE_METERS:
+                # Still approaching: have the matcher line riders up ahead of arrival
+                if self._prepare_due(loc.driver_id, station_id, now):
+                    ack.prepare_hints += 1
+                    self._spawn(self._prepare(matching_pb2.PrepareMatchRequest(
+                        driver_id=loc.driver_id,
+                        route_id=loc.route_id,
+                        station_id=station_id,
+                        arrival_eta_unix=int(loc.ts_unix + dist_m / AVG_SPEED_MPS),
+                    )))
+                continue
 
-                now = time.time()
-                if self._debounced(loc.driver_id, station_id, now):
-                    continue
+            if self._debounced(loc.driver_id, station_id, now):
+                continue
 
-                # arrival_eta_unix = ping time; we’re already at the station zone
-                resp = await self.match.TryMatch(matching_pb2.TryMatchRequest(
+            # arrival_eta_unix = ping time; we’re already at the station zone
+            ack.geofence_triggers += 1
+            t0 = time.perf_counter()
+            resp = await self.match.try_match(matching_pb2.TryMatchRequest(
+                driver_id=loc.driver_id,
+                route_id=loc.route_id,
+                station_id=station_id,
+                arrival_eta_unix=int(loc.ts_unix),
+                # The same key from any replica or retry, so a repeat trigger after a
+                # committed match gets that trip back from the matcher's cache.
+                idempotency_key=f"{loc.driver_id}|{loc.route_id}|{station_id}",
+            ))
+            done = time.perf_counter()
+            ack.try_match_ms.append((done - t0) * 1000)
+            if resp.trip_id:
+                print(f"[location] matched at {station_id}: trip={resp.trip_id}, seats_left={resp.seats_remaining}")
+                ack.matches.append(location_pb2.StreamMatch(
+                    trip_id=resp.trip_id,
+                    station_id=station_id,
+                    ping_ts_unix=loc.ts_unix,
+                    try_match_ms=(done - t0) * 1000,
+                    ping_to_trip_ms=(done - received) * 1000,
+                ))
+                self._publish(location_pb2.DriverEvent(
+                    type="MATCHED",
                     driver_id=loc.driver_id,
                     route_id=loc.route_id,
                     station_id=station_id,
-                    arrival_eta_unix=int(loc.ts_unix),
+                    trip_id=resp.trip_id,
+                    assignments=list(resp.assignments),
+                    seats_remaining=resp.seats_remaining,
+                    ts_unix=int(now),
                 ))
-                if resp.trip_id:
-                    print(f"[location] matched at {station_id}: trip={resp.trip_id}, seats_left={resp.seats_remaining}")
 
-        return location_pb2.LocationStreamAck(ok=True)
+    def _publish(self, ev: location_pb2.DriverEvent):
+        for q in self._sessions.get(ev.driver_id, ()):
+            q.put_nowait(ev)
+
+    async def watch_trips(self):
+        # Trip status changes (scheduled, started, completed...) go to the driver's open
+        # sessions. Changes made while the feed is down are not replayed.
+        print("[location] Starting trip feed...")
+        while True:
+            try:
+                async for ev in self.trip.WatchTrips(trip_pb2.WatchTripsRequest()):
+                    t = ev.trip
+                    self._publish(location_pb2.DriverEvent(
+                        type="TRIP_STATUS",
+                        driver_id=t.driver_id,
+                        route_id=t.route_id,
+                        station_id=t.station_id,
+                        trip_id=t.id,
+                        trip_status=t.status,
+                        ts_unix=ev.ts_unix,
+                    ))
+            except grpc.RpcError as e:
+                print(f"[location] trip feed lost: {e.code()}; reconnecting")
+            await asyncio.sleep(1)
+
+    async def _consume(self, request_iterator, ack: location_pb2.LocationStreamAck, on_ping=None):
+        # The reader drains the stream into a latest-value-wins mailbox keyed by
+        # (driver, route), so while a slow TryMatch or cache miss is in flight only the
+        # newest position is kept and stale intermediate pings are dropped, not queued.
+        box = LatestMailbox()
+
+        async def reader():
+            try:
+                async for loc in request_iterator:
+                    ack.pings += 1
+                    if on_ping:
+                        on_ping(loc)
+                    box.put((loc.driver_id, loc.route_id), (loc, time.perf_counter()))
+            finally:
+                box.close()
+
+        task = asyncio.create_task(reader())
+        try:
+            while (item := await box.get()) is not None:
+                loc, received = item
+                print(f"[location] processing loc={loc}")
+                async with self._inflight:
+                    await self._handle_ping(loc, ack, received)
+            await task  # surface errors from the read side
+        finally:
+            task.cancel()
+            ack.pings_dropped = box.dropped
+            self._pings_dropped += box.dropped
+            if box.dropped:
+                print(f"[location] stream dropped {box.dropped}/{ack.pings} stale pings (total {self._pings_dropped})")
+
+    async def _admit(self, context):
+        if self._streams >= MAX_STREAMS:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"location stream limit {MAX_STREAMS} reached")
+        self._streams += 1
+
+    async def StreamDriverLocation(self, request_iterator, context):
+        await self._admit(context)
+        ack = location_pb2.LocationStreamAck(ok=True)
+        try:
+            await self._consume(request_iterator, ack)
+        finally:
+            self._streams -= 1
+        return ack
+
+    async def DriverSession(self, request_iterator, context):
+        # Pings are consumed by a separate task so events can be written back while
+        # TryMatch is still in flight. A session also receives matches produced for
+        # its driver on other streams (e.g. gateway pings), and its trips' status changes.
+        await self._admit(context)
+        events: asyncio.Queue = asyncio.Queue()
+        drivers: set[str] = set()
+        ack = location_pb2.LocationStreamAck(ok=True)
+
+        def subscribe(loc):
+            if loc.driver_id and loc.driver_id not in drivers:
+                drivers.add(loc.driver_id)
+                self._sessions.setdefault(loc.driver_id, set()).add(events)
+
+        async def pump():
+            try:
+                await self._consume(request_iterator, ack, on_ping=subscribe)
+            finally:
+                events.put_nowait(None)
+
+        task = asyncio.create_task(pump())
+        try:
+            while (ev := await events.get()) is not None:
+                yield ev
+            await task  # surface errors from the ping side
+        finally:
+            task.cancel()
+            self._streams -= 1
+            for d in drivers:
+                subs = self._sessions.get(d)
+                if subs is not None:
+                    subs.discard(events)
+                    if not subs:
+                        del self._sessions[d]
+
+async def main():
+    server = grpc.aio.server(maximum_concurrent_rpcs=MAX_STREAMS + 64)
+    location_svc = LocationServer()
+    location_pb2_grpc.add_LocationServiceServicer_to_server(location_svc, server)
+
+    # Track matching replicas for station-affinity routing
+    discovery_task = asyncio.create_task(location_svc.match.watch()) if MATCH_DISCOVERY else None
+    # Trip status changes for open driver sessions
+    trips_task = asyncio.create_task(location_svc.watch_trips())
 
-def factory():
-    server = grpc.aio.server()
-    location_pb2_grpc.add_LocationServiceServicer_to_server(LocationServer(), server)
-    return server
+    try:
+        await run_grpc(server, "[::]:50058")
+    finally:
+        for task in (discovery_task, trips_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
 if __name__ == "__main__":
-    serve(factory, "[::]:50058")
+    asyncio.run(main())
@@ -1,14 +1,84 @@
+import asyncio
+import heapq
+import os
 import grpc
-from time import time
+from bisect import insort
+from dataclasses import dataclass, field
+from time import time, perf_counter
 from lastmile.v1 import (
     matching_pb2, matching_pb2_grpc,
     driver_pb2, driver_pb2_grpc,
     rider_pb2, rider_pb2_grpc,
     trip_pb2, trip_pb2_grpc,
     notification_pb2, notification_pb2_grpc,
+    station_pb2, station_pb2_grpc,
 )
 from common.env import addr
-from common.run import serve
+from common.run import run_grpc
+from common.pending_index import PendingIndex
+from common.assignment import assign_slots, INF
+from common.actor import Actor
+from common.cache import TTLCache
+from common.areas import AreaIndex, normalize
+from common.trace import DecisionTrace, span
+
+MATCH_WINDOW_MINUTES = 12  # rider eta must be within +/- this of now
+USE_PENDING_INDEX = os.getenv("MATCH_PENDING_INDEX", "1") != "0"
+
+# Destinations compare after normalisation. With MATCH_DEST_NEIGHBOURS=1 a route also takes
+# riders bound for areas listed alongside its own at some station (from the station
+# service's area index), at a cost. Off by default: riders get their exact area.
+MATCH_DEST_NEIGHBOURS = os.getenv("MATCH_DEST_NEIGHBOURS", "0") != "0"
+NEIGHBOUR_COST        = 120     # seconds of ETA gap a drop-off in a neighbouring area is worth
+AREA_REFRESH_S        = 60
+
+# Triggers are serialised per station by an Actor.
+# greedy: each trigger takes the closest-ETA riders, one after another.
+# batch:  triggers at a station are collected for BATCH_WINDOW_MS and assigned together.
+MATCH_MODE      = os.getenv("MATCH_MODE", "greedy")
+BATCH_WINDOW_MS = int(os.getenv("MATCH_BATCH_WINDOW_MS", "500"))
+SEAT_COST       = 30       # seconds of ETA gap one extra occupied seat on the same driver is worth
+SKIP_COST       = 10**6    # leaving a seat empty; above any in-window ETA gap
+
+# txn:    one TripService.CommitMatch call reserves seats, creates the trip and assigns riders.
+# legacy: separate CreateTrip, MarkAssigned and UpdateSeats calls.
+MATCH_COMMIT = os.getenv("MATCH_COMMIT", "txn")
+
+IDEMPOTENCY_TTL_S = 30   # how long a committed TryMatch result answers duplicates
+
+# Pre-matching: PrepareMatch (sent by location while a driver is still approaching) keeps a
+# tentative rider set per route, topped up as riders arrive. Held riders are a soft
+# reservation: other drivers at the station take them only to avoid leaving seats empty.
+HOLD_GRACE_S = 120       # a hold lapses this long after the projected arrival
+
+# Decision trace: a sampled record of every TryMatch outcome (reason code, candidates,
+# chosen riders and their ETA gaps, per-stage timings), kept in a ring buffer served by
+# GetDecisions and optionally appended as JSON lines to MATCH_TRACE_FILE.
+TRACE_SAMPLE = float(os.getenv("MATCH_TRACE_SAMPLE", "1.0"))
+TRACE_SIZE   = int(os.getenv("MATCH_TRACE_SIZE", "2000"))
+TRACE_FILE   = os.getenv("MATCH_TRACE_FILE", "")
+
+# Per-call deadlines (seconds) for downstream RPCs
+DEADLINE_S = {
+    "GetRoute": 1.0,
+    "GetRoutes": 1.0,
+    "GetAreaIndex": 2.0,
+    "ListPendingAtStation": 1.0,
+    "StreamPendingAtStation": 1.0,
+    "CommitMatch": 2.0,
+    "CreateTrip": 1.0,
+    "MarkAssigned": 1.0,
+    "UpdateSeats": 1.0,
+    "Push": 2.0,
+}
+
+@dataclass
+class Hold:
+    route: driver_pb2.DriverRoute
+    station_id: str
+    arrival_eta_unix: int
+    expires_unix: int
+    request_ids: list[str] = field(default_factory=list)   # preference order
 
 class MatchingServer(matching_pb2_grpc.MatchingServiceServicer):
     def __init__(self):
@@ -16,63 +86,636 @@ class MatchingServer(matching_pb2_grpc.MatchingServiceServicer):
         self._rider_addr  = addr("RIDER_ADDR", "localhost:50054")
         self._trip_addr   = addr("TRIP_ADDR",  "localhost:50055")
         self._notify_addr = addr("NOTIFY_ADDR","localhost:50056")
+        self._station_addr = addr("STATION_ADDR", "localhost:50052")
 
         self._driver_ch = grpc.aio.insecure_channel(self._driver_addr)
         self._rider_ch  = grpc.aio.insecure_channel(self._rider_addr)
         self._trip_ch   = grpc.aio.insecure_channel(self._trip_addr)
         self._notify_ch = grpc.aio.insecure_channel(self._notify_addr)
+        self._station_ch = grpc.aio.insecure_channel(self._station_addr)
 
         self.driver = driver_pb2_grpc.DriverServiceStub(self._driver_ch)
         self.rider  = rider_pb2_grpc.RiderServiceStub(self._rider_ch)
         self.trip   = trip_pb2_grpc.TripServiceStub(self._trip_ch)
         self.notify = notification_pb2_grpc.NotificationServiceStub(self._notify_ch)
+        self.station = station_pb2_grpc.StationServiceStub(self._station_ch)
 
-    async def TryMatch(self, request, context):
-        print(f"[matching] TryMatch request={request}")
-        ro = await self.driver.GetRoute(driver_pb2.GetRouteRequest(route_id=request.route_id))
-        route = ro.route
-        if not route or route.seats_free <= 0 or not route.dest_area:
-            return matching_pb2.TryMatchResponse(seats_remaining=route.seats_free if route else 0)
+        # Area -> neighbouring areas, refreshed from StationService.GetAreaIndex
+        self.areas = AreaIndex()
+
+        # PENDING rider requests mirrored from RiderService.WatchPending;
+        # only trusted once the initial snapshot has been applied.
+        self.pending = PendingIndex()
+        self.pending_synced = False
+
+        self._actors: dict[str, Actor] = {}             # station_id -> single-writer matcher
+
+        # Tentative rider sets from PrepareMatch
+        self._holds: dict[str, Hold] = {}               # route_id -> hold
+        self._station_holds: dict[str, set[str]] = {}   # station_id -> route_ids holding there
+        self._held_by: dict[str, str] = {}              # request_id -> route_id holding it
+        self._hold_expiry: list[tuple[int, str]] = []   # heap of (expires_unix, route_id)
+
+        # Idempotency: finished results by key, and attempts still running
+        self._results = TTLCache(IDEMPOTENCY_TTL_S)
+        self._attempts: dict[str, asyncio.Task] = {}
+
+        # Seats left per route as of a version, from CommitMatch: the driver service's
+        # cached copy may not have caught up yet when the driver triggers again.
+        self._route_seats = TTLCache(HOLD_GRACE_S * 30)   # route_id -> (version, seats_free)
+
+        self._commit_rpc = MATCH_COMMIT != "legacy"
+        self._get_routes_rpc = True                     # DriverService.GetRoutes, for batches
+        self._stream_pending_rpc = True                 # RiderService.StreamPendingAtStation
+        self._background: set[asyncio.Task] = set()     # post-commit work off the response path
+        self.trace = DecisionTrace(TRACE_SIZE, TRACE_SAMPLE, TRACE_FILE)
+
+    async def watch_pending(self):
+        print("[matching] Starting pending-request feed...")
+        while True:
+            staging = PendingIndex()
+            try:
+                async for ev in self.rider.WatchPending(rider_pb2.WatchPendingRequest()):
+                    idx = self.pending if self.pending_synced else staging
+                    if ev.type == "UPSERT":
+                        idx.upsert(ev.request)
+                        if self.pending_synced:
+                            self._offer(ev.request)
+                    elif ev.type == "REMOVE":
+                        idx.remove(ev.request.id)
+                        if self.pending_synced:
+                            self._unhold(ev.request.id)
+                    elif ev.type == "SYNCED":
+                        self.pending, self.pending_synced = staging, True
+                        print(f"[matching] pending index synced ({len(staging)} requests)")
+            except grpc.RpcError as e:
+                print(f"[matching] pending feed lost: {e.code()}; resyncing")
+            self.pending_synced = False
+            await asyncio.sleep(1)
+
+    async def watch_areas(self):
+        while True:
+            try:
+                resp = await self.station.GetAreaIndex(station_pb2.GetAreaIndexRequest(
+                    if_version=self.areas.version), timeout=DEADLINE_S["GetAreaIndex"])
+                if not resp.not_modified:
+                    self.areas = AreaIndex.from_entries(
+                        (e.area, e.display_name, e.station_ids, e.neighbours) for e in resp.entries)
+                    print(f"[matching] area index {resp.version:x}: {len(self.areas)} areas")
+            except grpc.RpcError as e:
+                print(f"[matching] area index refresh failed: {e.code()}")
+            await asyncio.sleep(AREA_REFRESH_S)
+
+    def _dests(self, dest_area: str) -> set[str]:
+        """Normalised destinations a route to `dest_area` can take riders for."""
+        return self.areas.compatible(dest_area, MATCH_DEST_NEIGHBOURS)
 
+    def _gap(self, r, arrival_eta_unix: int, dest_key: str) -> int:
+        detour = 0 if normalize(r.dest_area) == dest_key else NEIGHBOUR_COST
+        return abs(r.eta_unix - arrival_eta_unix) + detour
+
+    def _diagnose(self, rec: dict, station_id: str, dest_area: str):
+        """Why nothing was in window: who is pending at the station, and how close the
+        nearest compatible rider is (needs the synced index)."""
+        if not self.pending_synced:
+            rec["reason"] = "NO_CANDIDATES"
+            return
         now = int(time())
+        compatible = [r for d in self._dests(dest_area)
+                      for r in self.pending.range(station_id, d, 0, 2**63 - 1)]
+        rec["pending_at_station"] = self.pending.count(station_id)
+        rec["compatible_pending"] = len(compatible)
+        if compatible:
+            rec["nearest_gap_s"] = min(abs(r.eta_unix - now) for r in compatible)
+        rec["reason"] = ("NO_RIDERS" if not rec["pending_at_station"]
+                         else "DEST_MISMATCH" if not compatible else "WINDOW_MISS")
+
+    async def _candidates(self, station_id: str, dest_area: str, now: int) -> list:
+        lo, hi = now - MATCH_WINDOW_MINUTES*60, now + MATCH_WINDOW_MINUTES*60
+        dests = self._dests(dest_area)
+        if self.pending_synced:
+            out = []
+            for d in dests:
+                out += self.pending.range(station_id, d, lo, hi)
+            return out
+        # Every destination at the station; compatibility is decided here
         rs = await self.rider.ListPendingAtStation(rider_pb2.ListPendingAtStationRequest(
-            station_id=request.station_id, now_unix=now, minutes_window=12, dest_area=route.dest_area
-        ))
-        riders = list(rs.requests)
+            station_id=station_id, now_unix=now, minutes_window=MATCH_WINDOW_MINUTES,
+        ), timeout=DEADLINE_S["ListPendingAtStation"])
+        return [r for r in rs.requests if normalize(r.dest_area) in dests]
+
+    async def _closest(self, request, dest_area: str, need: int) -> list | None:
+        """Without the pending index: stream the station's riders closest to the driver's
+        arrival first and stop as soon as `need` compatible riders are certain to be the
+        best by _gap. None if the rider service can't stream."""
+        dests, own = self._dests(dest_area), normalize(dest_area)
+        anchor = request.arrival_eta_unix or int(time())
+        call = self.rider.StreamPendingAtStation(rider_pb2.StreamPendingAtStationRequest(
+            station_id=request.station_id, now_unix=int(time()), minutes_window=MATCH_WINDOW_MINUTES,
+            anchor_eta_unix=anchor, fields=["rider_id", "dest_area"],
+        ), timeout=DEADLINE_S["StreamPendingAtStation"])
+        out, gaps = [], []
+        try:
+            async for r in call:
+                # Later riders are at least this far off, so the best `need` so far are final
+                if len(gaps) >= need and gaps[need - 1] <= abs(r.eta_unix - anchor):
+                    break
+                if normalize(r.dest_area) in dests:
+                    out.append(r)
+                    insort(gaps, self._gap(r, anchor, own))
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                raise
+            print("[matching] rider service has no StreamPendingAtStation; listing whole stations")
+            self._stream_pending_rpc = False
+            return None
+        finally:
+            call.cancel()
+        return out
+
+    async def PrepareMatch(self, request, context):
+        print(f"[matching] PrepareMatch request={request}")
+        self._expire_holds()
+        hold = self._holds.get(request.route_id)
+        if hold is None or hold.station_id != request.station_id:
+            ro = await self.driver.GetRoute(driver_pb2.GetRouteRequest(route_id=request.route_id),
+                                            timeout=DEADLINE_S["GetRoute"])
+            route = ro.route
+            if not route.id or route.seats_free <= 0 or not route.dest_area:
+                return matching_pb2.PrepareMatchResponse(seats_free=route.seats_free)
+            self._drop_hold(request.route_id)
+            hold = self._holds[route.id] = Hold(route=route, station_id=request.station_id,
+                                                arrival_eta_unix=0, expires_unix=0)
+            self._station_holds.setdefault(request.station_id, set()).add(route.id)
+
+        hold.arrival_eta_unix = request.arrival_eta_unix
+        hold.expires_unix = request.arrival_eta_unix + HOLD_GRACE_S
+        heapq.heappush(self._hold_expiry, (hold.expires_unix, request.route_id))
+        # Without a synced index the hold only saves the GetRoute at trigger time.
+        if self.pending_synced:
+            self._fill(hold)
+        print(f"[matching] hold {request.route_id}@{request.station_id}: "
+              f"{len(hold.request_ids)}/{hold.route.seats_free} seats")
+        return matching_pb2.PrepareMatchResponse(
+            held_request_ids=hold.request_ids, seats_free=hold.route.seats_free,
+            hold_expires_unix=hold.expires_unix,
+        )
+
+    def _fill(self, hold: Hold):
+        """Drop held riders that are gone or out of window, then top up free seats with
+        the closest-ETA unheld riders."""
+        route_id = hold.route.id
+        lo = hold.arrival_eta_unix - MATCH_WINDOW_MINUTES*60
+        hi = hold.arrival_eta_unix + MATCH_WINDOW_MINUTES*60
+        keep = []
+        for rid in hold.request_ids:
+            r = self.pending.get(rid)
+            if r is not None and lo <= r.eta_unix <= hi:
+                keep.append(rid)
+            elif self._held_by.get(rid) == route_id:
+                del self._held_by[rid]
+        hold.request_ids = keep
+        free = hold.route.seats_free - len(keep)
+        if free <= 0:
+            return
+        riders = [r for d in self._dests(hold.route.dest_area)
+                  for r in self.pending.range(hold.station_id, d, lo, hi) if r.id not in self._held_by]
+        own = normalize(hold.route.dest_area)
+        riders.sort(key=lambda r: (self._gap(r, hold.arrival_eta_unix, own), r.eta_unix))
+        for r in riders[:free]:
+            hold.request_ids.append(r.id)
+            self._held_by[r.id] = route_id
+
+    def _offer(self, r):
+        # A new rider joins the first hold at its station with room for it.
+        if r.id in self._held_by:
+            return
+        for route_id in self._station_holds.get(r.station_id, ()):
+            hold = self._holds[route_id]
+            if (normalize(r.dest_area) in self._dests(hold.route.dest_area)
+                    and len(hold.request_ids) < hold.route.seats_free
+                    and abs(r.eta_unix - hold.arrival_eta_unix) <= MATCH_WINDOW_MINUTES*60):
+                hold.request_ids.append(r.id)
+                self._held_by[r.id] = route_id
+                return
+
+    def _unhold(self, request_id: str):
+        # A held rider was assigned elsewhere or expired; refill the seat.
+        route_id = self._held_by.pop(request_id, None)
+        hold = self._holds.get(route_id) if route_id else None
+        if hold is not None and request_id in hold.request_ids:
+            hold.request_ids.remove(request_id)
+            self._fill(hold)
+
+    def _drop_hold(self, route_id: str):
+        hold = self._holds.pop(route_id, None)
+        if hold is None:
+            return
+        routes = self._station_holds.get(hold.station_id)
+        if routes is not None:
+            routes.discard(route_id)
+            if not routes:
+                del self._station_holds[hold.station_id]
+        for rid in hold.request_ids:
+            if self._held_by.get(rid) == route_id:
+                del self._held_by[rid]
+                r = self.pending.get(rid)
+                if r is not None:
+                    self._offer(r)
+
+    def _expire_holds(self):
+        now = time()
+        while self._hold_expiry and self._hold_expiry[0][0] < now:
+            expires, route_id = heapq.heappop(self._hold_expiry)
+            hold = self._holds.get(route_id)
+            if hold is not None and hold.expires_unix == expires:
+                self._drop_hold(route_id)
+
+    def _seats_changed(self, route_id: str, seats_free: int, version: int = 0):
+        # Keep a hold at another station from committing against a stale seat count.
+        hold = self._holds.get(route_id)
+        if hold is not None:
+            hold.route.seats_free = seats_free
+        if version:
+            self._route_seats.set(route_id, (version, seats_free))
+
+    def _fresh_seats(self, route: driver_pb2.DriverRoute) -> driver_pb2.DriverRoute:
+        known = self._route_seats.get(route.id)
+        if known is None or known[0] <= route.version:
+            return route
+        fresh = driver_pb2.DriverRoute()
+        fresh.CopyFrom(route)
+        fresh.seats_free = known[1]
+        return fresh
+
+    def _held(self, route_id: str, station_id: str) -> list:
+        """The route's held riders that are still pending at `station_id`."""
+        hold = self._holds.get(route_id)
+        if hold is None or hold.station_id != station_id or not self.pending_synced:
+            return []
+        return [r for r in map(self.pending.get, hold.request_ids) if r is not None]
+
+    async def TryMatch(self, request, context):
+        print(f"[matching] TryMatch request={request}")
+        return await self._attempt(request)
+
+    async def GetDecisions(self, request, context):
+        recs = self.trace.recent(request.limit or 100, station_id=request.station_id,
+                                 driver_id=request.driver_id, reason=request.reason)
+        return matching_pb2.GetDecisionsResponse(decisions=[matching_pb2.MatchDecision(**r) for r in recs])
+
+    async def TryMatchBatch(self, request, context):
+        print(f"[matching] TryMatchBatch {len(request.triggers)} triggers")
+        triggers = list(request.triggers)
+        routes = await self._prefetch_routes(triggers)
+        # With routes in hand every trigger reaches its station's actor queue before the
+        # actor runs, so each station's triggers are matched in one handler pass.
+        results = await asyncio.gather(*(
+            self._attempt(t, None if routes is None else routes.get(t.route_id))
+            for t in triggers
+        ), return_exceptions=True)
+        out = []
+        for res in results:
+            if isinstance(res, grpc.RpcError):
+                out.append(matching_pb2.TryMatchResult(error=f"{res.code().name}: {res.details()}"))
+            elif isinstance(res, BaseException):
+                out.append(matching_pb2.TryMatchResult(error=repr(res)))
+            else:
+                out.append(matching_pb2.TryMatchResult(response=res))
+        return matching_pb2.TryMatchBatchResponse(results=out)
+
+    async def _prefetch_routes(self, triggers: list) -> dict | None:
+        """One GetRoutes for the whole batch; None if routes must be fetched one by one.
+
+        Routes held by PrepareMatch are left out (the trigger fetches its own if the hold
+        lapses first); ids the driver service didn't return map to an empty route.
+        """
+        ids = sorted({t.route_id for t in triggers
+                      if not (t.route_id in self._holds and self._holds[t.route_id].station_id == t.station_id)})
+        if not ids:
+            return {}
+        if not self._get_routes_rpc:
+            return None
+        try:
+            resp = await self.driver.GetRoutes(driver_pb2.GetRoutesRequest(route_ids=ids),
+                                               timeout=DEADLINE_S["GetRoutes"])
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                print("[matching] driver service has no GetRoutes; fetching batch routes one by one")
+                self._get_routes_rpc = False
+            else:
+                print(f"[matching] GetRoutes failed: {e.code()}; fetching batch routes one by one")
+            return None
+        routes = dict.fromkeys(ids, driver_pb2.DriverRoute())
+        routes.update((r.id, r) for r in resp.routes)
+        return routes
+
+    async def _attempt(self, request, route=None) -> matching_pb2.TryMatchResponse:
+        key = request.idempotency_key or f"{request.driver_id}|{request.route_id}|{request.station_id}"
+        cached = self._results.get(key)
+        if cached is not None:
+            print(f"[matching] duplicate TryMatch {key!r}; returning earlier result")
+            return cached
+        # Concurrent duplicates share one attempt; a caller going away doesn't cancel it.
+        task = self._attempts.get(key)
+        if task is None:
+            task = self._attempts[key] = asyncio.ensure_future(self._try_match(request, route))
+            task.add_done_callback(lambda t: self._attempt_done(key, t))
+        return await asyncio.shield(task)
+
+    def _attempt_done(self, key: str, task: asyncio.Task):
+        self._attempts.pop(key, None)
+        # Only a committed trip is replayed: an empty result would hide riders who
+        # arrived since, and a keyless request shares its fallback key with later triggers.
+        if not task.cancelled() and task.exception() is None and task.result().trip_id:
+            self._results.set(key, task.result())
+
+    async def _try_match(self, request, route=None) -> matching_pb2.TryMatchResponse:
+        # The decision record is filled in along the way; unsampled ones skip the
+        # diagnosis of empty outcomes and are not stored.
+        sampled = self.trace.sampled()
+        rec = {"ts_unix": int(time()), "driver_id": request.driver_id, "route_id": request.route_id,
+               "station_id": request.station_id, "arrival_eta_unix": request.arrival_eta_unix,
+               "mode": MATCH_MODE, "window_minutes": MATCH_WINDOW_MINUTES, "stage_ms": {}}
+        t0 = perf_counter()
+        try:
+            res = await self._decide(request, route, rec)
+            rec["seats_remaining"] = res.seats_remaining
+            if res.trip_id:
+                rec["reason"], rec["trip_id"] = "MATCHED", res.trip_id
+            elif "reason" in rec:
+                pass                                 # rejected before matching
+            elif rec.get("chosen_request_ids"):
+                rec["reason"] = "COMMIT_CONFLICT"    # the chosen riders were gone at commit
+            elif rec.get("candidates"):
+                rec["reason"] = "OUTBID"             # batch gave them to other drivers
+            elif sampled:
+                self._diagnose(rec, request.station_id, rec.get("dest_area", ""))
+            return res
+        except Exception as e:
+            rec["reason"], rec["error"] = "ERROR", repr(e)
+            raise
+        finally:
+            rec["stage_ms"]["total"] = (perf_counter() - t0) * 1000
+            if sampled:
+                self.trace.record(rec)
+
+    async def _decide(self, request, route, rec: dict) -> matching_pb2.TryMatchResponse:
+        self._expire_holds()
+        hold = self._holds.get(request.route_id)
+        if hold is not None and hold.station_id == request.station_id:
+            # Fetched by PrepareMatch; seats are re-checked by the commit anyway.
+            route = hold.route
+        else:
+            hold = None
+            if route is None:  # not prefetched by TryMatchBatch
+                with span(rec, "route"):
+                    ro = await self.driver.GetRoute(driver_pb2.GetRouteRequest(route_id=request.route_id),
+                                                    timeout=DEADLINE_S["GetRoute"])
+                route = ro.route
+        route = self._fresh_seats(route)
+        rec["dest_area"], rec["seats_free"] = route.dest_area, route.seats_free
+        if not route.id or route.seats_free <= 0 or not route.dest_area:
+            rec["reason"] = ("NO_ROUTE" if not route.id else
+                             "NO_SEATS" if route.seats_free <= 0 else "NO_DEST")
+            return matching_pb2.TryMatchResponse(seats_remaining=route.seats_free)
+
+        # Everything that reads or assigns a station's riders goes through its actor, so
+        # two triggers at one station can never pick the same pending riders.
+        rec["_queued"] = perf_counter()
+        try:
+            return await self._actor(request.station_id).submit((request, route, rec))
+        finally:
+            if hold is not None:
+                self._drop_hold(request.route_id)
+
+    @staticmethod
+    def _dequeued(rec: dict):
+        rec["stage_ms"]["queue"] = (perf_counter() - rec.pop("_queued")) * 1000
+
+    def _actor(self, station_id: str) -> Actor:
+        actor = self._actors.get(station_id)
+        if actor is None:
+            if MATCH_MODE == "batch":
+                actor = Actor(self._match_batch, window=BATCH_WINDOW_MS / 1000)
+            else:
+                actor = Actor(self._match_greedy)
+            self._actors[station_id] = actor
+        return actor
+
+    async def _match_greedy(self, triggers: list) -> list:
+        # One trigger at a time, in arrival order. Candidates are looked up once per
+        # destination for everything queued together; riders each commit takes are
+        # dropped from the shared lists before the next trigger.
+        shared: dict[str, list] = {}
+        out = []
+        for request, route, rec in triggers:
+            self._dequeued(rec)
+            try:
+                res = await self._match_one(request, route, shared, rec)
+            except Exception as e:
+                out.append(e)
+                continue
+            if res.assignments:
+                gone = {a.rider_request_id for a in res.assignments}
+                for dest, riders in shared.items():
+                    shared[dest] = [r for r in riders if r.id not in gone]
+            out.append(res)
+        return out
+
+    async def _match_one(self, request, route, shared: dict[str, list], rec: dict) -> matching_pb2.TryMatchResponse:
+        # A hold that still covers every seat is committed as is, without a lookup.
+        riders = self._held(route.id, request.station_id)
+        rec["held"] = len(riders)
+        if len(riders) < route.seats_free:
+            taken = {r.id for r in riders}
+            pool = None
+            if not self.pending_synced and self._stream_pending_rpc:
+                # Only as many of the station's riders as it takes to fill the seats
+                with span(rec, "candidates"):
+                    pool = await self._closest(request, route.dest_area, route.seats_free - len(riders))
+            if pool is None:
+                if route.dest_area not in shared:
+                    with span(rec, "candidates"):
+                        shared[route.dest_area] = await self._candidates(request.station_id, route.dest_area, int(time()))
+                pool = shared[route.dest_area]
+            with span(rec, "rank"):
+                more = [r for r in pool if r.id not in taken]
+                # Riders held for another approaching driver go last
+                own = normalize(route.dest_area)
+                more.sort(key=lambda r: (self._held_by.get(r.id, route.id) != route.id,
+                                         self._gap(r, request.arrival_eta_unix, own), r.eta_unix))
+            riders += more
+        rec["candidates"] = len(riders)
         if not riders:
             return matching_pb2.TryMatchResponse(seats_remaining=route.seats_free)
 
-        riders.sort(key=lambda r: (abs(r.eta_unix - request.arrival_eta_unix), r.eta_unix))
         k = min(len(riders), route.seats_free)
-        chosen = riders[:k]
+        return await self._commit(request, route, riders[:k], rec)
+
+    async def _match_batch(self, triggers: list) -> list:
+        """Solve every trigger collected at one station in a window as one min-cost assignment.
+
+        Each free seat is a row and each candidate rider a column; cost is the ETA gap (plus
+        NEIGHBOUR_COST for a neighbouring destination) and a small per-seat step (so riders
+        spread across drivers), and INF when the rider's destination isn't compatible.
+        """
+        station_id = triggers[0][0].station_id
+        for _, _, rec in triggers:
+            self._dequeued(rec)
+        # A driver re-triggering inside the window only counts once (latest wins)
+        latest = {route.id: (req, route, rec) for req, route, rec in triggers}
+        drivers = list(latest.values())
+
+        # Lookup and assignment are shared by the batch; each record carries their full cost.
+        t0 = perf_counter()
+        now = int(time())
+        riders = {}
+        for dest in {route.dest_area for _, route, _ in drivers}:
+            for r in await self._candidates(station_id, dest, now):
+                riders[r.id] = r
+        riders = list(riders.values())
+        t1 = perf_counter()
+
+        dests = [self._dests(route.dest_area) for _, route, _ in drivers]
+        own = [normalize(route.dest_area) for _, route, _ in drivers]
+        slots = [(d, j) for d, (_, route, _) in enumerate(drivers) for j in range(route.seats_free)]
+        cost = [[self._gap(r, drivers[d][0].arrival_eta_unix, own[d]) + j * SEAT_COST
+                 if normalize(r.dest_area) in dests[d] else INF for r in riders]
+                for d, j in slots]
+        picked = assign_slots(cost, SKIP_COST)
+        t2 = perf_counter()
+        for d, (_, _, rec) in enumerate(drivers):
+            rec["stage_ms"]["candidates"] = (t1 - t0) * 1000
+            rec["stage_ms"]["assign"] = (t2 - t1) * 1000
+            rec["candidates"] = sum(1 for r in riders if normalize(r.dest_area) in dests[d])
+
+        chosen: list[list] = [[] for _ in drivers]
+        for (d, _), c in zip(slots, picked):
+            if c >= 0:
+                chosen[d].append(riders[c])
+        print(f"[matching] batch at {station_id}: {len(drivers)} drivers, {len(riders)} riders, "
+              f"{sum(len(c) for c in chosen)} assigned")
+
+        # Rider sets are disjoint, so the per-driver commits can run side by side
+        results = await asyncio.gather(*(
+            self._commit(req, route, chosen[d], rec) if chosen[d]
+            else self._no_match(route)
+            for d, (req, route, rec) in enumerate(drivers)
+        ), return_exceptions=True)
+        by_route = {route.id: res for (_, route, _), res in zip(drivers, results)}
+        return [by_route[route.id] for _, route, _ in triggers]
+
+    async def _no_match(self, route) -> matching_pb2.TryMatchResponse:
+        return matching_pb2.TryMatchResponse(seats_remaining=route.seats_free)
+
+    async def _commit(self, request, route, chosen: list, rec: dict) -> matching_pb2.TryMatchResponse:
+        rec["chosen_request_ids"] = [r.id for r in chosen]
+        rec["chosen_gap_s"] = [r.eta_unix - request.arrival_eta_unix for r in chosen]
+        with span(rec, "commit"):
+            return await self._commit_txn(request, route, chosen)
 
+    async def _commit_txn(self, request, route, chosen: list) -> matching_pb2.TryMatchResponse:
+        if not self._commit_rpc:
+            return await self._commit_legacy(request, route, chosen)
+        try:
+            cm = await self.trip.CommitMatch(trip_pb2.CommitMatchRequest(
+                driver_id=request.driver_id, route_id=request.route_id,
+                station_id=request.station_id, request_ids=[r.id for r in chosen],
+            ), timeout=DEADLINE_S["CommitMatch"])
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                raise
+            print("[matching] trip service has no CommitMatch; falling back to legacy commit")
+            self._commit_rpc = False
+            return await self._commit_legacy(request, route, chosen)
+
+        # Taken elsewhere or expired: drop them now rather than waiting for the feed.
+        # Unseated riders are still PENDING and stay matchable.
+        for rid in cm.skipped_request_ids:
+            self.pending.remove(rid)
+        self._seats_changed(route.id, cm.seats_remaining, cm.route_version)
+        if not cm.trip.id:
+            return matching_pb2.TryMatchResponse(seats_remaining=cm.seats_remaining)
+
+        assigned = set(cm.assigned_request_ids)
+        chosen = [r for r in chosen if r.id in assigned]
+        # The trip service tells the rider service (and so every WatchPending subscriber)
+        # through its outbox; this replica stops offering them straight away.
+        for rid in assigned:
+            self.pending.remove(rid)
+
+        assignments = [matching_pb2.Assignment(rider_request_id=r.id, rider_id=r.rider_id) for r in chosen]
+        return matching_pb2.TryMatchResponse(
+            trip_id=cm.trip.id, assignments=assignments, seats_remaining=cm.seats_remaining
+        )
+
+    async def _notify_match(self, route, trip_id: str, rider_ids: list[str]):
+        targets = [notification_pb2.PushTarget(user_id=route.driver_id, channel="log")]
+        targets += [notification_pb2.PushTarget(user_id=rid, channel="log") for rid in rider_ids]
+        await self.notify.Push(notification_pb2.PushRequest(
+            targets=targets, title="Match confirmed", body="Your LastMile ride is scheduled.",
+            data_json=f'{{"tripId":"{trip_id}"}}'
+        ), timeout=DEADLINE_S["Push"])
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"[matching] background step failed: {task.exception()!r}")
+
+    async def _commit_legacy(self, request, route, chosen: list) -> matching_pb2.TryMatchResponse:
+        # Separate CreateTrip / MarkAssigned / UpdateSeats calls, for trip services
+        # without CommitMatch or MATCH_COMMIT=legacy.
+        k = len(chosen)
         rider_ids = [r.rider_id for r in chosen]
         req_ids   = [r.id for r in chosen]
 
         ct = await self.trip.CreateTrip(trip_pb2.CreateTripRequest(
             driver_id=request.driver_id, rider_ids=rider_ids,
             route_id=request.route_id, station_id=request.station_id
-        ))
+        ), timeout=DEADLINE_S["CreateTrip"])
         trip = ct.trip
 
-        await self.rider.MarkAssigned(rider_pb2.MarkAssignedRequest(request_ids=req_ids, trip_id=trip.id))
+        # Don't offer these again before the feed catches up.
+        for rid in req_ids:
+            self.pending.remove(rid)
         left = max(route.seats_free - k, 0)
-        await self.driver.UpdateSeats(driver_pb2.UpdateSeatsRequest(route_id=route.id, seats_free=left))
-
-        targets = [notification_pb2.PushTarget(user_id=route.driver_id, channel="log")]
-        targets += [notification_pb2.PushTarget(user_id=rid, channel="log") for rid in rider_ids]
-        await self.notify.Push(notification_pb2.PushRequest(
-            targets=targets, title="Match confirmed", body="Your LastMile ride is scheduled.",
-            data_json=f'{{"tripId":"{trip.id}"}}'
-        ))
+        self._seats_changed(route.id, left)
+        # Assignment and seat update depend only on the trip id; notification is not
+        # needed for the response at all and runs in the background (this path has no
+        # outbox, so a failed Push is only logged).
+        await asyncio.gather(
+            self.rider.MarkAssigned(rider_pb2.MarkAssignedRequest(request_ids=req_ids, trip_id=trip.id),
+                                    timeout=DEADLINE_S["MarkAssigned"]),
+            self.driver.UpdateSeats(driver_pb2.UpdateSeatsRequest(route_id=route.id, seats_free=left),
+                                    timeout=DEADLINE_S["UpdateSeats"]),
+        )
+        self._spawn(self._notify_match(route, trip.id, rider_ids))
 
         assignments = [matching_pb2.Assignment(rider_request_id=r.id, rider_id=r.rider_id) for r in chosen]
         return matching_pb2.TryMatchResponse(trip_id=trip.id, assignments=assignments, seats_remaining=left)
 
-def factory():
+async def main():
     server = grpc.aio.server()
-    matching_pb2_grpc.add_MatchingServiceServicer_to_server(MatchingServer(), server)
-    return server
+    matching_svc = MatchingServer()
+    matching_pb2_grpc.add_MatchingServiceServicer_to_server(matching_svc, server)
+
+    # Keep the pending-request index and the area index current in the background
+    tasks = [asyncio.create_task(matching_svc.watch_areas())]
+    if USE_PENDING_INDEX:
+        tasks.append(asyncio.create_task(matching_svc.watch_pending()))
+
+    try:
+        await run_grpc(server, "[::]:50057")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 if __name__ == "__main__":
-    serve(factory, "[::]:50057")
+    asyncio.run(main())
@@ -5,13 +5,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import grpc
 import time
+from pymongo import UpdateOne
 from lastmile.v1 import notification_pb2, notification_pb2_grpc
 from common.run import serve
-from common.db import get_db
+from common.db import get_async_db
+from common.indexes import ensure_indexes
 
 class NotificationServer(notification_pb2_grpc.NotificationServiceServicer):
     def __init__(self):
-        self.db = get_db()
+        self.db = get_async_db()
+
+    async def start(self):
+        await ensure_indexes(self.db, "notifications")
 
     async def Push(self, request, context):
         print(f"[notification] Push request={request}")
@@ -23,23 +28,34 @@ class NotificationServer(notification_pb2_grpc.NotificationServiceServicer):
             print(f"[notify] to={t.user_id} via={t.channel} title='{request.title}' body='{request.body}' data={request.data_json}")
             
             # Store in MongoDB
-            notifications_to_insert.append({
+            doc = {
                 "user_id": t.user_id,
                 "title": request.title,
                 "message": request.body,
                 "data": request.data_json,
                 "read": False,
                 "timestamp": timestamp
-            })
+            }
+            if request.message_id:
+                doc["message_id"] = request.message_id
+            notifications_to_insert.append(doc)
             
-        if notifications_to_insert:
-            self.db.notifications.insert_many(notifications_to_insert)
+        if notifications_to_insert and request.message_id:
+            # Redelivery (e.g. from the trip outbox) must not show the same notification twice
+            await self.db.notifications.bulk_write([
+                UpdateOne({"message_id": d["message_id"], "user_id": d["user_id"]}, {"$setOnInsert": d}, upsert=True)
+                for d in notifications_to_insert
+            ], ordered=False)
+        elif notifications_to_insert:
+            await self.db.notifications.insert_many(notifications_to_insert)
 
         return notification_pb2.PushResponse(attempted=len(request.targets), success=len(request.targets))
 
-def factory():
+async def factory():
     server = grpc.aio.server()
-    notification_pb2_grpc.add_NotificationServiceServicer_to_server(NotificationServer(), server)
+    notification_svc = NotificationServer()
+    await notification_svc.start()
+    notification_pb2_grpc.add_NotificationServiceServicer_to_server(notification_svc, server)
     return server
 
 if __name__ == "__main__":
@@ -1,9 +1,15 @@
 import asyncio
+import heapq
+import os
 import time
 import grpc
+from pymongo.errors import BulkWriteError
 from lastmile.v1 import rider_pb2, rider_pb2_grpc, common_pb2
 from common.run import run_grpc  
-from common.db import get_db
+from common.batching import WindowBatcher
+from common.cache import TTLCache
+from common.db import get_async_db
+from common.indexes import ensure_indexes
 
 class RiderStore:
     def __init__(self):
@@ -11,32 +17,147 @@ class RiderStore:
         self.requests: dict[str, common_pb2.RiderRequest] = {}
         self.by_station: dict[str, set[str]] = {}
 
+# WatchPending subscribers that fall this far behind are disconnected and must resync
+WATCH_MAX_LAG = 10000
+
+# Group commit: AddRequest calls arriving within RIDER_ADD_BATCH_MS of each other are
+# written with one insert_many (0 writes each on its own).
+ADD_BATCH_MS     = int(os.getenv("RIDER_ADD_BATCH_MS", "2"))
+ADD_BATCH_MAX    = 500
+ADD_REQUESTS_MAX = 1000   # requests per AddRequests call
+
+# A PENDING request expires this long after its ETA, exactly on time from an in-memory
+# deadline heap; the sweep catches any this replica isn't tracking, and reconciles the
+# tracked set (and so the demand counters) with Mongo.
+EXPIRE_AFTER_S   = 600
+EXPIRY_BATCH     = 100    # requests deleted per round trip
+SWEEP_INTERVAL_S = 300
+
+# A rider's recent requests (newest ETA first) are cached per rider for GetActiveRequest
+# and ListRiderHistory, and dropped on every status change made through this service
+# (the trip service reports assignment and completion here). The TTL is only a backstop.
+HISTORY_LIMIT       = 20      # ListRiderHistory default
+HISTORY_MAX         = 50      # requests cached per rider, and the largest limit served
+HISTORY_CACHE_TTL_S = 30
+HISTORY_CACHE_SIZE  = 50000   # riders
+ACTIVE_STATUSES     = ("PENDING", "ASSIGNED")
+
+# Fields StreamPendingAtStation can project to (id is always set)
+REQUEST_FIELDS = {"rider_id", "station_id", "eta_unix", "dest_area", "status"}
+
+def _to_proto(doc) -> common_pb2.RiderRequest:
+    # Fields left out by a projection stay at their defaults
+    return common_pb2.RiderRequest(
+        id=str(doc["_id"]),
+        rider_id=doc.get("rider_id", ""),
+        station_id=doc.get("station_id", ""),
+        eta_unix=doc.get("eta_unix", 0),
+        dest_area=doc.get("dest_area", ""),
+        status=doc.get("status", "")
+    )
+
 class RiderServer(rider_pb2_grpc.RiderServiceServicer):
     def __init__(self):
-        self.db = get_db()
+        self.db = get_async_db()
         self.requests = self.db.rider_requests
+        self._watchers: set[asyncio.Queue] = set()
+        # Expiry: request id -> deadline, and a heap of (deadline, request id)
+        self._deadlines: dict[str, int] = {}
+        self._expiry: list[tuple[int, str]] = []
+        self._wake = asyncio.Event()
+        # Demand: request id -> (station, destination) for each tracked PENDING request,
+        # and the number of them per (station, destination)
+        self._pending: dict[str, tuple[str, str]] = {}
+        self._demand: dict[tuple[str, str], int] = {}
+        # Per-rider history, and the invalidation counter a fill checks before storing so a
+        # read that started before a write can't put the old rows back.
+        self._history = TTLCache(HISTORY_CACHE_TTL_S, HISTORY_CACHE_SIZE)
+        self._invalidated = TTLCache(HISTORY_CACHE_TTL_S, HISTORY_CACHE_SIZE)
+        self._history_gen = 0
+        self._add_batcher = (WindowBatcher(self._insert, ADD_BATCH_MS / 1000, ADD_BATCH_MAX)
+                             if ADD_BATCH_MS > 0 else None)
 
-    async def AddRequest(self, request, context):
-        print(f"[rider] AddRequest request={request}")
-        r = request.request
-        
-        req_doc = {
+    async def start(self):
+        await ensure_indexes(self.db, "rider_requests")
+
+    def _publish(self, type_: str, req: common_pb2.RiderRequest):
+        ev = rider_pb2.RiderRequestEvent(type=type_, request=req)
+        for q in list(self._watchers):
+            if q.qsize() >= WATCH_MAX_LAG:
+                # Slow consumer: cut it off rather than buffer without bound.
+                self._watchers.discard(q)
+                q.put_nowait(None)
+                continue
+            q.put_nowait(ev)
+
+    def _invalidate(self, *rider_ids: str):
+        self._history_gen += 1
+        for rider_id in rider_ids:
+            self._history.pop(rider_id)
+            self._invalidated.set(rider_id, self._history_gen)
+
+    async def _rider_history(self, rider_id: str) -> list[common_pb2.RiderRequest]:
+        cached = self._history.get(rider_id)
+        if cached is not None:
+            return cached
+        gen = self._history_gen
+        out = [_to_proto(doc) async for doc in self.requests.find(
+            {"rider_id": rider_id}).sort("eta_unix", -1).limit(HISTORY_MAX)]
+        if self._invalidated.get(rider_id, 0) <= gen:
+            self._history.set(rider_id, out)
+        return out
+
+    async def _insert(self, reqs: list) -> list:
+        """Write `reqs` with one unordered insert_many. Returns, per item, the request as
+        stored or the exception it failed with."""
+        docs = [{
             "rider_id": r.rider_id,
             "station_id": r.station_id,
             "eta_unix": r.eta_unix,
             "dest_area": r.dest_area,
             "status": r.status or "PENDING"
-        }
-        res = self.requests.insert_one(req_doc)
-        rid = str(res.inserted_id)
-        
-        req = common_pb2.RiderRequest(
-            id=rid, rider_id=r.rider_id, station_id=r.station_id,
-            eta_unix=r.eta_unix, dest_area=r.dest_area,
-            status=req_doc["status"],
-        )
+        } for r in reqs]
+        failed: dict[int, Exception] = {}
+        try:
+            await self.requests.insert_many(docs, ordered=False)   # fills in each doc's _id
+        except BulkWriteError as e:
+            failed = {err["index"]: RuntimeError(err.get("errmsg", "insert failed"))
+                      for err in e.details.get("writeErrors", [])}
+        self._invalidate(*{d["rider_id"] for d in docs})
+        out = []
+        for i, doc in enumerate(docs):
+            if i in failed:
+                out.append(failed[i])
+                continue
+            req = _to_proto(doc)
+            if req.status == "PENDING":
+                self._track(req.id, req.eta_unix, req.station_id, req.dest_area)
+                self._publish("UPSERT", req)
+            out.append(req)
+        return out
+
+    async def AddRequest(self, request, context):
+        print(f"[rider] AddRequest request={request}")
+        if self._add_batcher is not None:
+            req = await self._add_batcher.submit(request.request)
+        else:
+            req = (await self._insert([request.request]))[0]
+            if isinstance(req, Exception):
+                raise req
         return rider_pb2.AddRequestResponse(request=req)
 
+    async def AddRequests(self, request, context):
+        print(f"[rider] AddRequests n={len(request.requests)}")
+        if len(request.requests) > ADD_REQUESTS_MAX:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                f"at most {ADD_REQUESTS_MAX} requests per call")
+        results = await self._insert(list(request.requests)) if request.requests else []
+        return rider_pb2.AddRequestsResponse(results=[
+            rider_pb2.AddRequestResult(error=str(r)) if isinstance(r, Exception)
+            else rider_pb2.AddRequestResult(request=r)
+            for r in results
+        ])
+
     async def ListPendingAtStation(self, request, context):
         print(f"[rider] ListPendingAtStation request={request}")
         now = request.now_unix
@@ -45,84 +166,276 @@ class RiderServer(rider_pb2_grpc.RiderServiceServicer):
 
         query = {
             "station_id": request.station_id,
-            "dest_area": request.dest_area,
             "status": "PENDING",
             "eta_unix": {"$gte": lo, "$lte": hi}
         }
+        if request.dest_area:  # empty lists every destination
+            query["dest_area"] = request.dest_area
         
         out = []
-        cursor = self.requests.find(query).sort("eta_unix", 1)
-        for doc in cursor:
-            out.append(common_pb2.RiderRequest(
-                id=str(doc["_id"]),
-                rider_id=doc["rider_id"],
-                station_id=doc["station_id"],
-                eta_unix=doc["eta_unix"],
-                dest_area=doc["dest_area"],
-                status=doc["status"]
-            ))
-            
+        async for doc in self.requests.find(query).sort("eta_unix", 1):
+            out.append(_to_proto(doc))
+
         return rider_pb2.ListPendingAtStationResponse(requests=out)
 
+    async def StreamPendingAtStation(self, request, context):
+        print(f"[rider] StreamPendingAtStation request={request}")
+        unknown = set(request.fields) - REQUEST_FIELDS - {"id"}
+        if unknown:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"unknown fields: {', '.join(sorted(unknown))}")
+        lo = request.now_unix - request.minutes_window*60
+        hi = request.now_unix + request.minutes_window*60
+        query = {"station_id": request.station_id, "status": "PENDING"}
+        if request.dest_areas:
+            query["dest_area"] = {"$in": list(request.dest_areas)}
+        projection = None
+        if request.fields:
+            projection = {f: 1 for f in request.fields if f != "id"}
+            projection["eta_unix"] = 1   # needed to order by anchor
+        limit = request.max_count        # 0 is no limit, for Mongo too
+        anchor = request.anchor_eta_unix
+
+        if not anchor:
+            async for doc in self.requests.find(
+                {**query, "eta_unix": {"$gte": lo, "$lte": hi}}, projection
+            ).sort("eta_unix", 1).limit(limit):
+                yield _to_proto(doc)
+            return
+
+        # Closest first: walk out from the anchor in both directions over the ETA index
+        # and merge, so at most max_count documents are read from each side.
+        later = self.requests.find({**query, "eta_unix": {"$gte": max(anchor, lo), "$lte": hi}},
+                                   projection).sort("eta_unix", 1).limit(limit)
+        earlier = self.requests.find({**query, "eta_unix": {"$gte": lo, "$lt": min(anchor, hi + 1)}},
+                                     projection).sort("eta_unix", -1).limit(limit)
+        try:
+            a, b = await anext(later, None), await anext(earlier, None)
+            n = 0
+            while (a is not None or b is not None) and (not limit or n < limit):
+                if b is None or (a is not None and a["eta_unix"] - anchor <= anchor - b["eta_unix"]):
+                    yield _to_proto(a)
+                    a = await anext(later, None)
+                else:
+                    yield _to_proto(b)
+                    b = await anext(earlier, None)
+                n += 1
+        finally:
+            await later.close()
+            await earlier.close()
+
     async def MarkAssigned(self, request, context):
         print(f"[rider] MarkAssigned request={request}")
         from bson.objectid import ObjectId
-        n = 0
+        oids = [ObjectId(rid) for rid in request.request_ids if ObjectId.is_valid(rid)]
+        assigned = []
+        if oids:
+            # Two round trips however many riders: read which are still PENDING, then flip
+            # them in one guarded update_many.
+            docs = await self.requests.find({"_id": {"$in": oids}}, {"status": 1, "rider_id": 1}).to_list()
+            pending = [d["_id"] for d in docs if d["status"] == "PENDING"]
+            if pending:
+                res = await self.requests.update_many(
+                    {"_id": {"$in": pending}, "status": "PENDING"},
+                    {"$set": {"status": "ASSIGNED", "trip_id": request.trip_id}},
+                )
+                if res.modified_count < len(pending):
+                    # Some were taken in between; report only what this trip got.
+                    pending = [d["_id"] async for d in self.requests.find(
+                        {"_id": {"$in": pending}, "trip_id": request.trip_id}, {"_id": 1})]
+                assigned = [str(oid) for oid in pending]
+            # Whoever assigned them (CommitMatch writes first), these riders' history changed.
+            self._invalidate(*{d["rider_id"] for d in docs})
+        # Whether we flipped it or it was already taken, it is no longer PENDING.
         for rid in request.request_ids:
+            self._untrack(rid)
+            self._publish("REMOVE", common_pb2.RiderRequest(id=rid, status="ASSIGNED"))
+        return rider_pb2.MarkAssignedResponse(updated=len(assigned), assigned_request_ids=assigned)
+
+    async def MarkCompleted(self, request, context):
+        print(f"[rider] MarkCompleted request={request}")
+        updated = 0
+        if request.rider_ids:
+            # Only the requests this trip carried: a request placed after the trip ended,
+            # or a redelivery, is left alone.
+            res = await self.requests.update_many(
+                {"rider_id": {"$in": list(request.rider_ids)}, "trip_id": request.trip_id, "status": "ASSIGNED"},
+                {"$set": {"status": "COMPLETED"}},
+            )
+            updated = res.modified_count
+            self._invalidate(*request.rider_ids)
+        return rider_pb2.MarkCompletedResponse(updated=updated)
+
+    async def WatchPending(self, request, context):
+        print(f"[rider] WatchPending request={request}")
+        q: asyncio.Queue = asyncio.Queue()
+        # Subscribe before reading the snapshot so nothing written meanwhile is missed;
+        # events queued during the snapshot are replayed after it (upsert/remove are idempotent).
+        self._watchers.add(q)
+        try:
+            async for doc in self.requests.find({"status": "PENDING"}):
+                yield rider_pb2.RiderRequestEvent(type="UPSERT", request=_to_proto(doc))
+            yield rider_pb2.RiderRequestEvent(type="SYNCED")
+            while (ev := await q.get()) is not None:
+                yield ev
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "watcher fell behind; resync")
+        finally:
+            self._watchers.discard(q)
+
+    async def GetActiveRequest(self, request, context):
+        for r in await self._rider_history(request.rider_id):
+            if r.status in ACTIVE_STATUSES:
+                return rider_pb2.GetActiveRequestResponse(request=r, found=True)
+        return rider_pb2.GetActiveRequestResponse()
+
+    async def ListRiderHistory(self, request, context):
+        limit = min(request.limit or HISTORY_LIMIT, HISTORY_MAX)
+        history = await self._rider_history(request.rider_id)
+        return rider_pb2.ListRiderHistoryResponse(requests=history[:limit])
+
+    async def GetDemand(self, request, context):
+        demand = [
+            rider_pb2.StationDemand(station_id=station_id, dest_area=dest_area, pending=n)
+            for (station_id, dest_area), n in sorted(self._demand.items())
+            if not request.station_id or station_id == request.station_id
+        ]
+        return rider_pb2.GetDemandResponse(demand=demand, as_of_unix=int(time.time()))
+
+    def _track(self, rid: str, eta_unix: int, station_id: str, dest_area: str):
+        deadline = eta_unix + EXPIRE_AFTER_S
+        self._deadlines[rid] = deadline
+        heapq.heappush(self._expiry, (deadline, rid))
+        if self._expiry[0] == (deadline, rid):
+            self._wake.set()   # earlier than what the expiry loop is sleeping towards
+        if rid not in self._pending:
+            key = self._pending[rid] = (station_id, dest_area)
+            self._demand[key] = self._demand.get(key, 0) + 1
+
+    def _untrack(self, rid: str):
+        self._deadlines.pop(rid, None)   # its heap entry is skipped when it comes due
+        key = self._pending.pop(rid, None)
+        if key is not None:
+            n = self._demand[key] - 1
+            if n:
+                self._demand[key] = n
+            else:
+                del self._demand[key]
+
+    async def _reconcile(self) -> tuple[int, int]:
+        """Bring the tracked PENDING requests in line with Mongo: drop those tracked before
+        the scan that it didn't find PENDING, and track those found that nobody tracked.
+        Anything changed through this service during the scan is left as it is.
+        Returns (added, dropped)."""
+        before = set(self._pending)
+        found = set()
+        added = 0
+        async for doc in self.requests.find(
+                {"status": "PENDING"}, {"eta_unix": 1, "station_id": 1, "dest_area": 1}):
+            rid = str(doc["_id"])
+            found.add(rid)
+            if rid not in before and rid not in self._pending:
+                self._track(rid, doc["eta_unix"], doc.get("station_id", ""), doc.get("dest_area", ""))
+                added += 1
+        dropped = before - found
+        for rid in dropped:
+            self._untrack(rid)
+        return added, len(dropped)
+
+    async def _expire(self, oids: list) -> int:
+        """Delete those of `oids` still PENDING and tell WatchPending subscribers."""
+        docs = await self.requests.find({"_id": {"$in": oids}, "status": "PENDING"}).to_list()
+        if not docs:
+            return 0
+        await self.requests.delete_many({"_id": {"$in": [d["_id"] for d in docs]}, "status": "PENDING"})
+        self._invalidate(*{d["rider_id"] for d in docs})
+        for doc in docs:
+            self._untrack(str(doc["_id"]))
+            req = _to_proto(doc)
+            req.status = "EXPIRED"
+            self._publish("REMOVE", req)
+        return len(docs)
+
+    async def expire_requests(self):
+        """Expire each PENDING request at eta + EXPIRE_AFTER_S, from a heap of deadlines.
+
+        Entries are dropped lazily: one whose request was assigned (or re-added with another
+        deadline) no longer matches _deadlines and is skipped when it comes due.
+        """
+        from bson.objectid import ObjectId
+        try:
+            added, _ = await self._reconcile()
+            print(f"[rider] tracking {added} pending requests")
+        except Exception as e:
+            print(f"[rider] Could not load pending requests for expiry, leaving them to the sweep: {e}")
+        while True:
             try:
-                oid = ObjectId(rid)
-                res = self.requests.update_one(
-                    {"_id": oid, "status": "PENDING"},
-                    {"$set": {"status": "ASSIGNED", "trip_id": request.trip_id}}
-                )
-                if res.modified_count > 0:
-                    n += 1
-            except:
+                now = time.time()
+                due = []
+                while self._expiry and self._expiry[0][0] <= now and len(due) < EXPIRY_BATCH:
+                    deadline, rid = heapq.heappop(self._expiry)
+                    if self._deadlines.get(rid) == deadline:
+                        self._untrack(rid)
+                        due.append(ObjectId(rid))
+                if due:
+                    n = await self._expire(due)
+                    if n:
+                        print(f"[rider] expired {n} requests (ETA + {EXPIRE_AFTER_S}s passed)")
+                    continue
+            except Exception as e:
+                # Requests in a failed batch are left to the sweep
+                print(f"[rider] Error in expiry task: {e}")
+                await asyncio.sleep(1)
+            self._wake.clear()
+            timeout = self._expiry[0][0] - time.time() if self._expiry else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
                 pass
-        return rider_pb2.MarkAssignedResponse(updated=n)
 
-    # --- New Background Task ---
-    async def cleanup_expired_requests(self):
-        print("[rider] Starting background cleanup task...")
+    async def sweep_expired(self):
+        # Safety net for requests no replica is tracking (added by one that since died):
+        # an indexed (status, eta_unix) range, in batches, then a reconcile.
+        print("[rider] Starting expired-request sweep...")
         while True:
+            await asyncio.sleep(SWEEP_INTERVAL_S)
             try:
-                # 10 minutes (600 seconds) tolerance
-                # If ETA was 10:00, and it is now 10:11, we delete it.
-                # Logic: Delete if (eta_unix + 600) < now  =>  eta_unix < (now - 600)
-                cutoff_unix = int(time.time()) - 600
-                
-                result = self.requests.delete_many({
-                    "status": "PENDING",
-                    "eta_unix": {"$lt": cutoff_unix}
-                })
-                
-                if result.deleted_count > 0:
-                    print(f"[rider] Cleaned up {result.deleted_count} expired requests (ETA + 10m passed).")
-            
+                cutoff_unix = int(time.time()) - EXPIRE_AFTER_S
+                n = 0
+                while True:
+                    batch = [d["_id"] async for d in self.requests.find(
+                        {"status": "PENDING", "eta_unix": {"$lt": cutoff_unix}}, {"_id": 1}
+                    ).sort("eta_unix", 1).limit(EXPIRY_BATCH)]
+                    if not batch:
+                        break
+                    n += await self._expire(batch)
+                if n:
+                    print(f"[rider] sweep expired {n} untracked requests")
+                # Backstop for requests changed behind this service's back (a rider sync
+                # call still being retried, a replica that missed one), so the demand
+                # counters don't drift.
+                added, dropped = await self._reconcile()
+                if added or dropped:
+                    print(f"[rider] reconciled pending requests: {added} added, {dropped} dropped")
             except Exception as e:
-                print(f"[rider] Error in cleanup task: {e}")
-            
-            # Check every 60 seconds
-            await asyncio.sleep(60)
+                print(f"[rider] Error in expiry sweep: {e}")
 
 async def main():
     server = grpc.aio.server()
     rider_svc = RiderServer()
+    await rider_svc.start()
     rider_pb2_grpc.add_RiderServiceServicer_to_server(rider_svc, server)
     
-    # Start the cleanup loop as a background task
-    cleanup_task = asyncio.create_task(rider_svc.cleanup_expired_requests())
+    # Expire requests on time, with a periodic sweep behind it
+    tasks = [asyncio.create_task(rider_svc.expire_requests()),
+             asyncio.create_task(rider_svc.sweep_expired())]
     
     try:
         # Use run_grpc helper to start server and wait for termination
         await run_grpc(server, "[::]:50054")
     finally:
-        # Ensure task is cancelled on exit
-        cleanup_task.cancel()
-        try:
-            await cleanup_task
-        except asyncio.CancelledError:
-            pass
+        # Ensure tasks are cancelled on exit
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,13 +1,40 @@
 import asyncio
+import time
 import grpc
 from lastmile.v1 import station_pb2, station_pb2_grpc, common_pb2
 from common.run import serve
-from common.db import get_db
+from common.db import get_async_db
+from common.indexes import ensure_indexes
+from common.areas import AreaIndex
+
+AREA_INDEX_TTL_S = 60      # rebuild from the collection at least this often (upserts on other replicas)
+SUGGEST_LIMIT    = 10
 
 class StationServer(station_pb2_grpc.StationServiceServicer):
     def __init__(self):
-        self.db = get_db()
+        self.db = get_async_db()
         self.stations = self.db.stations
+        self._areas = AreaIndex()
+        self._areas_built = 0.0
+
+    async def start(self):
+        await ensure_indexes(self.db, "stations")
+
+    async def _area_index(self) -> AreaIndex:
+        if time.monotonic() - self._areas_built > AREA_INDEX_TTL_S:
+            await self._rebuild_areas()
+        return self._areas
+
+    async def _rebuild_areas(self):
+        docs = await self.stations.find({}, {"nearby_areas": 1}).to_list()
+        self._areas = AreaIndex.build((d["_id"], d.get("nearby_areas", [])) for d in docs)
+        self._areas_built = time.monotonic()
+
+    def _area_entry(self, idx: AreaIndex, key: str) -> station_pb2.AreaEntry:
+        return station_pb2.AreaEntry(
+            area=key, display_name=idx.names[key],
+            station_ids=sorted(idx.stations[key]), neighbours=sorted(idx.neighbours.get(key, ())),
+        )
 
     async def UpsertStation(self, request, context):
         print(f"[station] UpsertStation request={request}")
@@ -25,7 +52,8 @@ class StationServer(station_pb2_grpc.StationServiceServicer):
             "nearby_areas": list(s.nearby_areas)
         }
         
-        self.stations.replace_one({"_id": sid}, doc, upsert=True)
+        await self.stations.replace_one({"_id": sid}, doc, upsert=True)
+        await self._rebuild_areas()
         
         ns = common_pb2.Station(
             id=sid, name=s.name, location=s.location, nearby_areas=list(s.nearby_areas)
@@ -34,7 +62,7 @@ class StationServer(station_pb2_grpc.StationServiceServicer):
 
     async def GetStation(self, request, context):
         print(f"[station] GetStation request={request}")
-        doc = self.stations.find_one({"_id": request.id})
+        doc = await self.stations.find_one({"_id": request.id})
         st = None
         if doc:
             st = common_pb2.Station(
@@ -48,7 +76,7 @@ class StationServer(station_pb2_grpc.StationServiceServicer):
     async def ListStations(self, request, context):
         print(f"[station] ListStations request={request}")
         out = []
-        for doc in self.stations.find():
+        async for doc in self.stations.find():
             out.append(common_pb2.Station(
                 id=doc["_id"],
                 name=doc["name"],
@@ -59,13 +87,30 @@ class StationServer(station_pb2_grpc.StationServiceServicer):
 
     async def NearbyAreas(self, request, context):
         print(f"[station] NearbyAreas request={request}")
-        doc = self.stations.find_one({"_id": request.id})
+        doc = await self.stations.find_one({"_id": request.id})
         areas = doc["nearby_areas"] if doc else []
         return station_pb2.NearbyAreasResponse(nearby_areas=areas)
 
-def factory():
+    async def GetAreaIndex(self, request, context):
+        print(f"[station] GetAreaIndex request={request}")
+        idx = await self._area_index()
+        if request.if_version and request.if_version == idx.version:
+            return station_pb2.GetAreaIndexResponse(version=idx.version, not_modified=True)
+        return station_pb2.GetAreaIndexResponse(
+            version=idx.version, entries=[self._area_entry(idx, k) for k in sorted(idx.names)],
+        )
+
+    async def SuggestAreas(self, request, context):
+        print(f"[station] SuggestAreas request={request}")
+        idx = await self._area_index()
+        keys = idx.suggest(request.prefix, request.limit or SUGGEST_LIMIT)
+        return station_pb2.SuggestAreasResponse(areas=[self._area_entry(idx, k) for k in keys])
+
+async def factory():
     server = grpc.aio.server()
-    station_pb2_grpc.add_StationServiceServicer_to_server(StationServer(), server)
+    station_svc = StationServer()
+    await station_svc.start()
+    station_pb2_grpc.add_StationServiceServicer_to_server(station_svc, server)
     return server
 
 if __name__ == "__main__":
@@ -1,9 +1,33 @@
 import asyncio
+import time
 import grpc
-from lastmile.v1 import trip_pb2, trip_pb2_grpc, common_pb2, notification_pb2, notification_pb2_grpc
-from common.run import serve
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from lastmile.v1 import (trip_pb2, trip_pb2_grpc, common_pb2, notification_pb2_grpc, driver_pb2, driver_pb2_grpc,
+                         rider_pb2_grpc)
+from common.run import run_grpc
 from common.env import addr
-from common.db import get_db
+from common.db import get_async_db, supports_transactions
+from common.indexes import ensure_indexes
+from common.outbox import OutboxRelay, outbox_doc, rider_sync_doc
+
+ROUTE_CHANGED_TIMEOUT_S = 1.0
+
+# WatchTrips subscribers that fall this far behind are disconnected
+WATCH_MAX_LAG = 10000
+
+class _Conflict(Exception):
+    """Aborts a CommitMatch transaction."""
+
+def _trip_pb(doc) -> common_pb2.Trip:
+    return common_pb2.Trip(
+        id=str(doc["_id"]),
+        driver_id=doc["driver_id"],
+        rider_ids=doc["rider_ids"],
+        route_id=doc["route_id"],
+        station_id=doc["station_id"],
+        status=doc["status"]
+    )
 
 class TripStore:
     def __init__(self):
@@ -13,14 +37,58 @@ class TripStore:
 
 class TripServer(trip_pb2_grpc.TripServiceServicer):
     def __init__(self):
-        self.db = get_db()
+        self.db = get_async_db()
         self.trips = self.db.trips
-        
+        self._txn = False   # probed in start()
+        self._watchers: set[asyncio.Queue] = set()
+        self._background: set[asyncio.Task] = set()
+
         # Connect to Notification Service
         self._notify_addr = addr("NOTIFY_ADDR", "localhost:50056")
         self._notify_ch = grpc.aio.insecure_channel(self._notify_addr)
         self.notify = notification_pb2_grpc.NotificationServiceStub(self._notify_ch)
 
+        # Route writes made here are reported to the driver service, which caches routes
+        self._driver_addr = addr("DRIVER_ADDR", "localhost:50053")
+        self._driver_ch = grpc.aio.insecure_channel(self._driver_addr)
+        self.driver = driver_pb2_grpc.DriverServiceStub(self._driver_ch)
+
+        # Rider request changes are made or announced through the rider service, which
+        # feeds WatchPending and keeps the rider caches and counters
+        self._rider_addr = addr("RIDER_ADDR", "localhost:50054")
+        self._rider_ch = grpc.aio.insecure_channel(self._rider_addr)
+        self.rider = rider_pb2_grpc.RiderServiceStub(self._rider_ch)
+
+        # Notifications and rider sync calls ride in the trip document's `outbox` array,
+        # written in the same single-document write as the change; the relay moves them
+        # out and delivers them
+        self.relay = OutboxRelay(self.db.outbox, self.notify, sources=[self.trips], rider_stub=self.rider)
+
+    async def start(self):
+        await ensure_indexes(self.db, "trips", "outbox")
+        self._txn = await supports_transactions(self.db)
+        print(f"[trip] CommitMatch mode: {'transaction' if self._txn else 'guarded writes'}")
+
+    def _publish(self, trip: common_pb2.Trip):
+        ev = trip_pb2.TripEvent(trip=trip, ts_unix=int(time.time()))
+        for q in list(self._watchers):
+            if q.qsize() >= WATCH_MAX_LAG:
+                self._watchers.discard(q)
+                q.put_nowait(None)
+                continue
+            q.put_nowait(ev)
+
+    async def WatchTrips(self, request, context):
+        print(f"[trip] WatchTrips request={request}")
+        q: asyncio.Queue = asyncio.Queue()
+        self._watchers.add(q)
+        try:
+            while (ev := await q.get()) is not None:
+                yield ev
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "watcher fell behind")
+        finally:
+            self._watchers.discard(q)
+
     async def CreateTrip(self, request, context):
         print(f"[trip] CreateTrip request={request}")
         
@@ -31,79 +99,285 @@ class TripServer(trip_pb2_grpc.TripServiceServicer):
             "station_id": request.station_id,
             "status": "SCHEDULED"
         }
-        res = self.trips.insert_one(trip_doc)
+        res = await self.trips.insert_one(trip_doc)
         tid = str(res.inserted_id)
         
         t = common_pb2.Trip(
             id=tid, driver_id=request.driver_id, rider_ids=list(request.rider_ids),
             route_id=request.route_id, station_id=request.station_id, status="SCHEDULED"
         )
+        self._publish(t)
         return trip_pb2.CreateTripResponse(trip=t)
 
     async def UpdateTripStatus(self, request, context):
         print(f"[trip] UpdateTripStatus request={request}")
-        from bson.objectid import ObjectId
         try:
             oid = ObjectId(request.trip_id)
-            res = self.trips.find_one_and_update(
-                {"_id": oid},
-                {"$set": {"status": request.status}},
-                return_document=True
-            )
+            if self._txn:
+                # Status change, cleanup and the outbox entry commit together
+                async with self.db.client.start_session() as session:
+                    res = await session.with_transaction(lambda s: self._update_status(oid, request, s))
+            else:
+                res = await self._update_status(oid, request, None)
             print(res)
         except:
             res = None
             
         if not res:
-            return trip_pb2.UpdateTripStatusResponse()
+            # Unknown trip, or a repeated call for the status it already has: nothing changed
+            try:
+                cur = await self.trips.find_one({"_id": ObjectId(request.trip_id)}, {"outbox": 0})
+            except Exception:
+                cur = None
+            return trip_pb2.UpdateTripStatusResponse(trip=_trip_pb(cur) if cur else None)
+        if request.status == "COMPLETED":
+            self.relay.kick()
+            if res.get("route_id"):
+                self._spawn(self._route_changed(res["route_id"]))   # deleted above
+
+        t = _trip_pb(res)
+        self._publish(t)
+        return trip_pb2.UpdateTripStatusResponse(trip=t)
+
+    async def _update_status(self, oid, request, session):
+        update = {"$set": {"status": request.status}}
+        if request.status == "COMPLETED":
+            # Rider ids are fixed at creation, so the notification and the rider service's
+            # completion of their requests can go in with the status write
+            trip = await self.trips.find_one({"_id": oid}, {"rider_ids": 1}, session=session)
+            if trip and trip.get("rider_ids"):
+                update["$push"] = {"outbox": {"$each": [
+                    rider_sync_doc("MarkCompleted", rider_ids=trip["rider_ids"], trip_id=request.trip_id),
+                    outbox_doc(
+                        trip["rider_ids"],
+                        title="Trip Completed",
+                        body="You have arrived at your destination. Thank you for riding with LastMile!",
+                        data_json=f'{{"tripId":"{request.trip_id}", "status":"COMPLETED"}}',
+                    ),
+                ]}}
+        # Only a real change writes (and announces) anything, so a retried call is a no-op
+        res = await self.trips.find_one_and_update(
+            {"_id": oid, "status": {"$ne": request.status}}, update,
+            return_document=True, session=session
+        )
+        if not res:
+            return None
             
         # If status is COMPLETED, delete the associated route
         if request.status == "COMPLETED":
             route_id = res.get("route_id")
             if route_id:
                 print(f"[trip] Deleting route {route_id} for completed trip {oid}")
-                # We need to access driver_routes collection. 
-                # Since we only initialized self.trips, let's get the db again or access it
-                self.db.driver_routes.delete_one({"_id": ObjectId(route_id)})
-            
-            # Also mark rider requests as COMPLETED
-            rider_ids = res.get("rider_ids", [])
-            if rider_ids:
-                print(f"[trip] Marking rider requests for riders {rider_ids} as COMPLETED")
-                # We assume one active request per rider for now, or we could filter by station/time if needed.
-                # But simply marking all non-completed requests for these riders as COMPLETED is a safe heuristic for this MVP.
-                self.db.rider_requests.update_many(
-                    {"rider_id": {"$in": rider_ids}, "status": {"$ne": "COMPLETED"}},
-                    {"$set": {"status": "COMPLETED"}}
-                )
-                
-                # Send notification to riders
-                try:
-                    targets = [notification_pb2.PushTarget(user_id=rid, channel="log") for rid in rider_ids]
-                    await self.notify.Push(notification_pb2.PushRequest(
-                        targets=targets, 
-                        title="Trip Completed", 
-                        body="You have arrived at your destination. Thank you for riding with LastMile!",
-                        data_json=f'{{"tripId":"{request.trip_id}", "status":"COMPLETED"}}'
-                    ))
-                    print(f"[trip] Sent completion notification to {len(rider_ids)} riders")
-                except Exception as e:
-                    print(f"[trip] Failed to send notification: {e}")
+                await self.db.driver_routes.delete_one({"_id": ObjectId(route_id)}, session=session)
+        return res
+
+    async def CommitMatch(self, request, context):
+        print(f"[trip] CommitMatch request={request}")
+        try:
+            route_oid = ObjectId(request.route_id)
+        except Exception:
+            return trip_pb2.CommitMatchResponse(skipped_request_ids=list(request.request_ids))
+        oids, skipped = [], []
+        for rid in request.request_ids:
+            try:
+                oids.append(ObjectId(rid))
+            except Exception:
+                skipped.append(rid)
 
+        try:
+            if self._txn:
+                async with self.db.client.start_session() as session:
+                    try:
+                        out = await session.with_transaction(
+                            lambda s: self._commit_txn(request, route_oid, oids, s)
+                        )
+                    except _Conflict:
+                        out = None
+            else:
+                out = await self._commit_guarded(request, route_oid, oids)
+        finally:
+            # Seats may have moved even when nothing was committed (reserved, then given
+            # back). Off the reply path: the matcher tracks seats by route_version itself.
+            self._spawn(self._route_changed(request.route_id))
+        if out is None:
+            # Nothing committed: only riders that are really gone count as skipped, the
+            # rest are still PENDING and merely lost out on seats.
+            still = {d["_id"] async for d in self.db.rider_requests.find(
+                {"_id": {"$in": oids}, "status": "PENDING"}, {"_id": 1})}
+            route = await self.db.driver_routes.find_one({"_id": route_oid}, {"seats_free": 1, "version": 1})
+            return trip_pb2.CommitMatchResponse(
+                seats_remaining=route["seats_free"] if route else 0,
+                route_version=route.get("version", 0) if route else 0,
+                skipped_request_ids=skipped + [str(o) for o in oids if o not in still],
+                unseated_request_ids=[str(o) for o in oids if o in still],
+            )
+        trip_doc, assigned, gone, route = out
+        self.relay.kick()
+        skipped += [str(o) for o in gone]
+        unseated = [str(o) for o in oids if o not in assigned and o not in gone]
         t = common_pb2.Trip(
-            id=str(res["_id"]),
-            driver_id=res["driver_id"],
-            rider_ids=res["rider_ids"],
-            route_id=res["route_id"],
-            station_id=res["station_id"],
-            status=res["status"]
+            id=str(trip_doc["_id"]), driver_id=trip_doc["driver_id"], rider_ids=trip_doc["rider_ids"],
+            route_id=trip_doc["route_id"], station_id=trip_doc["station_id"], status=trip_doc["status"]
         )
-        return trip_pb2.UpdateTripStatusResponse(trip=t)
+        self._publish(t)
+        return trip_pb2.CommitMatchResponse(
+            trip=t, seats_remaining=route["seats_free"], route_version=route.get("version", 0),
+            assigned_request_ids=[str(o) for o in assigned], skipped_request_ids=skipped,
+            unseated_request_ids=unseated,
+        )
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _route_changed(self, route_id: str):
+        # Without this the driver service would keep serving the old seat count (or a
+        # deleted route) from its cache.
+        try:
+            await self.driver.RouteChanged(driver_pb2.RouteChangedRequest(route_id=route_id),
+                                           timeout=ROUTE_CHANGED_TIMEOUT_S)
+        except grpc.RpcError as e:
+            print(f"[trip] RouteChanged for route {route_id} failed: {e.code()}")
+
+    def _trip_doc(self, request, tid, rider_ids: list[str], request_oids: list) -> dict:
+        doc = {
+            "_id": tid,
+            "driver_id": request.driver_id,
+            "rider_ids": rider_ids,
+            "route_id": request.route_id,
+            "station_id": request.station_id,
+            "status": "SCHEDULED"
+        }
+        doc["outbox"] = [
+            self._match_outbox(doc),
+            # Written here as part of the claim; the rider service still has to hear of it
+            rider_sync_doc("MarkAssigned", request_ids=[str(o) for o in request_oids], trip_id=str(tid)),
+        ]
+        return doc
+
+    async def _commit_txn(self, request, route_oid, oids, session):
+        # Everything below commits or aborts together.
+        db = self.db
+        pending = {d["_id"]: d["rider_id"] async for d in db.rider_requests.find(
+            {"_id": {"$in": oids}, "status": "PENDING"}, {"rider_id": 1}, session=session
+        )}
+        route = await db.driver_routes.find_one({"_id": route_oid}, {"seats_free": 1}, session=session)
+        if not route:
+            raise _Conflict()
+        take = [o for o in oids if o in pending][:route["seats_free"]]
+        if not take:
+            raise _Conflict()
+
+        route = await db.driver_routes.find_one_and_update(
+            {"_id": route_oid, "seats_free": {"$gte": len(take)}},
+            {"$inc": {"seats_free": -len(take), "version": 1}},
+            return_document=ReturnDocument.AFTER, session=session,
+        )
+        if not route:
+            raise _Conflict()
+        tid = ObjectId()
+        trip_doc = self._trip_doc(request, tid, [pending[o] for o in take], take)
+        await db.trips.insert_one(trip_doc, session=session)
+        res = await db.rider_requests.update_many(
+            {"_id": {"$in": take}, "status": "PENDING"},
+            {"$set": {"status": "ASSIGNED", "trip_id": str(tid)}}, session=session,
+        )
+        if res.modified_count != len(take):
+            raise _Conflict()
+        return trip_doc, take, [o for o in oids if o not in pending], route
 
-def factory():
+    async def _commit_guarded(self, request, route_oid, oids):
+        # Standalone Mongo has no multi-document transactions. Each step is a conditional
+        # write that only succeeds against the state we expect, and earlier steps are
+        # compensated if a later one comes up short.
+        db = self.db
+        # Seats are only reserved for riders that are still PENDING (as the transaction does)
+        live = {d["_id"] async for d in db.rider_requests.find(
+            {"_id": {"$in": oids}, "status": "PENDING"}, {"_id": 1})}
+        candidates = [o for o in oids if o in live]
+        route = await db.driver_routes.find_one({"_id": route_oid}, {"seats_free": 1})
+        k = min(len(candidates), route["seats_free"]) if route else 0
+        if k <= 0:
+            return None
+        route = await db.driver_routes.find_one_and_update(
+            {"_id": route_oid, "seats_free": {"$gte": k}},
+            {"$inc": {"seats_free": -k, "version": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not route:
+            return None
+
+        # The trip id is chosen up front so riders can be claimed for it before it exists.
+        tid = ObjectId()
+        want = candidates[:k]
+        held = k   # seats reserved by this commit and not given back yet
+        try:
+            await db.rider_requests.update_many(
+                {"_id": {"$in": want}, "status": "PENDING"},
+                {"$set": {"status": "ASSIGNED", "trip_id": str(tid)}},
+            )
+            claimed = {d["_id"]: d["rider_id"] async for d in db.rider_requests.find(
+                {"_id": {"$in": want}, "trip_id": str(tid)}, {"rider_id": 1}
+            )}
+            take = [o for o in want if o in claimed]
+            if len(take) < k:
+                route = await db.driver_routes.find_one_and_update(
+                    {"_id": route_oid}, {"$inc": {"seats_free": k - len(take), "version": 1}},
+                    return_document=ReturnDocument.AFTER,
+                ) or {"seats_free": 0}
+                held = len(take)
+            if not take:
+                return None
+
+            # Gone: not PENDING when read, or taken before the claim. Candidates past the
+            # first k were never tried and stay as they are.
+            gone = [o for o in oids if o not in live or (o in want and o not in claimed)]
+            trip_doc = self._trip_doc(request, tid, [claimed[o] for o in take], take)
+            await db.trips.insert_one(trip_doc)
+        except Exception:
+            # No trip was written: hand the riders and seats back before failing
+            await self._release(route_oid, tid, held)
+            raise
+        return trip_doc, take, gone, route
+
+    async def _release(self, route_oid, tid, seats: int):
+        try:
+            await self.db.rider_requests.update_many(
+                {"trip_id": str(tid), "status": "ASSIGNED"},
+                {"$set": {"status": "PENDING"}, "$unset": {"trip_id": ""}},
+            )
+            if seats:
+                await self.db.driver_routes.update_one(
+                    {"_id": route_oid}, {"$inc": {"seats_free": seats, "version": 1}})
+        except Exception as e:
+            print(f"[trip] Could not release claims for failed trip {tid}: {e}")
+
+    def _match_outbox(self, trip_doc: dict) -> dict:
+        return outbox_doc(
+            [trip_doc["driver_id"]] + trip_doc["rider_ids"],
+            title="Match confirmed",
+            body="Your LastMile ride is scheduled.",
+            data_json=f'{{"tripId":"{trip_doc["_id"]}"}}',
+        )
+
+async def main():
     server = grpc.aio.server()
-    trip_pb2_grpc.add_TripServiceServicer_to_server(TripServer(), server)
-    return server
+    trip_svc = TripServer()
+    await trip_svc.start()
+    trip_pb2_grpc.add_TripServiceServicer_to_server(trip_svc, server)
+
+    # Drain the notification outbox in the background
+    relay_task = asyncio.create_task(trip_svc.relay.run())
+
+    try:
+        await run_grpc(server, "[::]:50055")
+    finally:
+        relay_task.cancel()
+        try:
+            await relay_task
+        except asyncio.CancelledError:
+            pass
 
 if __name__ == "__main__":
-    serve(factory, "[::]:50055")
+    asyncio.run(main())
@@ -2,13 +2,17 @@ import asyncio
 import grpc
 from lastmile.v1 import user_pb2, user_pb2_grpc, common_pb2
 from common.run import serve
-from common.db import get_db
+from common.db import get_async_db
+from common.indexes import ensure_indexes
 
 class UserServer(user_pb2_grpc.UserServiceServicer):
     def __init__(self):
-        self.db = get_db()
+        self.db = get_async_db()
         self.users = self.db.users
 
+    async def start(self):
+        await ensure_indexes(self.db, "users")
+
     async def CreateUser(self, request, context):
         print(f"[user] CreateUser request={request}")
         u = request.user
@@ -26,7 +30,7 @@ class UserServer(user_pb2_grpc.UserServiceServicer):
             "phone": u.phone,
             "password": request.password
         }
-        result = self.users.insert_one(user_doc)
+        result = await self.users.insert_one(user_doc)
         uid = str(result.inserted_id)
         
         # Update the doc with the ID string for easier retrieval if needed, or just construct the response
@@ -38,13 +42,13 @@ class UserServer(user_pb2_grpc.UserServiceServicer):
         from bson.objectid import ObjectId
         try:
             oid = ObjectId(request.id)
-            doc = self.users.find_one({"_id": oid})
+            doc = await self.users.find_one({"_id": oid})
         except:
             doc = None
             
         if not doc:
              # Fallback: maybe it was stored as string ID?
-             doc = self.users.find_one({"_id": request.id})
+             doc = await self.users.find_one({"_id": request.id})
 
         if doc:
             u = common_pb2.User(
@@ -59,14 +63,16 @@ class UserServer(user_pb2_grpc.UserServiceServicer):
     async def Authenticate(self, request, context):
         print(f"[user] Authenticate request={request}")
         # Find by phone
-        doc = self.users.find_one({"phone": request.phone})
+        doc = await self.users.find_one({"phone": request.phone})
         if doc and doc["password"] == request.password:
             return user_pb2.AuthenticateResponse(user_id=str(doc["_id"]), jwt="demo-jwt")
         return user_pb2.AuthenticateResponse()
 
-def factory():
+async def factory():
     server = grpc.aio.server()
-    user_pb2_grpc.add_UserServiceServicer_to_server(UserServer(), server)
+    user_svc = UserServer()
+    await user_svc.start()
+    user_pb2_grpc.add_UserServiceServicer_to_server(user_svc, server)
     return server
 
 if __name__ == "__main__":
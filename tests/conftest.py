@@ -0,0 +1,93 @@
+"""Shared fixtures. Services are run as scripts, so their directory goes on sys.path the
+same way the repo root does; Mongo is mongomock behind a small asyncio facade shaped like
+pymongo's AsyncDatabase."""
+import os
+import sys
+
+import mongomock
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "services")]
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._it = None
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n):
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._it is None:
+            self._it = iter(self._cursor)
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return list(self._cursor)
+
+    async def close(self):
+        pass
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self.sync = collection
+
+    def find(self, *args, session=None, **kwargs):
+        return AsyncCursor(self.sync.find(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self.sync, name)
+
+        async def call(*args, session=None, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class _Admin:
+    async def command(self, *args, **kwargs):
+        raise RuntimeError("mongomock has no hello")   # standalone: no transactions
+
+
+class _Client:
+    admin = _Admin()
+
+
+class AsyncDatabase:
+    client = _Client()
+
+    def __init__(self, db):
+        self.sync = db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.sync[name])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return AsyncCollection(self.sync[name])
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh async database; services built after this fixture use it."""
+    adb = AsyncDatabase(mongomock.MongoClient()["lastmile"])
+    import common.db
+    monkeypatch.setattr(common.db, "get_async_db", lambda: adb)
+    for mod in ("trip_svc", "rider_svc", "driver_svc"):
+        if mod in sys.modules:
+            monkeypatch.setattr(sys.modules[mod], "get_async_db", lambda: adb)
+    return adb
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from common.actor import Actor
+
+
+def test_items_queued_together_are_handled_as_one_batch():
+    batches = []
+
+    async def handle(items):
+        batches.append(list(items))
+        return [i * 2 for i in items]
+
+    async def go():
+        actor = Actor(handle, window=0.01)
+        return await asyncio.gather(*(actor.submit(i) for i in range(3)))
+
+    assert asyncio.run(go()) == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+
+
+def test_batches_never_overlap():
+    running = []
+
+    async def handle(items):
+        running.append(1)
+        assert len(running) == 1
+        await asyncio.sleep(0.01)
+        running.pop()
+        return items
+
+    async def go():
+        actor = Actor(handle)
+        first = asyncio.ensure_future(actor.submit("a"))
+        await asyncio.sleep(0)
+        return await asyncio.gather(first, actor.submit("b"), actor.submit("c"))
+
+    assert asyncio.run(go()) == ["a", "b", "c"]
+
+
+def test_errors_reach_their_callers_and_the_worker_restarts_after_idling():
+    async def handle(items):
+        if "bad" in items:
+            raise ValueError("bad batch")
+        return [ValueError(i) if i == "odd" else i for i in items]
+
+    async def go():
+        actor = Actor(handle, idle=0.01)
+        with pytest.raises(ValueError, match="bad batch"):
+            await actor.submit("bad")
+        with pytest.raises(ValueError):
+            await actor.submit("odd")
+        await asyncio.sleep(0.05)
+        assert actor._task is None
+        return await actor.submit("ok")
+
+    assert asyncio.run(go()) == "ok"
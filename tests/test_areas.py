@@ -0,0 +1,40 @@
+from common.areas import AreaIndex, normalize
+
+
+def index():
+    return AreaIndex.build([
+        ("S1", ["Downtown", "Old Town"]),
+        ("S2", ["downtown ", "Harbour Front"]),
+        ("S3", ["Sao Paulo Airport", ""]),
+    ])
+
+
+def test_normalize_ignores_case_accents_and_punctuation():
+    assert normalize("  São-Paulo   AIRPORT ") == "sao paulo airport"
+    assert normalize("Old Town") == normalize("old-town")
+
+
+def test_build_indexes_stations_and_neighbours():
+    idx = index()
+    assert len(idx) == 4   # the blank name is dropped
+    assert idx.stations["downtown"] == {"S1", "S2"}
+    assert idx.names["downtown"] == "Downtown"
+    assert idx.neighbours["downtown"] == {"old town", "harbour front"}
+    assert idx.compatible("DOWNTOWN") == {"downtown", "old town", "harbour front"}
+    assert idx.compatible("Downtown", neighbours=False) == {"downtown"}
+    assert idx.compatible("Nowhere") == {"nowhere"}
+
+
+def test_suggest_matches_whole_names_then_later_words():
+    idx = index()
+    assert idx.suggest("ha") == ["harbour front"]
+    assert idx.suggest("air") == ["sao paulo airport"]
+    assert idx.suggest("o")[0] == "old town"
+    assert idx.suggest("") == []
+
+
+def test_round_trip_keeps_the_version():
+    idx = index()
+    copy = AreaIndex.from_entries((k, idx.names[k], idx.stations[k], idx.neighbours[k]) for k in idx.names)
+    assert copy.version == idx.version
+    assert AreaIndex.build([("S1", ["Downtown"])]).version != idx.version
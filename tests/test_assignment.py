@@ -0,0 +1,39 @@
+import itertools
+import random
+
+from common.assignment import INF, assign_slots, hungarian
+
+
+def total(cost, picks, skip_cost):
+    return sum(skip_cost if j < 0 else cost[i][j] for i, j in enumerate(picks))
+
+
+def best_total(cost, skip_cost):
+    # Every way of giving each row a distinct column or nothing
+    n, m = len(cost), len(cost[0])
+    options = list(range(m)) + [-1] * n
+    return min(total(cost, p, skip_cost) for p in itertools.permutations(options, n)
+               if all(c < INF for c in (cost[i][j] for i, j in enumerate(p) if j >= 0)))
+
+
+def test_hungarian_finds_the_cheapest_assignment():
+    cost = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+    assert sorted(hungarian(cost)) == [0, 1, 2]
+    assert sum(cost[i][j] for i, j in enumerate(hungarian(cost))) == 5
+
+
+def test_pruned_assignment_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        n, m = rng.randint(1, 3), rng.randint(1, 6)
+        cost = [[INF if rng.random() < 0.2 else rng.randint(0, 20) for _ in range(m)] for _ in range(n)]
+        picks = assign_slots(cost, skip_cost=15)
+        used = [j for j in picks if j >= 0]
+        assert len(used) == len(set(used))
+        assert all(cost[i][j] < 15 for i, j in enumerate(picks) if j >= 0)
+        assert total(cost, picks, 15) == best_total(cost, 15)
+
+
+def test_rows_are_left_empty_when_every_pairing_costs_more_than_skipping():
+    assert assign_slots([[INF, 30], [20, INF]], skip_cost=10) == [-1, -1]
+    assert assign_slots([], skip_cost=10) == []
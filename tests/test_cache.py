@@ -0,0 +1,36 @@
+from common import cache
+from common.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    c = TTLCache(ttl=10)
+    c.set("a", 1)
+    c.set("b", 2, ttl=30)
+    clock.now += 11
+    assert c.get("a") is None and c.get("a", "gone") == "gone"
+    assert c.get("b") == 2
+    c.set("c", 3)   # drops anything expired at the front
+    assert len(c) == 2
+
+
+def test_size_cap_evicts_the_oldest(monkeypatch):
+    monkeypatch.setattr(cache, "time", Clock())
+    c = TTLCache(ttl=10, max_size=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.set("a", 3)   # re-setting makes it the newest
+    c.set("c", 4)
+    assert (c.get("a"), c.get("b"), c.get("c")) == (3, None, 4)
+    assert c.pop("a") == 3 and c.pop("a", "none") == "none"
+    c.clear()
+    assert len(c) == 0
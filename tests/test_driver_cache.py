@@ -0,0 +1,49 @@
+import asyncio
+
+from bson.objectid import ObjectId
+
+import driver_svc
+from lastmile.v1 import driver_pb2
+
+
+def test_route_changed_replaces_cached_seats(db):
+    async def go():
+        server = driver_svc.DriverServer()
+        route = (await server.RegisterRoute(driver_pb2.RegisterRouteRequest(route=driver_pb2.DriverRoute(
+            driver_id="d1", dest_area="A", seats_total=3, seats_free=3)), None)).route
+        # The trip service reserves seats directly in Mongo
+        db.sync.driver_routes.update_one({"_id": ObjectId(route.id)}, {"$inc": {"seats_free": -2, "version": 1}})
+        stale = await server.GetRoute(driver_pb2.GetRouteRequest(route_id=route.id), None)
+        await server.RouteChanged(driver_pb2.RouteChangedRequest(route_id=route.id), None)
+        fresh = await server.GetRoute(driver_pb2.GetRouteRequest(route_id=route.id), None)
+        return route, stale.route, fresh.route
+    route, stale, fresh = asyncio.run(go())
+    assert (stale.seats_free, stale.version) == (3, 1)
+    assert (fresh.seats_free, fresh.version) == (1, 2)
+
+
+def test_conditional_read_and_deleted_route(db):
+    async def go():
+        server = driver_svc.DriverServer()
+        route = (await server.RegisterRoute(driver_pb2.RegisterRouteRequest(route=driver_pb2.DriverRoute(
+            driver_id="d1", dest_area="A", seats_total=3, seats_free=3)), None)).route
+        same = await server.GetRoute(driver_pb2.GetRouteRequest(route_id=route.id, if_version=route.version), None)
+        db.sync.driver_routes.delete_one({"_id": ObjectId(route.id)})
+        await server.RouteChanged(driver_pb2.RouteChangedRequest(route_id=route.id), None)
+        gone = await server.GetRoute(driver_pb2.GetRouteRequest(route_id=route.id), None)
+        return same, gone
+    same, gone = asyncio.run(go())
+    assert same.not_modified and not same.route.id
+    assert not gone.not_modified and not gone.route.id
+
+
+def test_older_read_does_not_replace_newer_entry(db):
+    async def go():
+        server = driver_svc.DriverServer()
+        oid = db.sync.driver_routes.insert_one({"driver_id": "d1", "dest_area": "A", "seats_total": 3,
+                                                "seats_free": 1, "stations": [], "version": 3}).inserted_id
+        server._cached(db.sync.driver_routes.find_one({"_id": oid}))
+        server._cached({**db.sync.driver_routes.find_one({"_id": oid}), "seats_free": 3, "version": 2})
+        return (await server.GetRoute(driver_pb2.GetRouteRequest(route_id=str(oid)), None)).route
+    route = asyncio.run(go())
+    assert (route.seats_free, route.version) == (1, 3)
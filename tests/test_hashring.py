@@ -0,0 +1,34 @@
+from common.hashring import HashRing
+
+KEYS = [f"S{i}" for i in range(2000)]
+
+
+def owners(ring):
+    return {k: ring.lookup(k)[0] for k in KEYS}
+
+
+def test_adding_a_node_only_moves_keys_to_it():
+    ring = HashRing(["a", "b", "c"])
+    before = owners(ring)
+    assert ring.set_nodes(["a", "b", "c", "d"])
+    after = owners(ring)
+    moved = [k for k in KEYS if before[k] != after[k]]
+    assert all(after[k] == "d" for k in moved)
+    assert 0.1 < len(moved) / len(KEYS) < 0.4   # about a quarter
+
+
+def test_removing_a_node_only_moves_its_keys():
+    ring = HashRing(["a", "b", "c"])
+    before = owners(ring)
+    ring.set_nodes(["a", "c"])
+    after = owners(ring)
+    assert all(before[k] == "b" for k in KEYS if before[k] != after[k])
+
+
+def test_fallbacks_are_distinct_and_follow_the_owner():
+    ring = HashRing(["a", "b", "c"])
+    for k in KEYS[:50]:
+        nodes = ring.lookup(k, 3)
+        assert sorted(nodes) == ["a", "b", "c"] and nodes[0] == ring.lookup(k)[0]
+    assert not ring.set_nodes(["c", "b", "a"])   # unchanged
+    assert HashRing().lookup("S1") == []
@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+import location_svc
+from lastmile.v1 import location_pb2
+
+
+def test_receive_time_is_taken_off_the_stream():
+    async def go():
+        server = location_svc.LocationServer()
+        server._inflight = asyncio.Semaphore(1)
+        handled = []
+
+        async def handle(loc, ack, received):
+            handled.append((time.perf_counter(), received))
+        server._handle_ping = handle
+
+        async def pings():
+            yield location_pb2.DriverLocation(driver_id="d1", route_id="rt1")
+
+        await server._inflight.acquire()   # every slot busy
+        consume = asyncio.create_task(server._consume(pings(), location_pb2.LocationStreamAck()))
+        await asyncio.sleep(0.1)
+        server._inflight.release()
+        await consume
+        return handled
+
+    [(started, received)] = asyncio.run(go())
+    assert started - received >= 0.09   # the wait for a slot counts
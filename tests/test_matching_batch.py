@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+
+import matching_svc
+from lastmile.v1 import driver_pb2, matching_pb2
+
+
+def test_only_fetched_routes_are_passed_to_triggers():
+    class Driver:
+        async def GetRoutes(self, request, timeout=None):
+            assert list(request.route_ids) == ["rt2", "rt3"]   # rt1 is held
+            return driver_pb2.GetRoutesResponse(routes=[driver_pb2.DriverRoute(id="rt2", seats_free=1)])
+
+    async def go():
+        server = matching_svc.MatchingServer()
+        server.driver = Driver()
+        server._holds["rt1"] = SimpleNamespace(station_id="S1")
+        seen = {}
+
+        async def attempt(request, route=None):
+            seen[request.route_id] = route
+            return matching_pb2.TryMatchResponse()
+        server._attempt = attempt
+        await server.TryMatchBatch(matching_pb2.TryMatchBatchRequest(triggers=[
+            matching_pb2.TryMatchRequest(driver_id="d", route_id=rt, station_id="S1") for rt in ("rt1", "rt2", "rt3")
+        ]), None)
+        return seen
+
+    seen = asyncio.run(go())
+    assert seen["rt1"] is None              # fetched by the trigger itself if the hold lapses
+    assert seen["rt2"].id == "rt2"
+    assert seen["rt3"] == driver_pb2.DriverRoute()   # really not found
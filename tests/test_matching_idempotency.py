@@ -0,0 +1,33 @@
+import asyncio
+
+import matching_svc
+from lastmile.v1 import matching_pb2
+
+
+def run_attempts(results: list[matching_pb2.TryMatchResponse], requests: list[matching_pb2.TryMatchRequest]):
+    async def go():
+        server = matching_svc.MatchingServer()
+        calls = []
+
+        async def try_match(request, route=None):
+            calls.append(request)
+            return results[len(calls) - 1]
+        server._try_match = try_match
+        out = [await server._attempt(r) for r in requests]
+        return out, calls
+    return asyncio.run(go())
+
+
+def test_empty_result_is_not_replayed():
+    req = matching_pb2.TryMatchRequest(driver_id="d1", route_id="rt1", station_id="S1")
+    out, calls = run_attempts([matching_pb2.TryMatchResponse(), matching_pb2.TryMatchResponse(trip_id="t1")],
+                              [req, req])
+    assert len(calls) == 2
+    assert out[1].trip_id == "t1"
+
+
+def test_committed_result_answers_a_duplicate():
+    req = matching_pb2.TryMatchRequest(driver_id="d1", route_id="rt1", station_id="S1", idempotency_key="k1")
+    out, calls = run_attempts([matching_pb2.TryMatchResponse(trip_id="t1")], [req, req])
+    assert len(calls) == 1
+    assert [r.trip_id for r in out] == ["t1", "t1"]
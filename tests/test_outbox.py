@@ -0,0 +1,138 @@
+import asyncio
+
+import trip_svc
+from common.outbox import OutboxRelay, outbox_doc, rider_sync_doc
+from lastmile.v1 import trip_pb2
+
+
+class FakeNotify:
+    def __init__(self, on_push=None):
+        self.pushed = []
+        self.on_push = on_push
+
+    async def Push(self, request, timeout=None):
+        self.pushed.append(request)
+        if self.on_push:
+            self.on_push()
+
+
+class FakeRider:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        async def call(request, timeout=None):
+            self.calls.append((method, request))
+        return call
+
+
+def test_match_messages_are_written_with_the_trip(db):
+    route = db.sync.driver_routes.insert_one({"driver_id": "d1", "seats_free": 2, "stations": []}).inserted_id
+    rid = str(db.sync.rider_requests.insert_one({"rider_id": "r1", "station_id": "S1", "eta_unix": 0,
+                                                 "status": "PENDING"}).inserted_id)
+
+    async def go():
+        server = trip_svc.TripServer()
+        resp = await server.CommitMatch(trip_pb2.CommitMatchRequest(
+            driver_id="d1", route_id=str(route), station_id="S1", request_ids=[rid]), None)
+        trip = db.sync.trips.find_one()
+        assert len(trip["outbox"]) == 2
+        assert db.sync.outbox.count_documents({}) == 0
+
+        notify, rider = FakeNotify(), FakeRider()
+        relay = OutboxRelay(db.outbox, notify, sources=[db.trips], rider_stub=rider)
+        assert await relay.drain_once() == 2
+        return resp, notify, rider
+
+    resp, notify, rider = asyncio.run(go())
+    assert notify.pushed[0].title == "Match confirmed"
+    assert {t.user_id for t in notify.pushed[0].targets} == {"d1", "r1"}
+    [(method, req)] = rider.calls
+    assert method == "MarkAssigned"
+    assert list(req.request_ids) == [rid] and req.trip_id == resp.trip.id
+    assert db.sync.trips.find_one()["outbox"] == []
+    assert db.sync.outbox.count_documents({}) == 0
+
+
+def test_completion_messages_are_pushed_with_the_status_write(db):
+    tid = db.sync.trips.insert_one({"driver_id": "d1", "rider_ids": ["r1"], "route_id": "",
+                                    "station_id": "S1", "status": "ACTIVE"}).inserted_id
+
+    async def go():
+        server = trip_svc.TripServer()
+        await server._update_status(tid, trip_pb2.UpdateTripStatusRequest(
+            trip_id=str(tid), status="COMPLETED"), None)
+
+    asyncio.run(go())
+    trip = db.sync.trips.find_one({"_id": tid})
+    assert trip["status"] == "COMPLETED"
+    assert [m.get("method") or m["title"] for m in trip["outbox"]] == ["MarkCompleted", "Trip Completed"]
+
+
+def test_collect_is_repeatable(db):
+    # A relay that died after copying but before pulling copies again without duplicating
+    msg = outbox_doc(["r1"], title="t", body="b", data_json="{}")
+    db.sync.outbox.insert_one(dict(msg))
+    db.sync.trips.insert_one({"status": "SCHEDULED", "outbox": [msg]})
+    notify = FakeNotify()
+    asyncio.run(OutboxRelay(db.outbox, notify, sources=[db.trips]).drain_once())
+    assert len(notify.pushed) == 1
+    assert db.sync.trips.find_one()["outbox"] == []
+
+
+def test_kick_during_a_drain_is_not_lost(db, monkeypatch):
+    monkeypatch.setattr("common.outbox.RELAY_IDLE_S", 30)
+    db.sync.outbox.insert_one(outbox_doc(["r1"], title="first", body="", data_json="{}"))
+
+    async def go():
+        relay = None
+
+        def write_another():
+            # Lands while the first drain is in flight
+            if len(notify.pushed) == 1:
+                db.sync.outbox.insert_one(outbox_doc(["r1"], title="second", body="", data_json="{}"))
+                relay.kick()
+
+        notify = FakeNotify(on_push=write_another)
+        relay = OutboxRelay(db.outbox, notify)
+        task = asyncio.create_task(relay.run())
+        for _ in range(100):
+            if len(notify.pushed) == 2:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        return notify
+
+    notify = asyncio.run(go())
+    assert [p.title for p in notify.pushed] == ["first", "second"]
+
+
+def test_rider_sync_is_never_parked(db, monkeypatch):
+    monkeypatch.setattr("common.outbox.MAX_ATTEMPTS", 1)
+    db.sync.outbox.insert_many([rider_sync_doc("MarkCompleted", rider_ids=["r1"], trip_id="t1"),
+                                outbox_doc(["r1"], title="t", body="", data_json="{}")])
+
+    class Down:
+        async def Push(self, request, timeout=None):
+            raise RuntimeError("down")
+        MarkCompleted = Push
+
+    asyncio.run(OutboxRelay(db.outbox, Down(), rider_stub=Down()).drain_once())
+    status = {m.get("kind", "notify"): m["status"] for m in db.sync.outbox.find()}
+    assert status == {"rider": "PENDING", "notify": "DEAD"}
+
+
+def test_repeated_completion_announces_nothing_new(db):
+    tid = db.sync.trips.insert_one({"driver_id": "d1", "rider_ids": ["r1"], "route_id": "",
+                                    "station_id": "S1", "status": "ACTIVE"}).inserted_id
+
+    async def go():
+        server = trip_svc.TripServer()
+        req = trip_pb2.UpdateTripStatusRequest(trip_id=str(tid), status="COMPLETED")
+        first = await server.UpdateTripStatus(req, None)
+        again = await server.UpdateTripStatus(req, None)
+        return first, again
+
+    first, again = asyncio.run(go())
+    assert first.trip.status == again.trip.status == "COMPLETED"
+    assert len(db.sync.trips.find_one({"_id": tid})["outbox"]) == 2
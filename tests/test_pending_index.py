@@ -0,0 +1,27 @@
+from common.pending_index import PendingIndex
+from lastmile.v1 import common_pb2
+
+
+def req(rid, eta, station="S1", dest="Downtown"):
+    return common_pb2.RiderRequest(id=rid, station_id=station, eta_unix=eta, dest_area=dest, status="PENDING")
+
+
+def test_range_is_by_station_destination_and_eta():
+    idx = PendingIndex()
+    for r in (req("a", 30), req("b", 10), req("c", 20, dest="Airport"), req("d", 20, station="S2")):
+        idx.upsert(r)
+    assert [r.id for r in idx.range("S1", "downtown", 0, 100)] == ["b", "a"]
+    assert [r.id for r in idx.range("S1", "Downtown", 10, 29)] == ["b"]
+    assert idx.count("S1") == 3 and len(idx) == 4
+
+
+def test_upsert_moves_and_remove_forgets():
+    idx = PendingIndex()
+    idx.upsert(req("a", 10))
+    idx.upsert(req("a", 50, dest="Airport"))   # changed ETA and destination
+    assert idx.range("S1", "Downtown", 0, 100) == []
+    assert [r.id for r in idx.range("S1", "Airport", 0, 100)] == ["a"]
+    idx.remove("a")
+    idx.remove("a")   # already gone
+    assert "a" not in idx and idx.get("a") is None
+    assert idx.count("S1") == 0 and len(idx) == 0
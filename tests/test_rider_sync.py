@@ -0,0 +1,63 @@
+import asyncio
+
+import rider_svc
+from lastmile.v1 import common_pb2, rider_pb2
+
+
+def test_mark_completed_only_completes_the_trips_requests(db):
+    def add(status, trip_id=None):
+        doc = {"rider_id": "r1", "station_id": "S1", "eta_unix": 0, "dest_area": "A", "status": status}
+        if trip_id:
+            doc["trip_id"] = trip_id
+        return db.sync.rider_requests.insert_one(doc).inserted_id
+    ids = {"this": add("ASSIGNED", "t1"), "other": add("ASSIGNED", "t0"), "later": add("PENDING")}
+
+    async def go():
+        server = rider_svc.RiderServer()
+        q = asyncio.Queue()
+        server._watchers.add(q)
+        req = rider_pb2.MarkCompletedRequest(rider_ids=["r1"], trip_id="t1")
+        first = await server.MarkCompleted(req, None)
+        again = await server.MarkCompleted(req, None)   # redelivered by the relay
+        return first, again, q.qsize()
+
+    first, again, events = asyncio.run(go())
+    assert first.updated == 1 and again.updated == 0
+    status = {k: db.sync.rider_requests.find_one({"_id": oid})["status"] for k, oid in ids.items()}
+    assert status == {"this": "COMPLETED", "other": "ASSIGNED", "later": "PENDING"}
+    assert events == 0
+
+
+def test_history_cache_sees_assignment_and_completion(db):
+    rid = str(db.sync.rider_requests.insert_one({"rider_id": "r1", "station_id": "S1", "eta_unix": 0,
+                                                 "dest_area": "A", "status": "PENDING"}).inserted_id)
+
+    async def go():
+        server = rider_svc.RiderServer()
+        active = rider_pb2.GetActiveRequestRequest(rider_id="r1")
+        seen = [(await server.GetActiveRequest(active, None)).request.status]   # cached from here on
+        db.sync.rider_requests.update_one({}, {"$set": {"status": "ASSIGNED", "trip_id": "t1"}})   # the claim
+        await server.MarkAssigned(rider_pb2.MarkAssignedRequest(request_ids=[rid], trip_id="t1"), None)
+        seen.append((await server.GetActiveRequest(active, None)).request.status)
+        await server.MarkCompleted(rider_pb2.MarkCompletedRequest(rider_ids=["r1"], trip_id="t1"), None)
+        seen.append((await server.GetActiveRequest(active, None)).found)
+        return seen
+
+    assert asyncio.run(go()) == ["PENDING", "ASSIGNED", False]
+
+
+def test_completion_leaves_later_requests_counted(db):
+    async def go():
+        server = rider_svc.RiderServer()
+        resp = await server.AddRequests(rider_pb2.AddRequestsRequest(requests=[
+            common_pb2.RiderRequest(rider_id=r, station_id="S1", eta_unix=0, dest_area="A") for r in ("r1", "r2")
+        ]), None)
+        rid = resp.results[0].request.id
+        db.sync.rider_requests.update_one({"rider_id": "r1"}, {"$set": {"status": "ASSIGNED", "trip_id": "t1"}})
+        await server.MarkAssigned(rider_pb2.MarkAssignedRequest(request_ids=[rid], trip_id="t1"), None)
+        assigned = (await server.GetDemand(rider_pb2.GetDemandRequest(), None)).demand[0].pending
+        await server.MarkCompleted(rider_pb2.MarkCompletedRequest(rider_ids=["r1", "r2"], trip_id="t1"), None)
+        completed = (await server.GetDemand(rider_pb2.GetDemandRequest(), None)).demand[0].pending
+        return assigned, completed
+
+    assert asyncio.run(go()) == (1, 1)
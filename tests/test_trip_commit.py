@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from bson.objectid import ObjectId
+
+import trip_svc
+from lastmile.v1 import trip_pb2
+
+
+def setup(db, seats_free: int, statuses: list[str]):
+    route = db.sync.driver_routes.insert_one({"driver_id": "d1", "dest_area": "A", "seats_total": 4,
+                                              "seats_free": seats_free, "stations": []}).inserted_id
+    ids = [str(db.sync.rider_requests.insert_one({"rider_id": f"r{i}", "station_id": "S1", "eta_unix": 0,
+                                                  "dest_area": "A", "status": st}).inserted_id)
+           for i, st in enumerate(statuses)]
+    return str(route), ids
+
+
+def commit(route_id: str, request_ids: list[str]) -> trip_pb2.CommitMatchResponse:
+    async def go():
+        server = trip_svc.TripServer()
+        return await server.CommitMatch(trip_pb2.CommitMatchRequest(
+            driver_id="d1", route_id=route_id, station_id="S1", request_ids=request_ids), None)
+    return asyncio.run(go())
+
+
+def test_riders_beyond_free_seats_are_unseated_not_skipped(db):
+    route, ids = setup(db, 2, ["PENDING"] * 3)
+    resp = commit(route, ids)
+    assert resp.trip.id
+    assert list(resp.assigned_request_ids) == ids[:2]
+    assert list(resp.unseated_request_ids) == ids[2:]
+    assert not resp.skipped_request_ids
+    assert resp.seats_remaining == 0
+    assert db.sync.rider_requests.find_one({"_id": ObjectId(ids[2])})["status"] == "PENDING"
+
+
+def test_only_gone_or_invalid_riders_are_skipped(db):
+    route, ids = setup(db, 2, ["ASSIGNED", "PENDING", "PENDING"])
+    resp = commit(route, ids + ["not-an-id"])
+    assert list(resp.assigned_request_ids) == ids[1:]
+    assert sorted(resp.skipped_request_ids) == sorted([ids[0], "not-an-id"])
+    assert not resp.unseated_request_ids
+
+
+def test_failed_seat_reservation_skips_nobody_still_pending(db):
+    route, ids = setup(db, 0, ["PENDING", "EXPIRED"])
+    resp = commit(route, ids)
+    assert not resp.trip.id
+    assert list(resp.skipped_request_ids) == [ids[1]]
+    assert list(resp.unseated_request_ids) == [ids[0]]
+    assert db.sync.rider_requests.find_one({"_id": ObjectId(ids[0])})["status"] == "PENDING"
+
+
+def test_failed_trip_insert_gives_riders_and_seats_back(db, monkeypatch):
+    route, ids = setup(db, 2, ["PENDING"] * 2)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("insert failed")
+    monkeypatch.setattr(db.sync.trips, "insert_one", fail)
+    with pytest.raises(RuntimeError):
+        commit(route, ids)
+    assert {d["status"] for d in db.sync.rider_requests.find()} == {"PENDING"}
+    assert all("trip_id" not in d for d in db.sync.rider_requests.find())
+    assert db.sync.driver_routes.find_one()["seats_free"] == 2
+
+
+def test_reply_does_not_wait_for_the_route_cache(db):
+    route, ids = setup(db, 2, ["PENDING"])
+    changed = []
+
+    class SlowDriver:
+        async def RouteChanged(self, request, timeout=None):
+            await asyncio.sleep(0.2)
+            changed.append(request.route_id)
+
+    async def go():
+        server = trip_svc.TripServer()
+        server.driver = SlowDriver()
+        resp = await server.CommitMatch(trip_pb2.CommitMatchRequest(
+            driver_id="d1", route_id=route, station_id="S1", request_ids=ids), None)
+        replied = list(changed)
+        await asyncio.gather(*server._background)
+        return resp, replied
+
+    resp, replied = asyncio.run(go())
+    assert resp.trip.id and replied == []
+    assert changed == [route]
@@ -0,0 +1,42 @@
+import asyncio
+
+import location_svc
+import trip_svc
+from lastmile.v1 import common_pb2, trip_pb2
+
+
+def test_status_changes_are_published(db):
+    tid = db.sync.trips.insert_one({"driver_id": "d1", "rider_ids": [], "route_id": "",
+                                    "station_id": "S1", "status": "SCHEDULED"}).inserted_id
+
+    async def go():
+        server = trip_svc.TripServer()
+        q = asyncio.Queue()
+        server._watchers.add(q)
+        for status in ("ACTIVE", "COMPLETED"):
+            await server.UpdateTripStatus(trip_pb2.UpdateTripStatusRequest(trip_id=str(tid), status=status), None)
+        return [q.get_nowait() for _ in range(q.qsize())]
+
+    events = asyncio.run(go())
+    assert [(e.trip.id, e.trip.status) for e in events] == [(str(tid), "ACTIVE"), (str(tid), "COMPLETED")]
+
+
+def test_trip_status_reaches_the_drivers_session():
+    class Trips:
+        async def WatchTrips(self, request):
+            for driver_id, status in (("d2", "ACTIVE"), ("d1", "ACTIVE"), ("d1", "COMPLETED")):
+                yield trip_pb2.TripEvent(trip=common_pb2.Trip(id="t1", driver_id=driver_id, status=status))
+
+    async def go():
+        server = location_svc.LocationServer()
+        server.trip = Trips()
+        session = asyncio.Queue()
+        server._sessions["d1"] = {session}
+        task = asyncio.create_task(server.watch_trips())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return [session.get_nowait() for _ in range(session.qsize())]
+
+    events = asyncio.run(go())
+    assert [(e.type, e.trip_id, e.trip_status) for e in events] == [
+        ("TRIP_STATUS", "t1", "ACTIVE"), ("TRIP_STATUS", "t1", "COMPLETED")]